@@ -15,6 +15,9 @@ from large_gcs.algorithms.search_algorithm import AlgVisParams, SearchAlgorithm
 from large_gcs.cost_estimators.cost_estimator import CostEstimator
 from large_gcs.domination_checkers.domination_checker import DominationChecker
 from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.convex_restriction_solve_service import (
+    ConvexRestrictionSolveService,
+)
 from large_gcs.graph.graph import ShortestPathSolution
 from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
 from large_gcs.graph.lower_bound_graph import LowerBoundGraph
@@ -76,8 +79,7 @@ def main(cfg: OmegaConf) -> None:
         graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
             cfg.graph_name
         )
-        cg = IncrementalContactGraph.load_from_file(
-            graph_file,
+        graph_kwargs = dict(
             should_incl_simul_mode_switches=cfg.should_incl_simul_mode_switches,
             should_add_const_edge_cost=cfg.should_add_const_edge_cost,
             should_add_gcs=(
@@ -90,16 +92,28 @@ def main(cfg: OmegaConf) -> None:
                 else False
             ),
             should_use_l1_norm_vertex_cost=cfg.should_use_l1_norm_vertex_cost,
+            n_nullspace_workers=cfg.get("n_nullspace_workers", 0),
         )
+        cg = IncrementalContactGraph.load_from_file(graph_file, **graph_kwargs)
     else:
         graph_file = ContactGraphGeneratorParams.graph_file_path_from_name(
             cfg.graph_name,
         )
-        cg = ContactGraph.load_from_file(
-            graph_file,
+        graph_kwargs = dict(
             should_use_l1_norm_vertex_cost=cfg.should_use_l1_norm_vertex_cost,
         )
+        cg = ContactGraph.load_from_file(graph_file, **graph_kwargs)
+
+    if "conv_res_cache_max_size" in cfg:
+        cg.enable_convex_restriction_cache(max_size=cfg.conv_res_cache_max_size)
+    if cfg.get("should_use_incremental_path_programs", False):
+        cg.enable_incremental_path_programs()
+    if cfg.get("should_use_path_lp_solver", False):
+        cg.enable_path_lp_solver(
+            should_cross_check=cfg.get("should_cross_check_path_lp", False)
+        )
 
+    solve_service = None
     if "load_checkpoint_log_dir" in cfg.algorithm:
         # Make sure checkpoint graph is the same as current graph
         checkpoint_cfg = get_cfg_from_folder(
@@ -139,15 +153,47 @@ def main(cfg: OmegaConf) -> None:
         domination_checker: DominationChecker = instantiate(
             cfg.domination_checker, graph=cg
         )
-        alg: SearchAlgorithm = instantiate(
-            cfg.algorithm,
-            graph=cg,
-            cost_estimator=cost_estimator,
-            domination_checker=domination_checker,
-            vis_params=AlgVisParams(log_dir=full_log_dir),
-        )
+        if cfg.get("n_solve_workers", 0) > 0:
+            if not cfg.algorithm.get("should_batch_neighbors", False):
+                raise ValueError(
+                    "n_solve_workers requires algorithm.should_batch_neighbors, "
+                    "the solve workers are only used for batched neighbors"
+                )
+            # Solve the batched neighbor estimates on replicas of the graph
+            solve_service = ConvexRestrictionSolveService(
+                graph_file,
+                graph_cls=type(cg),
+                graph_kwargs=graph_kwargs,
+                n_workers=cfg.n_solve_workers,
+                shortcut_edge_cost_factory=cfg.cost_estimator.get(
+                    "shortcut_edge_cost_factory"
+                ),
+                add_const_cost=cfg.should_add_const_edge_cost,
+            ).start()
+        try:
+            if solve_service is not None:
+                if isinstance(cg, IncrementalContactGraph):
+                    solve_service.attach(cg)
+                cost_estimator.set_solve_service(solve_service)
+            alg: SearchAlgorithm = instantiate(
+                cfg.algorithm,
+                graph=cg,
+                cost_estimator=cost_estimator,
+                domination_checker=domination_checker,
+                vis_params=AlgVisParams(log_dir=full_log_dir),
+            )
+        except BaseException:
+            if solve_service is not None:
+                solve_service.close()
+            raise
 
-    sol: ShortestPathSolution = alg.run()
+    try:
+        sol: ShortestPathSolution = alg.run()
+    finally:
+        # The workers are not daemons, so they would keep the interpreter
+        # alive if the run fails
+        if solve_service is not None:
+            solve_service.close()
 
     save_outputs = cfg.save_metrics or cfg.save_visualization or cfg.save_solution
     if save_outputs:
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import List, Optional
 
 from large_gcs.graph.graph import Edge, ShortestPathSolution
+from large_gcs.utils.shared_path import SharedPath
 
 
 @dataclass
@@ -9,12 +10,19 @@ class GCSHANode:
     priority: Optional[float]
     abs_level: int
     vertex_name: str
-    edge_path: List[str]
-    vertex_path: List[str]
+    # Paths share their prefixes with the parent's, see SharedPath
+    edge_path: SharedPath
+    vertex_path: SharedPath
     weight: Optional[float]
     parent: Optional["GCSHANode"] = None
     sol: Optional[ShortestPathSolution] = None
 
+    def __post_init__(self):
+        if not isinstance(self.edge_path, SharedPath):
+            self.edge_path = SharedPath(self.edge_path)
+        if not isinstance(self.vertex_path, SharedPath):
+            self.vertex_path = SharedPath(self.vertex_path)
+
     @property
     def id(self):
         return f"{self.abs_level}_{self.__class__.__name__}_{self.vertex_name}"
@@ -22,19 +30,25 @@ class GCSHANode:
     def __lt__(self, other: "GCSHANode"):
         return self.priority < other.priority
 
+    def edge_path_visits(self, vertex_name: str) -> bool:
+        """Whether an edge in the edge path starts or ends at the vertex.
+
+        O(1) for most vertices that are not on the path, see SharedPath."""
+        return len(self.edge_path) > 0 and vertex_name in self.vertex_path
+
 
 @dataclass
 class StatementNode(GCSHANode):
     @classmethod
     def from_parent(cls, child_vertex_name: str, parent: "GCSHANode"):
         assert isinstance(parent, StatementNode)
-        new_edge = Edge(u=parent.vertex_name, v=child_vertex_name)
+        new_edge_key = Edge.key_from_uv(parent.vertex_name, child_vertex_name)
         return cls(
             priority=None,
             abs_level=parent.abs_level,
             vertex_name=child_vertex_name,
-            edge_path=parent.edge_path.copy() + [new_edge.key],
-            vertex_path=parent.vertex_path.copy() + [child_vertex_name],
+            edge_path=parent.edge_path.extended(new_edge_key),
+            vertex_path=parent.vertex_path.extended(child_vertex_name),
             weight=None,
             parent=parent,
         )
@@ -141,15 +141,13 @@ class GcsAstarConvexRestriction(SearchAlgorithm):
                 if edge.v not in self._expanded or edge.v == self._graph.target_name:
                     self._explore_edge(edge, active_edges)
         else:
+            # Vertices of the active edges, to skip neighbors already in the path
+            path_vertices = set()
+            for e in active_edges:
+                path_vertices.add(self._graph.edges[e].u)
+                path_vertices.add(self._graph.edges[e].v)
             for edge in edges:
-                neighbor_in_path = any(
-                    (
-                        self._graph.edges[e].u == edge.v
-                        or self._graph.edges[e].v == edge.v
-                    )
-                    for e in active_edges
-                )
-                if not neighbor_in_path:
+                if edge.v not in path_vertices:
                     self._explore_edge(edge, active_edges)
 
     def _explore_edge(self, edge: Edge, active_edges: List[str]):
@@ -21,7 +21,12 @@ from large_gcs.algorithms.search_algorithm import (
 )
 from large_gcs.cost_estimators.cost_estimator import CostEstimator
 from large_gcs.domination_checkers.domination_checker import DominationChecker
-from large_gcs.graph.graph import Edge, Graph, ShortestPathSolution
+from large_gcs.graph.graph import (
+    CompactShortestPathSolution,
+    Edge,
+    Graph,
+    ShortestPathSolution,
+)
 from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
 
 logger = logging.getLogger(__name__)
@@ -48,6 +53,9 @@ class GcsAstarReachability(SearchAlgorithm):
         load_checkpoint_log_dir: Optional[str] = None,
         override_wall_clock_time: Optional[float] = None,
         save_expansion_order: bool = False,
+        should_warm_start: bool = False,
+        should_batch_neighbors: bool = False,
+        should_store_compact_solutions: bool = False,
     ):
         if isinstance(graph, IncrementalContactGraph):
             assert (
@@ -76,6 +84,14 @@ class GcsAstarReachability(SearchAlgorithm):
 
         self._load_checkpoint_log_dir = load_checkpoint_log_dir
         self._save_expansion_order = save_expansion_order
+        # Warm start convex restrictions with the parent's solution
+        self._should_warm_start = should_warm_start
+        # Solve the convex restrictions to all neighbors of a node in one parallel call
+        self._should_batch_neighbors = should_batch_neighbors
+        if should_batch_neighbors:
+            self._check_batch_neighbors_supported(graph)
+        # Only keep the cost and the last vertex's values of the solutions in Q and S
+        self._should_store_compact_solutions = should_store_compact_solutions
 
         # For logging/metrics
         # Expanded set
@@ -83,12 +99,16 @@ class GcsAstarReachability(SearchAlgorithm):
         call_structure = {
             "_run_iteration": [
                 "_visit_neighbor",
+                "_visit_neighbors_batched",
                 "_generate_neighbors",
                 "_save_metrics",
             ],
             "_visit_neighbor": [
                 "_is_dominated",
             ],
+            "_visit_neighbors_batched": [
+                "_is_dominated",
+            ],
         }
         self._alg_metrics.update_method_call_structure(call_structure)
         self._last_plots_save_time = time.time()
@@ -165,7 +185,7 @@ class GcsAstarReachability(SearchAlgorithm):
         n: SearchNode = self.pop_node_from_Q()
 
         if self._save_expansion_order:
-            self._alg_metrics.expansion_order.append(n.vertex_path)
+            self._alg_metrics.expansion_order.append(n.vertex_path.to_list())
 
         # Check termination condition
         if n.vertex_name == self._graph.target_name:
@@ -185,18 +205,50 @@ class GcsAstarReachability(SearchAlgorithm):
 
         self._save_metrics(n, edges)
 
+        if self._should_batch_neighbors:
+            edges = [edge for edge in edges if not self._neighbor_in_path(n, edge)]
+            return self._visit_neighbors_batched(n, edges)
+
         for edge in edges:
-            neighbor_in_path = any(
-                (self._graph.edges[e].u == edge.v or self._graph.edges[e].v == edge.v)
-                for e in n.edge_path
-            )
-            if neighbor_in_path:
+            if self._neighbor_in_path(n, edge):
                 continue
 
             early_terminate_sol = self._visit_neighbor(n, edge)
             if early_terminate_sol is not None:
                 return early_terminate_sol
 
+    def _check_batch_neighbors_supported(self, graph: Graph) -> None:
+        """The batched solves go through
+        GraphOfConvexSets.SolveConvexRestrictions (or the replicas of a
+        solve service), which take no initial guess and bypass the convex
+        restriction cache, path programs and path LP solver of the graph.
+        Rather than silently turning those off, combining them with
+        should_batch_neighbors is an error."""
+        unsupported = [
+            name
+            for name, is_enabled in [
+                ("should_warm_start", self._should_warm_start),
+                (
+                    "a convex restriction cache",
+                    graph.convex_restriction_cache is not None,
+                ),
+                (
+                    "incremental path programs",
+                    graph.path_program_builder is not None,
+                ),
+                ("a path LP solver", graph.path_lp_solver is not None),
+            ]
+            if is_enabled
+        ]
+        if len(unsupported) > 0:
+            raise ValueError(
+                "should_batch_neighbors cannot be combined with "
+                f"{', '.join(unsupported)}, which the batched solves do not use"
+            )
+
+    def _neighbor_in_path(self, n: SearchNode, edge: Edge) -> bool:
+        return n.edge_path_visits(edge.v)
+
     @profile_method
     def _generate_neighbors(self, vertex_name: str) -> None:
         """Generates neighbors for the given vertex.
@@ -209,18 +261,41 @@ class GcsAstarReachability(SearchAlgorithm):
     def _visit_neighbor(
         self, n: SearchNode, edge: Edge
     ) -> Optional[ShortestPathSolution]:
-        neighbor = edge.v
-        if neighbor in self._S:
-            self._alg_metrics.n_vertices_revisited[0] += 1
-        else:
-            self._alg_metrics.n_vertices_visited[0] += 1
-
         sol: ShortestPathSolution = self._cost_estimator.estimate_cost_on_graph(
             self._graph,
             edge,
             n.edge_path,
             solve_convex_restriction=True,
+            initial_guess=(
+                n.sol.vertex_solutions
+                if self._should_warm_start and n.sol is not None
+                else None
+            ),
         )
+        return self._add_neighbor_if_not_dominated(n, edge, sol)
+
+    @profile_method
+    def _visit_neighbors_batched(
+        self, n: SearchNode, edges: List[Edge]
+    ) -> Optional[ShortestPathSolution]:
+        """Solves the convex restrictions to all the neighbors in one
+        parallel call, then checks domination for each neighbor in order."""
+        sols = self._cost_estimator.estimate_costs_on_graph(
+            self._graph, edges, n.edge_path
+        )
+        for edge, sol in zip(edges, sols):
+            early_terminate_sol = self._add_neighbor_if_not_dominated(n, edge, sol)
+            if early_terminate_sol is not None:
+                return early_terminate_sol
+
+    def _add_neighbor_if_not_dominated(
+        self, n: SearchNode, edge: Edge, sol: ShortestPathSolution
+    ) -> Optional[ShortestPathSolution]:
+        neighbor = edge.v
+        if neighbor in self._S:
+            self._alg_metrics.n_vertices_revisited[0] += 1
+        else:
+            self._alg_metrics.n_vertices_visited[0] += 1
 
         if not sol.is_success:
             logger.debug(f"Path not actually feasible")
@@ -252,6 +327,8 @@ class GcsAstarReachability(SearchAlgorithm):
             and len(self._S[n_next.vertex_name]) >= self._max_len_S_per_vertex
         ):
             self.remove_node_from_back_of_S(n_next.vertex_name)
+        if self._should_store_compact_solutions and neighbor != self._target:
+            n_next.sol = CompactShortestPathSolution.from_solution(sol, neighbor)
         self.add_node_to_S(n_next)
         self.push_node_on_Q(n_next)
 
@@ -301,6 +378,7 @@ class GcsAstarReachability(SearchAlgorithm):
             pie_fig = self._alg_metrics.generate_method_time_piechart()
             pie_fig.write_image(os.path.join(log_dir, "method_times_pie_chart.png"))
 
+            self.update_node_memory_metrics()
             checkpoint_path_str = self.save_checkpoint()
 
             if wandb.run is not None:
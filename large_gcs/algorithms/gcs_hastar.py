@@ -172,11 +172,7 @@ class GcsHAstar(SearchAlgorithm):
                             self._stalled.append(neighbor)
             else:
                 for edge in edges:
-                    neighbor_in_path = any(
-                        (g.edges[e].u == edge.v or g.edges[e].v == edge.v)
-                        for e in n.edge_path
-                    )
-                    if not neighbor_in_path:
+                    if not n.edge_path_visits(edge.v):
                         neighbor = StatementNode.from_parent(
                             child_vertex_name=edge.v, parent=n
                         )
@@ -267,8 +263,8 @@ class GcsHAstar(SearchAlgorithm):
             vertex_name=n_antecedent.vertex_path[-2],
             # Weight of the prior context is parent's weight + vertex cost and edge cost (stored in path_costs)
             weight=n_antecedent.weight + n_antecedent.path_costs[-1],
-            edge_path=n_antecedent.edge_path[:-1],
-            vertex_path=n_antecedent.vertex_path[:-1],
+            edge_path=n_antecedent.edge_path.prefix,
+            vertex_path=n_antecedent.vertex_path.prefix,
             path_costs=n_antecedent.path_costs[:-1],
             sol=n_antecedent.sol,
             parent=n_antecedent,
@@ -324,7 +320,7 @@ class GcsHAstar(SearchAlgorithm):
         # Solve convex restriction on the path from the source to the conclusion to get the weight
         g.set_target(n_conclusion.vertex_name)
         sol = g.solve_convex_restriction(n_conclusion.edge_path)
-        self._alg_metrics.update_after_gcs_solve(sol.time)
+        self._alg_metrics.update_after_gcs_solve(sol.time, is_cached=sol.is_cached)
         g.set_target(self._targets[n_conclusion.abs_level])
         if not sol.is_success:
             logger.debug(
@@ -31,6 +31,7 @@ class IxG(SearchAlgorithm):
         eps: float = 1,
         vis_params: Optional[AlgVisParams] = None,
         should_save_metrics: bool = True,
+        should_warm_start: bool = False,
     ):
         super().__init__()
         self._graph = graph
@@ -38,6 +39,8 @@ class IxG(SearchAlgorithm):
         self._eps = eps
         self._vis_params = vis_params
         self._should_save_metrics = should_save_metrics
+        # Warm start convex restrictions with the parent's solution
+        self._should_warm_start = should_warm_start
         self._counter = itertools.count(start=0, step=1)
         # Stores the search node with the lowest cost to come found so far for each vertex
         self._S: dict[str, SearchNode] = {}
@@ -114,11 +117,7 @@ class IxG(SearchAlgorithm):
         self._save_metrics(n, edges)
         for edge in edges:
             # Not part of IxG, should replace solve_convex_restriction with something that can handle repeated vertices
-            neighbor_in_path = any(
-                (self._graph.edges[e].u == edge.v or self._graph.edges[e].v == edge.v)
-                for e in n.edge_path
-            )
-            if neighbor_in_path:
+            if n.edge_path_visits(edge.v):
                 continue
 
             # Check early termination condition
@@ -137,6 +136,14 @@ class IxG(SearchAlgorithm):
         sol = self._graph.solve_convex_restriction(
             active_edge_keys=n_next.edge_path,
             skip_post_solve=(not n_next.vertex_name == self._target_name),
+            initial_guess=(
+                n.sol.vertex_solutions
+                if self._should_warm_start and n.sol is not None
+                else None
+            ),
+        )
+        self._alg_metrics.update_after_gcs_solve(
+            sol.time, sol.n_iterations, sol.is_warm_started, sol.is_cached
         )
         if not sol.is_success:
             logger.debug(f"Path not actually feasible")
@@ -162,7 +169,7 @@ class IxG(SearchAlgorithm):
         self, active_edge_keys: List[str], skip_post_solve: bool = False
     ):
         sol = self._graph.solve_convex_restriction(active_edge_keys, skip_post_solve)
-        self._alg_metrics.update_after_gcs_solve(sol.time)
+        self._alg_metrics.update_after_gcs_solve(sol.time, is_cached=sol.is_cached)
         return sol
 
     @profile_method
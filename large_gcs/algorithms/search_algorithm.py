@@ -1,23 +1,34 @@
 import heapq as heap
 import logging
+import sys
 import time
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import asdict, dataclass, field, fields
 from enum import Enum
 from functools import wraps
 from math import inf
 from pathlib import Path
-from typing import DefaultDict, Dict, List, Optional
+from typing import TYPE_CHECKING, DefaultDict, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import plotly.graph_objects as go
 from pypolycontain.objects import AH_polytope
 
 import wandb
-from large_gcs.graph.graph import Edge, ShortestPathSolution
+from large_gcs.graph.graph import (
+    CompactShortestPathSolution,
+    Edge,
+    ShortestPathSolution,
+)
+from large_gcs.utils.shared_path import SharedPath
 from large_gcs.utils.utils import dict_to_dataclass
 
+if TYPE_CHECKING:
+    from large_gcs.domination_checkers.ah_containment_domination_checker import (
+        PathPolytopeBlocks,
+    )
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,11 +78,41 @@ class AlgMetrics:
     gcs_solve_time_iter_std: float = 0.0
     gcs_solve_time_iter_min: float = inf
     gcs_solve_time_iter_max: float = 0.0
+    n_gcs_solves_warm_started: int = 0
+    # Solutions taken from the convex restriction cache, which are not
+    # counted as solves
+    n_gcs_solves_cached: int = 0
+    gcs_solve_time_cold_mean: float = 0.0
+    gcs_solve_time_warm_mean: float = 0.0
+    # Estimated as the difference in mean solve time of cold and warm started solves
+    gcs_solve_time_saved_est: float = 0.0
+    gcs_solve_iterations_total: int = 0
+    gcs_solve_iterations_cold_mean: float = 0.0
+    gcs_solve_iterations_warm_mean: float = 0.0
     n_vertices_reexpanded: Dict[int, int] = field(default_factory=lambda: {0: 0})
     n_vertices_revisited: Dict[int, int] = field(default_factory=lambda: {0: 0})
     n_Q: int = 0
     n_S: int = 0
     n_S_pruned: int = 0
+    n_conv_res_cache_hits: int = 0
+    n_conv_res_cache_misses: int = 0
+    # Containment checks decided by the recorded results between paths to the
+    # same vertex, each of which skips a containment program
+    n_containment_memo_hits: int = 0
+    n_containment_memo_inferred: int = 0
+    # Containment checks against alternates and how many of them were
+    # rejected by comparing support values, without a containment program
+    n_containment_prefilter_checks: int = 0
+    n_containment_prefilter_rejections: int = 0
+    containment_prefilter_rejection_rate: float = 0.0
+    n_ah_polytopes_built: int = 0
+    ah_polytope_build_time_total: float = 0.0
+    # Per node, including the nullspace reduction of the path polytope
+    ah_polytope_build_time_mean: float = 0.0
+    ah_polytope_build_time_max: float = 0.0
+    # Approximate memory held by each node in Q and S (see SearchNode.nbytes)
+    node_nbytes_mean: float = 0.0
+    node_sol_nbytes_mean: float = 0.0
     _S_pruned_counts: DefaultDict[str, int] = field(
         default_factory=lambda: defaultdict(int)
     )
@@ -84,18 +125,74 @@ class AlgMetrics:
     expansion_order: List[str] = field(default_factory=list)
 
     def __post_init__(self):
-        self._gcs_solve_times = np.empty((0,))
+        self._init_gcs_solve_stats()
         self._method_call_structure = None
 
-    def update_after_gcs_solve(self, solve_time: float):
+    def _init_gcs_solve_stats(self):
+        # Running statistics of the solve times, so that memory does not grow
+        # with the number of solves. Welford's running mean and sum of
+        # squared deviations give the standard deviation.
+        self._gcs_solve_time_mean = 0.0
+        self._gcs_solve_time_m2 = 0.0
+        self._gcs_solve_times_last_10 = deque(maxlen=10)
+        # Keyed by whether the solves were warm started: the total solve
+        # time, and the total and number of reported iteration counts
+        self._gcs_solve_time_totals = {True: 0.0, False: 0.0}
+        self._gcs_solve_iterations_totals = {True: 0, False: 0}
+        self._n_gcs_solves_with_iterations = {True: 0, False: 0}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "_gcs_solve_times" in state:
+            # Saved before the running statistics, all solves are cold
+            solve_times = self.__dict__.pop("_gcs_solve_times")
+            self.__dict__.pop("_gcs_solve_iterations", None)
+            self.__dict__.pop("_gcs_solve_is_warm_started", None)
+            self._init_gcs_solve_stats()
+            if len(solve_times) > 0:
+                self._gcs_solve_time_mean = np.mean(solve_times)
+                self._gcs_solve_time_m2 = np.sum(
+                    (solve_times - self._gcs_solve_time_mean) ** 2
+                )
+                self._gcs_solve_times_last_10.extend(solve_times[-10:])
+                self._gcs_solve_time_totals[False] = np.sum(solve_times)
+
+    def update_after_gcs_solve(
+        self,
+        solve_time: float,
+        n_iterations: Optional[int] = None,
+        is_warm_started: bool = False,
+        is_cached: bool = False,
+    ):
+        if is_cached:
+            # Kept out of the solve times, so that they do not skew the
+            # warm start statistics
+            self.n_gcs_solves_cached += 1
+            return
         self.n_gcs_solves += 1
         self.gcs_solve_time_total += solve_time
+        if is_warm_started:
+            self.n_gcs_solves_warm_started += 1
+        if n_iterations is not None:
+            self.gcs_solve_iterations_total += n_iterations
+            self._gcs_solve_iterations_totals[is_warm_started] += n_iterations
+            self._n_gcs_solves_with_iterations[is_warm_started] += 1
+        self._gcs_solve_time_totals[is_warm_started] += solve_time
 
         if solve_time < self.gcs_solve_time_iter_min:
             self.gcs_solve_time_iter_min = solve_time
         if solve_time > self.gcs_solve_time_iter_max:
             self.gcs_solve_time_iter_max = solve_time
-        self._gcs_solve_times = np.append(self._gcs_solve_times, solve_time)
+        delta = solve_time - self._gcs_solve_time_mean
+        self._gcs_solve_time_mean += delta / self.n_gcs_solves
+        self._gcs_solve_time_m2 += delta * (solve_time - self._gcs_solve_time_mean)
+        self._gcs_solve_times_last_10.append(solve_time)
+
+    def update_after_ah_polytope_build(self, build_time: float):
+        self.n_ah_polytopes_built += 1
+        self.ah_polytope_build_time_total += build_time
+        if build_time > self.ah_polytope_build_time_max:
+            self.ah_polytope_build_time_max = build_time
 
     def update_derived_metrics(
         self,
@@ -110,11 +207,44 @@ class AlgMetrics:
             self.gcs_solve_time_iter_mean = (
                 self.gcs_solve_time_total / self.n_gcs_solves
             )
-            self.gcs_solve_time_iter_std = np.std(self._gcs_solve_times)
+            self.gcs_solve_time_iter_std = np.sqrt(
+                self._gcs_solve_time_m2 / self.n_gcs_solves
+            )
         if self.n_gcs_solves > 10:
-            self.gcs_solve_time_last_10_mean = np.mean(self._gcs_solve_times[-10:])
+            self.gcs_solve_time_last_10_mean = np.mean(self._gcs_solve_times_last_10)
+        if self.n_gcs_solves_warm_started > 0:
+            self._update_warm_start_metrics()
+        if self.n_containment_prefilter_checks > 0:
+            self.containment_prefilter_rejection_rate = (
+                self.n_containment_prefilter_rejections
+                / self.n_containment_prefilter_checks
+            )
+        if self.n_ah_polytopes_built > 0:
+            self.ah_polytope_build_time_mean = (
+                self.ah_polytope_build_time_total / self.n_ah_polytopes_built
+            )
         return self
 
+    def _update_warm_start_metrics(self):
+        n_warm = self.n_gcs_solves_warm_started
+        n_cold = self.n_gcs_solves - n_warm
+        self.gcs_solve_time_warm_mean = self._gcs_solve_time_totals[True] / n_warm
+        if n_cold > 0:
+            self.gcs_solve_time_cold_mean = self._gcs_solve_time_totals[False] / n_cold
+            self.gcs_solve_time_saved_est = n_warm * (
+                self.gcs_solve_time_cold_mean - self.gcs_solve_time_warm_mean
+            )
+        if self._n_gcs_solves_with_iterations[True] > 0:
+            self.gcs_solve_iterations_warm_mean = (
+                self._gcs_solve_iterations_totals[True]
+                / self._n_gcs_solves_with_iterations[True]
+            )
+        if self._n_gcs_solves_with_iterations[False] > 0:
+            self.gcs_solve_iterations_cold_mean = (
+                self._gcs_solve_iterations_totals[False]
+                / self._n_gcs_solves_with_iterations[False]
+            )
+
     def __str__(self):
         result = []
         for field in fields(self):
@@ -265,30 +395,54 @@ class AlgMetrics:
 
 @dataclass
 class SearchNode:
-    """A node in the search tree."""
+    """A node in the search tree.
+
+    The edge and vertex paths are SharedPaths that share their prefixes
+    with the paths of the parent, so creating a child does not copy the
+    parent's paths. Lists passed to the constructor are converted.
+    """
 
     priority: float
     vertex_name: str
     # Edge path
-    edge_path: List[str]
+    edge_path: SharedPath
     # Vertex path
-    vertex_path: List[str]
+    vertex_path: SharedPath
     parent: Optional["SearchNode"] = None
-    sol: Optional[ShortestPathSolution] = None
+    sol: Optional[Union[ShortestPathSolution, CompactShortestPathSolution]] = None
     ah_polyhedron_ns: Optional[AH_polytope] = None
     ah_polyhedron_fs: Optional[AH_polytope] = None
+    # Blocks of the path polytopes that the AH polytopes are built from, keyed
+    # by (from nullspace sets, include cost epigraph), see
+    # AHContainmentDominationChecker.get_path_polytope_blocks
+    ah_path_blocks: Optional[Dict[Tuple[bool, bool], "PathPolytopeBlocks"]] = None
+    # Support values of the path AH polytope in the containment prefilter
+    # directions, see AHContainmentDominationChecker._prefiltered_alternates
+    ah_support_values: Optional[np.ndarray] = None
+
+    def __post_init__(self):
+        if not isinstance(self.edge_path, SharedPath):
+            self.edge_path = SharedPath(self.edge_path)
+        if not isinstance(self.vertex_path, SharedPath):
+            self.vertex_path = SharedPath(self.vertex_path)
 
     def __lt__(self, other: "SearchNode"):
         return self.priority < other.priority
 
+    def edge_path_visits(self, vertex_name: str) -> bool:
+        """Whether an edge in the edge path starts or ends at the vertex.
+
+        O(1) for most vertices that are not on the path, see SharedPath."""
+        return len(self.edge_path) > 0 and vertex_name in self.vertex_path
+
     @classmethod
     def from_parent(cls, child_vertex_name: str, parent: "SearchNode"):
-        new_edge = Edge(u=parent.vertex_name, v=child_vertex_name)
+        new_edge_key = Edge.key_from_uv(parent.vertex_name, child_vertex_name)
         return cls(
             priority=None,
             vertex_name=child_vertex_name,
-            edge_path=parent.edge_path.copy() + [new_edge.key],
-            vertex_path=parent.vertex_path.copy() + [child_vertex_name],
+            edge_path=parent.edge_path.extended(new_edge_key),
+            vertex_path=parent.vertex_path.extended(child_vertex_name),
             parent=parent,
         )
 
@@ -311,6 +465,30 @@ class SearchNode:
         state["sol"] = None  # Do not serialize `sol`
         return state
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Checkpoints from before SharedPath store the paths as lists
+        self.__post_init__()
+
+    @property
+    def sol_nbytes(self) -> int:
+        return 0 if self.sol is None else self.sol.nbytes
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the node, not counting the parent, the
+        vertex names (which are shared with the graph) or the AH polytopes.
+
+        Only the last link of each path is counted, since the prefixes
+        are shared with the ancestors."""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.__dict__)
+            + sys.getsizeof(self.edge_path)
+            + sys.getsizeof(self.vertex_path)
+            + self.sol_nbytes
+        )
+
 
 class SearchAlgorithm(ABC):
     """Abstract base class for search algorithms."""
@@ -333,8 +511,29 @@ class SearchAlgorithm(ABC):
     @property
     def alg_metrics(self):
         self._alg_metrics.n_Q = len(self._Q)
+        graph = getattr(self, "_graph", None)
+        if graph is not None and graph.convex_restriction_cache is not None:
+            cache = graph.convex_restriction_cache
+            self._alg_metrics.n_conv_res_cache_hits = cache.n_hits
+            self._alg_metrics.n_conv_res_cache_misses = cache.n_misses
         return self._alg_metrics.update_derived_metrics()
 
+    def update_node_memory_metrics(self) -> None:
+        """Measure the memory held by the nodes in Q and S.
+
+        This walks all the nodes, so it should only be called
+        occasionally.
+        """
+        nodes = {id(entry[0]): entry[0] for entry in self._Q}
+        for S_nodes in getattr(self, "_S", {}).values():
+            nodes.update((id(n), n) for n in S_nodes)
+        if len(nodes) == 0:
+            return
+        self._alg_metrics.node_nbytes_mean = np.mean([n.nbytes for n in nodes.values()])
+        self._alg_metrics.node_sol_nbytes_mean = np.mean(
+            [n.sol_nbytes for n in nodes.values()]
+        )
+
     def log_metrics_to_wandb(self, total_estimated_cost: float):
         if wandb.run is not None:
             wandb.log(
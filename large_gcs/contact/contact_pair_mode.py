@@ -2,6 +2,7 @@ import itertools
 from abc import ABC, abstractmethod
 from copy import copy
 from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Optional, Tuple, Type
 
 import matplotlib.pyplot as plt
@@ -98,7 +99,7 @@ class ContactPairMode(ABC):
         assert len(exprs) > 0
         return exprs
 
-    @property
+    @cached_property
     def id(self) -> str:
         return f"{self.compact_class_name}|{self.body_a.name}_{self.contact_location_a.compact_name}-{self.body_b.name}_{self.contact_location_b.compact_name}"
 
@@ -193,7 +194,7 @@ class RelaxedContactPairMode(ContactPairMode):
         self.contact_location_a.plot(**kwargs)
         self.contact_location_b.plot(**kwargs)
 
-    @property
+    @cached_property
     def id(self) -> str:
         return f"{self.compact_class_name}|{self.body_a.name}-{self.body_b.name}"
 
@@ -1,7 +1,7 @@
 from typing import List
 
 import numpy as np
-from pydrake.all import Formula
+from pydrake.all import Formula, HPolyhedron
 from pydrake.all import Point as DrakePoint
 
 from large_gcs.contact.contact_pair_mode import ContactPairMode
@@ -133,6 +133,26 @@ class ContactSet(ConvexSet):
             additional_base_constraints,
         )
 
+    @classmethod
+    def from_polyhedra(
+        cls,
+        vars: ContactSetDecisionVariables,
+        contact_pair_modes: List[ContactPairMode],
+        polyhedron: Polyhedron,
+        base_polyhedron: HPolyhedron,
+    ):
+        """Construct a contact set from its already compiled polyhedron and
+        base polyhedron, e.g. by a ContactSetTemplate.
+
+        The constraint formulas are not kept, only the numeric sets.
+        """
+        contact_set = cls.__new__(cls)
+        contact_set.vars = vars
+        contact_set.contact_pair_modes = contact_pair_modes
+        contact_set._polyhedron = polyhedron
+        contact_set._base_polyhedron = base_polyhedron
+        return contact_set
+
     @classmethod
     def from_factored_collision_free_body(
         cls,
@@ -213,4 +233,4 @@ class ContactSet(ConvexSet):
 
     @property
     def nullspace_set(self):
-        return self._polyhedron._nullspace_set
+        return self._polyhedron.nullspace_set
@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pydrake.all import Expression, Formula, HPolyhedron, eq
+
+from large_gcs.contact.contact_pair_mode import ContactPairMode, InContactPairMode
+from large_gcs.contact.contact_set import ContactSet
+from large_gcs.contact.contact_set_decision_variables import ContactSetDecisionVariables
+from large_gcs.contact.rigid_body import MobilityType, RigidBody
+from large_gcs.geometry.geometry_utils import AbCdFromConstraints
+from large_gcs.geometry.polyhedron import Polyhedron
+
+
+@dataclass
+class ModeConstraintBlock:
+    """Numeric constraints A x ≤ b, C x = d of a single contact pair mode.
+
+    The columns are the variables shared by all contact sets (positions
+    and actuation forces), followed by the force magnitude of the mode if
+    it is an InContactPairMode.
+    """
+
+    A: np.ndarray
+    b: np.ndarray
+    C: np.ndarray
+    d: np.ndarray
+    # Coefficients of the force magnitude of the mode in the velocity
+    # constraint rows of the set, None if the mode has no force
+    vel_force_col: Optional[np.ndarray] = None
+
+    @property
+    def has_force(self) -> bool:
+        return self.vel_force_col is not None
+
+
+class ContactSetTemplate:
+    """Builds ContactSets for a fixed set of objects and robots from numeric
+    constraint blocks, instead of decomposing the symbolic constraint
+    formulas of every set.
+
+    The variables of a contact set are the positions of the objects and
+    robots, the actuation forces of the robots, and then the force
+    magnitude of each InContactPairMode in the order of the modes. A mode
+    therefore contributes the same rows to every set it is in, and only
+    the column of its force magnitude depends on the set. The rows of
+    each mode are decomposed once, on first use, and sets are assembled
+    by stacking the blocks of their modes and scattering the force
+    magnitude columns.
+
+    The resulting sets are identical (including the order of the rows) to
+    the ones built by ContactSet.from_objs_robs with the velocity
+    constraints of ContactGraph and the given workspace constraints.
+    """
+
+    def __init__(
+        self,
+        objects: List[RigidBody],
+        robots: List[RigidBody],
+        workspace_constraints: List[Formula],
+        base_workspace_constraints: List[Formula],
+    ):
+        self.objects = objects
+        self.robots = robots
+        bodies = objects + robots
+
+        self._fixed_vars = np.concatenate(
+            (
+                np.array([body.vars_pos for body in bodies]).flatten(),
+                np.array([body.vars_force_act for body in robots]).flatten(),
+            )
+        )
+        self._base_vars = np.array([body.vars_base_pos for body in bodies]).flatten()
+
+        # Velocity constraints of each movable body, without the contact
+        # forces, which are added by the modes in contact.
+        self._vel_rows: Dict[str, slice] = {}
+        vel_constraints = []
+        for body in bodies:
+            force_sum = np.full((body.dim,), Expression())
+            if body.mobility_type == MobilityType.ACTUATED:
+                force_sum = force_sum + body.vars_force_act
+            body_vel_constraints = eq(body.vars_vel, force_sum).tolist()
+            self._vel_rows[body.name] = slice(
+                len(vel_constraints), len(vel_constraints) + len(body_vel_constraints)
+            )
+            vel_constraints.extend(body_vel_constraints)
+        _, _, self._vel_C, self._vel_d = AbCdFromConstraints(
+            vel_constraints, self._fixed_vars
+        )
+        self._workspace_A, self._workspace_b, _, _ = AbCdFromConstraints(
+            workspace_constraints, self._fixed_vars
+        )
+        (
+            self._base_workspace_A,
+            self._base_workspace_b,
+            self._base_workspace_C,
+            self._base_workspace_d,
+        ) = AbCdFromConstraints(base_workspace_constraints, self._base_vars)
+
+        self._mode_blocks: Dict[str, ModeConstraintBlock] = {}
+        self._mode_base_blocks: Dict[str, ModeConstraintBlock] = {}
+
+    def get_mode_block(self, mode: ContactPairMode) -> ModeConstraintBlock:
+        block = self._mode_blocks.get(mode.id)
+        if block is None:
+            block = self._create_mode_block(mode)
+            self._mode_blocks[mode.id] = block
+        return block
+
+    def get_mode_base_block(self, mode: ContactPairMode) -> ModeConstraintBlock:
+        """The base constraints of the mode over the base positions."""
+        block = self._mode_base_blocks.get(mode.id)
+        if block is None:
+            block = ModeConstraintBlock(
+                *AbCdFromConstraints(mode.base_constraint_formulas, self._base_vars)
+            )
+            self._mode_base_blocks[mode.id] = block
+        return block
+
+    def _create_mode_block(self, mode: ContactPairMode) -> ModeConstraintBlock:
+        if not isinstance(mode, InContactPairMode):
+            return ModeConstraintBlock(
+                *AbCdFromConstraints(mode.constraint_formulas, self._fixed_vars)
+            )
+        variables = np.append(self._fixed_vars, mode.vars_force_mag_AB)
+        # The contact force acts on body_b along the unit normal and on
+        # body_a against it. The velocity rows are vel - force_sum = 0.
+        vel_force_col = np.zeros(self._vel_C.shape[0])
+        for body, sign in ((mode.body_a, 1), (mode.body_b, -1)):
+            rows = self._vel_rows.get(body.name)
+            if rows is not None:
+                vel_force_col[rows] = np.broadcast_to(
+                    sign * mode.unit_normal, (rows.stop - rows.start,)
+                )
+        return ModeConstraintBlock(
+            *AbCdFromConstraints(mode.constraint_formulas, variables),
+            vel_force_col=vel_force_col,
+        )
+
+    def create_contact_set(
+        self, contact_pair_modes: List[ContactPairMode]
+    ) -> ContactSet:
+        blocks = [self.get_mode_block(mode) for mode in contact_pair_modes]
+        n_fixed = len(self._fixed_vars)
+        # Column of the force magnitude of each mode
+        force_cols = []
+        n_vars = n_fixed
+        for block in blocks:
+            force_cols.append(n_vars if block.has_force else None)
+            n_vars += block.has_force
+
+        def stack(mode_mats, mode_vecs, extra_mat, extra_vec):
+            n_rows = sum(len(vec) for vec in mode_vecs) + len(extra_vec)
+            M = np.zeros((n_rows, n_vars))
+            row = 0
+            for mat, col in zip(mode_mats, force_cols):
+                M[row : row + len(mat), :n_fixed] = mat[:, :n_fixed]
+                if col is not None:
+                    M[row : row + len(mat), col] = mat[:, n_fixed]
+                row += len(mat)
+            M[row:, :n_fixed] = extra_mat
+            return M, np.concatenate(mode_vecs + [extra_vec])
+
+        A, b = stack(
+            [block.A for block in blocks],
+            [block.b for block in blocks],
+            self._workspace_A,
+            self._workspace_b,
+        )
+        C, d = stack(
+            [block.C for block in blocks],
+            [block.d for block in blocks],
+            self._vel_C,
+            self._vel_d,
+        )
+        # Contact forces in the velocity rows
+        vel_C = C[len(C) - len(self._vel_d) :]
+        for block, col in zip(blocks, force_cols):
+            if col is not None:
+                vel_C[:, col] = block.vel_force_col
+
+        polyhedron = Polyhedron.from_separated_constraints(
+            *_none_if_empty(A, b), *_none_if_empty(C, d)
+        )
+        base_polyhedron = HPolyhedron(
+            *self.base_rows(contact_pair_modes, should_incl_workspace=True)
+        )
+        vars = ContactSetDecisionVariables.from_contact_pair_modes(
+            self.objects, self.robots, contact_pair_modes
+        )
+        assert len(vars.all) == n_vars
+        return ContactSet.from_polyhedra(
+            vars, contact_pair_modes, polyhedron, base_polyhedron
+        )
+
+    def base_rows(
+        self,
+        contact_pair_modes: List[ContactPairMode],
+        should_incl_workspace: bool = True,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns H, h of the base polyhedron {x| H x ≤ h} of the modes,
+        with the rows in the order of HPolyhedronFromConstraints."""
+        blocks = [self.get_mode_base_block(mode) for mode in contact_pair_modes]
+        As = [block.A for block in blocks]
+        bs = [block.b for block in blocks]
+        Cs = [block.C for block in blocks]
+        ds = [block.d for block in blocks]
+        if should_incl_workspace:
+            As.append(self._base_workspace_A)
+            bs.append(self._base_workspace_b)
+            Cs.append(self._base_workspace_C)
+            ds.append(self._base_workspace_d)
+        C = np.vstack(Cs)
+        d = np.concatenate(ds)
+        H = np.vstack(As + [C, -C])
+        h = np.concatenate(bs + [d, -d])
+        return H, h
+
+
+def _none_if_empty(M: np.ndarray, v: np.ndarray):
+    if len(v) == 0:
+        return None, None
+    return M, v
@@ -1,7 +1,7 @@
 import ast
 import logging
 import re
-from typing import List
+from typing import Dict, List, Tuple
 
 import numpy as np
 from tqdm import tqdm
@@ -83,6 +83,9 @@ class FactoredCollisionFreeCE(CostEstimator):
         # Look up table of cfree vertex name to cfree cost
         self._cfree_cost = {}
         self._cfree_init_pos = {}
+        # The same vertices are converted every time they are explored, so
+        # each name is only parsed once
+        self._cfree_vertex_names: Dict[str, Tuple[str, ...]] = {}
 
     def setup_subgraph(self, subgraph: Graph):
         if self._use_combined_gcs:
@@ -117,7 +120,9 @@ class FactoredCollisionFreeCE(CostEstimator):
                 # First do feasibility check with solve convex restriction
                 sol = subgraph.solve_convex_restriction(conv_res_active_edges)
                 if sol.is_success:
-                    self._alg_metrics.update_after_gcs_solve(sol.time)
+                    self._alg_metrics.update_after_gcs_solve(
+                        sol.time, is_cached=sol.is_cached
+                    )
 
                     self._connect_vertex_to_cfree_subgraphs(subgraph, neighbor)
                     sol = subgraph.solve_factored_partial_convex_restriction(
@@ -141,7 +146,7 @@ class FactoredCollisionFreeCE(CostEstimator):
                     use_convex_relaxation=use_convex_relaxation
                 )
 
-        self._alg_metrics.update_after_gcs_solve(sol.time)
+        self._alg_metrics.update_after_gcs_solve(sol.time, is_cached=sol.is_cached)
         # Clean up
         if not neighbor_is_target:
             subgraph.remove_vertex(neighbor)
@@ -170,7 +175,7 @@ class FactoredCollisionFreeCE(CostEstimator):
     ) -> None:
         # Add outgoing edges from transition vertex
         for i, cfree_vertex_name in enumerate(
-            self.convert_to_cfree_vertex_names(vertex_name)
+            self._get_cfree_vertex_names(vertex_name)
         ):
             if i not in self._cfree_graphs:
                 continue
@@ -195,9 +200,7 @@ class FactoredCollisionFreeCE(CostEstimator):
 
         # Calculate or look up the collision free cost for each body
         cfree_cost = 0
-        for i, cfree_vertex_name in enumerate(
-            self.convert_to_cfree_vertex_names(neighbor)
-        ):
+        for i, cfree_vertex_name in enumerate(self._get_cfree_vertex_names(neighbor)):
             if i not in self._cfree_graphs:
                 continue
 
@@ -268,8 +271,19 @@ class FactoredCollisionFreeCE(CostEstimator):
             return None
 
     @staticmethod
-    def convert_to_cfree_vertex_names(vertex_name: str):
+    def convert_to_cfree_vertex_names(vertex_name: str) -> List[str]:
         """Works for full vertex names, and relaxed contact vertex names."""
+        return list(FactoredCollisionFreeCE._parse_cfree_vertex_names(vertex_name))
+
+    def _get_cfree_vertex_names(self, vertex_name: str) -> Tuple[str, ...]:
+        if vertex_name not in self._cfree_vertex_names:
+            self._cfree_vertex_names[vertex_name] = self._parse_cfree_vertex_names(
+                vertex_name
+            )
+        return self._cfree_vertex_names[vertex_name]
+
+    @staticmethod
+    def _parse_cfree_vertex_names(vertex_name: str) -> Tuple[str, ...]:
         # Convert string representation of tuple to actual tuple
         tuple_vertex = ast.literal_eval(vertex_name)
 
@@ -306,7 +320,7 @@ class FactoredCollisionFreeCE(CostEstimator):
             vertex_res.append(str(tuple(modes)))
         for entity_num, modes in rob_modes.items():
             vertex_res.append(str(tuple(modes)))
-        return vertex_res
+        return tuple(vertex_res)
 
     @property
     def finger_print(self) -> str:
@@ -1,5 +1,7 @@
 import logging
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
 
 from large_gcs.contact.contact_set import ContactPointSet, ContactSet
 from large_gcs.cost_estimators.cost_estimator import CostEstimator
@@ -10,6 +12,11 @@ from large_gcs.graph.contact_cost_constraint_factory import (
 from large_gcs.graph.graph import Edge, Graph, ShortestPathSolution
 from large_gcs.utils.hydra_utils import get_function_from_string
 
+if TYPE_CHECKING:
+    from large_gcs.graph.convex_restriction_solve_service import (
+        ConvexRestrictionSolveService,
+    )
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +43,12 @@ class ShortcutEdgeCE(CostEstimator):
         self._graph = graph
         self._shortcut_edge_cost_factory = shortcut_edge_cost_factory
         self._add_const_cost = add_const_cost
+        self._solve_service = None
+
+    def set_solve_service(self, solve_service: "ConvexRestrictionSolveService"):
+        """Solve batched estimates on the replicas of a solve service instead
+        of the graph."""
+        self._solve_service = solve_service
 
     def estimate_cost_on_graph(
         self,
@@ -44,56 +57,37 @@ class ShortcutEdgeCE(CostEstimator):
         active_edges: List[Edge] = None,
         solve_convex_restriction: bool = False,
         use_convex_relaxation: bool = False,
+        initial_guess: Optional[Dict[str, np.ndarray]] = None,
+    ) -> ShortestPathSolution:
+        sol = self.solve_on_graph(
+            graph,
+            edge,
+            active_edges,
+            solve_convex_restriction,
+            use_convex_relaxation,
+            initial_guess,
+        )
+        self._alg_metrics.update_after_gcs_solve(
+            sol.time, sol.n_iterations, sol.is_warm_started, sol.is_cached
+        )
+        return sol
+
+    def solve_on_graph(
+        self,
+        graph: Graph,
+        edge: Edge,
+        active_edges: List[Edge] = None,
+        solve_convex_restriction: bool = False,
+        use_convex_relaxation: bool = False,
+        initial_guess: Optional[Dict[str, np.ndarray]] = None,
     ) -> ShortestPathSolution:
+        """estimate_cost_on_graph without updating the metrics."""
         neighbor = edge.v
 
         # Check if this neighbor is the target to see if shortcut edge is required
         add_shortcut_edge = neighbor != self._graph.target_name
         if add_shortcut_edge:
-            # Add an edge from the neighbor to the target
-            direct_edge_costs = None
-            if self._shortcut_edge_cost_factory:
-                if isinstance(
-                    graph.vertices[neighbor].convex_set, ContactSet
-                ) or isinstance(graph.vertices[neighbor], ContactPointSet):
-                    # Only ContactSet and ContactPointSet have the vars attribute
-                    # convex_sets in general do not.
-                    if (
-                        self._shortcut_edge_cost_factory
-                        is contact_shortcut_edge_l1_norm_plus_switches_cost_factory_under
-                        or self._shortcut_edge_cost_factory
-                        is contact_shortcut_edge_l1_norm_plus_switches_cost_factory_over
-                    ):
-                        direct_edge_costs = self._shortcut_edge_cost_factory(
-                            u_vars=self._graph.vertices[neighbor].convex_set.vars,
-                            v_vars=self._graph.vertices[
-                                self._graph.target_name
-                            ].convex_set.vars,
-                            n_switches=self._graph.num_modes_not_adj_to_target(
-                                neighbor
-                            ),
-                        )
-                    else:
-                        direct_edge_costs = self._shortcut_edge_cost_factory(
-                            u_vars=self._graph.vertices[neighbor].convex_set.vars,
-                            v_vars=self._graph.vertices[
-                                self._graph.target_name
-                            ].convex_set.vars,
-                            add_const_cost=self._add_const_cost,
-                        )
-
-                else:
-                    direct_edge_costs = self._shortcut_edge_cost_factory(
-                        self._graph.vertices[self._graph.target_name].convex_set.dim,
-                        add_const_cost=self._add_const_cost,
-                    )
-            edge_to_target = Edge(
-                u=neighbor,
-                v=self._graph.target_name,
-                key_suffix="shortcut",
-                costs=direct_edge_costs,
-            )
-            graph.add_edge(edge_to_target)
+            edge_to_target = self._add_shortcut_edge(graph, neighbor)
             conv_res_active_edges = active_edges + [edge.key, edge_to_target.key]
         else:
             conv_res_active_edges = active_edges + [edge.key]
@@ -101,13 +95,13 @@ class ShortcutEdgeCE(CostEstimator):
         if solve_convex_restriction:
             # If used shortcut edge, do not parse the full result since we won't use the solution.
             sol = graph.solve_convex_restriction(
-                conv_res_active_edges, skip_post_solve=add_shortcut_edge
+                conv_res_active_edges,
+                skip_post_solve=add_shortcut_edge,
+                initial_guess=initial_guess,
             )
         else:
             sol = graph.solve_shortest_path(use_convex_relaxation=use_convex_relaxation)
 
-        self._alg_metrics.update_after_gcs_solve(sol.time)
-
         # Clean up
         if add_shortcut_edge:
             logger.debug(f"Removing edge {edge_to_target.key}")
@@ -115,6 +109,119 @@ class ShortcutEdgeCE(CostEstimator):
 
         return sol
 
+    def estimate_costs_on_graph(
+        self,
+        graph: Graph,
+        edges: List[Edge],
+        active_edges: List[Edge] = None,
+    ) -> List[ShortestPathSolution]:
+        """Batched version of estimate_cost_on_graph with
+        solve_convex_restriction, which solves the convex restrictions
+        through all the edges in one parallel call."""
+        if self._solve_service is not None:
+            return self._estimate_costs_on_solve_service(graph, edges, active_edges)
+
+        sols: List[Optional[ShortestPathSolution]] = [None] * len(edges)
+        shortcut_edges = []
+        batch_idxs = []
+        batch_paths = []
+        for i, edge in enumerate(edges):
+            if edge.v == self._graph.target_name:
+                # The solution to the target is parsed fully and post processed
+                sols[i] = self.estimate_cost_on_graph(
+                    graph, edge, active_edges, solve_convex_restriction=True
+                )
+                continue
+            edge_to_target = self._add_shortcut_edge(graph, edge.v)
+            shortcut_edges.append(edge_to_target)
+            batch_idxs.append(i)
+            batch_paths.append(active_edges + [edge.key, edge_to_target.key])
+
+        if len(batch_paths) > 0:
+            batch_sols = graph.solve_convex_restrictions(batch_paths)
+            for i, sol in zip(batch_idxs, batch_sols):
+                self._alg_metrics.update_after_gcs_solve(sol.time, sol.n_iterations)
+                sols[i] = sol
+
+        # Clean up
+        for edge_to_target in shortcut_edges:
+            logger.debug(f"Removing edge {edge_to_target.key}")
+            graph.remove_edge(edge_to_target.key)
+
+        return sols
+
+    def _estimate_costs_on_solve_service(
+        self,
+        graph: Graph,
+        edges: List[Edge],
+        active_edges: List[Edge] = None,
+    ) -> List[ShortestPathSolution]:
+        sols: List[Optional[ShortestPathSolution]] = [None] * len(edges)
+        batch_idxs = []
+        jobs = []
+        for i, edge in enumerate(edges):
+            if edge.v == self._graph.target_name:
+                # The solution to the target is post processed on this graph
+                sols[i] = self.estimate_cost_on_graph(
+                    graph, edge, active_edges, solve_convex_restriction=True
+                )
+                continue
+            batch_idxs.append(i)
+            jobs.append((edge.key, active_edges))
+
+        if len(jobs) > 0:
+            for i, sol in zip(batch_idxs, self._solve_service.solve(jobs)):
+                self._alg_metrics.update_after_gcs_solve(sol.time, sol.n_iterations)
+                sols[i] = sol
+        return sols
+
+    def _add_shortcut_edge(self, graph: Graph, neighbor: str) -> Edge:
+        """Add an edge from the neighbor to the target."""
+        direct_edge_costs = None
+        if self._shortcut_edge_cost_factory:
+            if isinstance(
+                graph.vertices[neighbor].convex_set, ContactSet
+            ) or isinstance(graph.vertices[neighbor], ContactPointSet):
+                # Only ContactSet and ContactPointSet have the vars attribute
+                # convex_sets in general do not.
+                if (
+                    self._shortcut_edge_cost_factory
+                    is contact_shortcut_edge_l1_norm_plus_switches_cost_factory_under
+                    or self._shortcut_edge_cost_factory
+                    is contact_shortcut_edge_l1_norm_plus_switches_cost_factory_over
+                ):
+                    direct_edge_costs = self._graph.compiled_costs_constraints.get(
+                        self._shortcut_edge_cost_factory,
+                        u_vars=self._graph.vertices[neighbor].convex_set.vars,
+                        v_vars=self._graph.vertices[
+                            self._graph.target_name
+                        ].convex_set.vars,
+                        n_switches=self._graph.num_modes_not_adj_to_target(neighbor),
+                    )
+                else:
+                    direct_edge_costs = self._graph.compiled_costs_constraints.get(
+                        self._shortcut_edge_cost_factory,
+                        u_vars=self._graph.vertices[neighbor].convex_set.vars,
+                        v_vars=self._graph.vertices[
+                            self._graph.target_name
+                        ].convex_set.vars,
+                        add_const_cost=self._add_const_cost,
+                    )
+
+            else:
+                direct_edge_costs = self._shortcut_edge_cost_factory(
+                    self._graph.vertices[self._graph.target_name].convex_set.dim,
+                    add_const_cost=self._add_const_cost,
+                )
+        edge_to_target = Edge(
+            u=neighbor,
+            v=self._graph.target_name,
+            key_suffix="shortcut",
+            costs=direct_edge_costs,
+        )
+        graph.add_edge(edge_to_target)
+        return edge_to_target
+
     def estimate_cost(
         self,
         subgraph: Graph,
@@ -174,7 +281,7 @@ class ShortcutEdgeCE(CostEstimator):
                 use_convex_relaxation=use_convex_relaxation
             )
 
-        self._alg_metrics.update_after_gcs_solve(sol.time)
+        self._alg_metrics.update_after_gcs_solve(sol.time, is_cached=sol.is_cached)
 
         # Clean up
         if neighbor != self._graph.target_name:
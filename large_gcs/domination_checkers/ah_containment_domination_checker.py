@@ -1,9 +1,14 @@
+import itertools
 import logging
-from typing import List, Tuple
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import DefaultDict, List, Optional, Tuple
 
 import numpy as np
 import pypolycontain as pp
 import scipy
+import scipy.sparse as sp
 from pydrake.all import (
     AffineSubspace,
     ClpSolver,
@@ -22,7 +27,14 @@ from pydrake.all import (
 )
 
 from large_gcs.algorithms.search_algorithm import AlgMetrics, SearchNode, profile_method
+from large_gcs.domination_checkers.containment_memo import ContainmentMemo, path_key
 from large_gcs.domination_checkers.domination_checker import DominationChecker
+from large_gcs.geometry.ah_containment_lp import (
+    ContainmentLP,
+    may_be_contained_in,
+    prefilter_directions,
+    support_values,
+)
 from large_gcs.geometry.geometry_utils import (
     create_selection_matrix,
     remove_rows_near_zero,
@@ -34,16 +46,200 @@ from large_gcs.graph.graph import Graph
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _LocalBlock:
+    """Constraints A [x; s] <= b and linear cost c^T [x; s] + c_0 of a single
+    vertex or edge, over the variables x of the vertices it touches (in
+    order, n_x_parts columns each) followed by its own slack variables s."""
+
+    A: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+    c_0: float
+    n_x_parts: Tuple[int, ...]
+
+    @property
+    def n_x(self) -> int:
+        return sum(self.n_x_parts)
+
+    @classmethod
+    def from_prog(
+        cls, prog: MathematicalProgram, n_x_parts: Tuple[int, ...]
+    ) -> "_LocalBlock":
+        """The variables of prog must be the x parts followed by the slack
+        variables, in the order they were created."""
+        n = prog.num_vars()
+        if len(prog.GetAllConstraints()) > 0:
+            h_poly = HPolyhedron(prog)
+            A, b = h_poly.A(), h_poly.b()
+        else:
+            A, b = np.zeros((0, n)), np.zeros(0)
+        c = np.zeros(n)
+        c_0 = 0.0
+        for binding in prog.GetAllCosts():
+            cost = binding.evaluator()
+            if not isinstance(cost, LinearCost):
+                raise NotImplementedError(
+                    f"Only linear costs are supported for now, {cost} not supported"
+                )
+            indices = prog.FindDecisionVariableIndices(binding.variables())
+            np.add.at(c, indices, cost.a())
+            c_0 += cost.b()
+        return cls(A, b, c, c_0, n_x_parts)
+
+
+def _shifted_csr(A: np.ndarray, col_offset: int, n_cols: int) -> sp.csr_matrix:
+    """A as a sparse matrix with n_cols columns, starting at column
+    col_offset."""
+    A = sp.coo_matrix(A)
+    return sp.csr_matrix(
+        (A.data, (A.row, A.col + col_offset)), shape=(A.shape[0], n_cols)
+    )
+
+
+def _with_n_cols(A: sp.csr_matrix, n_cols: int) -> sp.csr_matrix:
+    return sp.csr_matrix((A.data, A.indices, A.indptr), shape=(A.shape[0], n_cols))
+
+
+@dataclass
+class PathPolytopeBlocks:
+    """Sparse constraints A_x x + A_s s <= b and linear cost
+    c_x^T x + c_s^T s + c_0 of the program of a path.
+
+    x are the variables of the vertices of the path in order (their
+    nullspace coordinates if the path is constructed from nullspace sets)
+    and s are the slack variables of the l1 norm costs. The blocks of a
+    child path are those of its parent, with the rows and variables of
+    the new vertex and of the edge to it appended (see extended), so the
+    blocks of a search node are built from those of its parent.
+    """
+
+    A_x: sp.csr_matrix
+    A_s: sp.csr_matrix
+    b: np.ndarray
+    c_x: np.ndarray
+    c_s: np.ndarray
+    c_0: float
+    # Number of variables of the last vertex, which are the last ones in x
+    last_x_dim: int
+    # Sum of the ambient dimensions of the vertices of the path
+    full_x_dim: int
+
+    @property
+    def n_x(self) -> int:
+        return self.A_x.shape[1]
+
+    @property
+    def n_s(self) -> int:
+        return self.A_s.shape[1]
+
+    @classmethod
+    def from_vertex(
+        cls, vertex_block: _LocalBlock, ambient_dim: int
+    ) -> "PathPolytopeBlocks":
+        (n_x,) = vertex_block.n_x_parts
+        return cls(
+            A_x=sp.csr_matrix(vertex_block.A[:, :n_x]),
+            A_s=sp.csr_matrix(vertex_block.A[:, n_x:]),
+            b=vertex_block.b,
+            c_x=vertex_block.c[:n_x],
+            c_s=vertex_block.c[n_x:],
+            c_0=vertex_block.c_0,
+            last_x_dim=n_x,
+            full_x_dim=ambient_dim,
+        )
+
+    def extended(
+        self, vertex_block: _LocalBlock, edge_block: _LocalBlock, ambient_dim: int
+    ) -> "PathPolytopeBlocks":
+        """The blocks of the path extended by an edge from the last vertex
+        to a new vertex."""
+        (dv,) = vertex_block.n_x_parts
+        du, dv_edge = edge_block.n_x_parts
+        assert du == self.last_x_dim and dv_edge == dv
+        u_start, v_start = self.n_x - du, self.n_x
+        n_x = self.n_x + dv
+        vertex_s_start = self.n_s
+        edge_s_start = vertex_s_start + vertex_block.A.shape[1] - dv
+        n_s = edge_s_start + edge_block.A.shape[1] - du - dv
+
+        A_x = sp.vstack(
+            [
+                _with_n_cols(self.A_x, n_x),
+                _shifted_csr(vertex_block.A[:, :dv], v_start, n_x),
+                _shifted_csr(edge_block.A[:, :du], u_start, n_x)
+                + _shifted_csr(edge_block.A[:, du : du + dv], v_start, n_x),
+            ],
+            format="csr",
+        )
+        A_s = sp.vstack(
+            [
+                _with_n_cols(self.A_s, n_s),
+                _shifted_csr(vertex_block.A[:, dv:], vertex_s_start, n_s),
+                _shifted_csr(edge_block.A[:, du + dv :], edge_s_start, n_s),
+            ],
+            format="csr",
+        )
+        c_x = np.concatenate((self.c_x, vertex_block.c[:dv]))
+        c_x[u_start:v_start] += edge_block.c[:du]
+        c_x[v_start:] += edge_block.c[du : du + dv]
+        return PathPolytopeBlocks(
+            A_x=A_x,
+            A_s=A_s,
+            b=np.concatenate((self.b, vertex_block.b, edge_block.b)),
+            c_x=c_x,
+            c_s=np.concatenate(
+                (self.c_s, vertex_block.c[dv:], edge_block.c[du + dv :])
+            ),
+            c_0=self.c_0 + vertex_block.c_0 + edge_block.c_0,
+            last_x_dim=dv,
+            full_x_dim=self.full_x_dim + ambient_dim,
+        )
+
+    def to_dense(self, include_cost_epigraph: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """H, h of the path polytope over [x, s], or [x, s, cost] with the
+        cost epigraph constraint c_x^T x + c_s^T s + c_0 <= cost as the
+        last row if include_cost_epigraph."""
+        H = np.hstack((self.A_x.toarray(), self.A_s.toarray()))
+        if not include_cost_epigraph:
+            return H, self.b
+        cost_row = np.concatenate((self.c_x, self.c_s, [-1]))
+        H = np.vstack((np.hstack((H, np.zeros((H.shape[0], 1)))), cost_row))
+        return H, np.append(self.b, -self.c_0)
+
+
 class AHContainmentDominationChecker(DominationChecker):
     def __init__(
         self,
         graph: Graph,
         containment_condition: int = -1,
         construct_path_from_nullspaces=False,
+        containment_lp_solver: str = "highs",
+        should_memoize_containment: bool = False,
+        should_prefilter_containment: bool = False,
+        n_prefilter_directions: int = 4,
     ):
         super().__init__(graph=graph)
         self._containment_condition = containment_condition
         self._construct_path_from_nullspaces = construct_path_from_nullspaces
+        # Only used for the sufficient condition (containment_condition -1),
+        # the other conditions are solved with Gurobi
+        self._containment_lp_solver = containment_lp_solver
+        # Record the containment results between paths to each vertex, and
+        # skip the checks that they already decide
+        self._should_memoize_containment = should_memoize_containment
+        self._containment_memos: DefaultDict[str, ContainmentMemo] = defaultdict(
+            ContainmentMemo
+        )
+        # Skip the containment checks against alternates whose bounding box
+        # or support values in n_prefilter_directions random directions
+        # are exceeded by the candidate's
+        self._should_prefilter_containment = should_prefilter_containment
+        self._n_prefilter_directions = n_prefilter_directions
+        # Blocks of the path polytopes of single vertices and edges, keyed by
+        # (name, from nullspace sets)
+        self._vertex_blocks = {}
+        self._edge_blocks = {}
 
     def set_alg_metrics(self, alg_metrics: AlgMetrics):
         self._alg_metrics = alg_metrics
@@ -55,6 +251,7 @@ class AHContainmentDominationChecker(DominationChecker):
             ],
             "is_contained_in": [
                 "_solve_containment_prog",
+                "_solve_containment_lp",
             ],
         }
         alg_metrics.update_method_call_structure(call_structure)
@@ -68,20 +265,118 @@ class AHContainmentDominationChecker(DominationChecker):
             f"Checking domination of candidate node terminating at vertex {candidate_node.vertex_name}"
             f"\n via path: {candidate_node.vertex_path}"
         )
-        AH_n = self._maybe_create_path_AH_polytope(candidate_node)
-        # logger.debug(f"{AH_n.P.H.shape}")
+        alternate_nodes = self._prefiltered_alternates(
+            candidate_node, self._ordered_alternates(candidate_node, alternate_nodes)
+        )
         for alt_n in alternate_nodes:
             logger.debug(
                 f"Checking if candidate node is dominated by alternate node with path:"
                 f"{alt_n.vertex_path}"
             )
-            # Might have been added based on the sample so AH Polyhedron might not have been created yet.
-            AH_alt = self._maybe_create_path_AH_polytope(alt_n)
-            if self.is_contained_in(AH_n, AH_alt):
+            if self.is_path_contained_in(candidate_node, alt_n):
                 return True
         return False
 
+    def is_path_contained_in(self, node: SearchNode, alt_node: SearchNode) -> bool:
+        """Checks if the path polytope of node is contained in that of
+        alt_node, which must end at the same vertex.
+
+        With should_memoize_containment, the result is looked up in (or
+        inferred from) the containment results recorded for the vertex
+        before solving a containment program, and recorded afterwards.
+        If the containment program could not be solved, the path is not
+        considered contained and nothing is recorded.
+        """
+        if not self._should_memoize_containment:
+            return bool(self._is_path_contained_in(node, alt_node))
+
+        memo = self._containment_memos[node.vertex_name]
+        key, alt_key = path_key(node), path_key(alt_node)
+        result = memo.get(key, alt_key)
+        if result is not None:
+            self._alg_metrics.n_containment_memo_hits += 1
+            return result
+        result = memo.infer(key, alt_key)
+        if result is not None:
+            self._alg_metrics.n_containment_memo_inferred += 1
+        else:
+            result = self._is_path_contained_in(node, alt_node)
+            if result is None:
+                return False
+        memo.add(key, alt_key, result)
+        return result
+
+    def _is_path_contained_in(
+        self, node: SearchNode, alt_node: SearchNode
+    ) -> Optional[bool]:
+        # Might have been added based on the sample so AH Polyhedron might not have been created yet.
+        AH_n = self._maybe_create_path_AH_polytope(node)
+        AH_alt = self._maybe_create_path_AH_polytope(alt_node)
+        return self.is_contained_in(AH_n, AH_alt)
+
+    def _ordered_alternates(
+        self, candidate_node: SearchNode, alternate_nodes: List[SearchNode]
+    ) -> List[SearchNode]:
+        """With should_memoize_containment, the alternate nodes that are
+        known to contain the most paths come first.
+
+        Checking those first is more likely to find one that dominates the
+        candidate early, and if it does not, the candidate is known not to
+        be contained in the paths that it contains, so their checks are
+        skipped."""
+        if not self._should_memoize_containment:
+            return alternate_nodes
+        memo = self._containment_memos[candidate_node.vertex_name]
+        return sorted(alternate_nodes, key=lambda n: -memo.n_contained_in(path_key(n)))
+
+    def _prefiltered_alternates(
+        self, candidate_node: SearchNode, alternate_nodes: List[SearchNode]
+    ) -> List[SearchNode]:
+        """With should_prefilter_containment, drops the alternate nodes that
+        cannot contain the candidate.
+
+        A path polytope can only be contained in another if none of its
+        support values exceeds the other's, so the support values of each
+        path polytope are computed once (a small LP per direction) and
+        cached on the node, and compared for all alternates at once.
+        Since the containment programs only certify actual containment,
+        the dropped checks would have failed.
+        """
+        if not self._should_prefilter_containment or len(alternate_nodes) == 0:
+            return alternate_nodes
+        may_contain = may_be_contained_in(
+            self._get_support_values(candidate_node),
+            np.array([self._get_support_values(alt_n) for alt_n in alternate_nodes]),
+        )
+        self._alg_metrics.n_containment_prefilter_checks += len(alternate_nodes)
+        self._alg_metrics.n_containment_prefilter_rejections += int(
+            np.sum(~may_contain)
+        )
+        if self._should_memoize_containment:
+            memo = self._containment_memos[candidate_node.vertex_name]
+            key = path_key(candidate_node)
+            for alt_n in itertools.compress(alternate_nodes, ~may_contain):
+                memo.add(key, path_key(alt_n), False)
+        return list(itertools.compress(alternate_nodes, may_contain))
+
+    def _get_support_values(self, node: SearchNode) -> np.ndarray:
+        if node.ah_support_values is None:
+            AH = self._maybe_create_path_AH_polytope(node)
+            directions = prefilter_directions(
+                AH.T.shape[0], self._n_prefilter_directions
+            )
+            node.ah_support_values = support_values(AH, directions)
+        return node.ah_support_values
+
     def _maybe_create_path_AH_polytope(self, node: SearchNode):
+        if node.ah_polyhedron_ns is None and node.ah_polyhedron_fs is None:
+            start_time = time.time()
+            result = self._create_path_AH_polytope(node)
+            self._alg_metrics.update_after_ah_polytope_build(time.time() - start_time)
+            return result
+        return self._create_path_AH_polytope(node)
+
+    def _create_path_AH_polytope(self, node: SearchNode):
         if self._construct_path_from_nullspaces:
             if node.ah_polyhedron_ns is not None:
                 return node.ah_polyhedron_ns
@@ -127,9 +422,18 @@ class AHContainmentDominationChecker(DominationChecker):
     @profile_method
     def is_contained_in(
         self, AH_X: pp.objects.AH_polytope, AH_Y: pp.objects.AH_polytope
-    ) -> bool:
+    ) -> Optional[bool]:
+        """Whether X is contained in Y, None if the containment LP could not
+        be solved."""
         logger.debug(f"Checking containment")
 
+        if self._containment_condition < 0:
+            # The sufficient condition is an LP that is built directly as
+            # sparse matrices
+            return self._solve_containment_lp(
+                ContainmentLP.from_AH_polytopes(AH_X, AH_Y)
+            )
+
         prog = MathematicalProgram()
 
         # https://github.com/sadraddini/pypolycontain/blob/master/pypolycontain/containment.py#L123
@@ -159,14 +463,7 @@ class AHContainmentDominationChecker(DominationChecker):
 
         AH_X, AH_Y = self._create_AH_polytopes(K_x, k_x, T_x, t_x, K_y, k_y, T_y, t_y)
 
-        prog = MathematicalProgram()
-
-        # https://github.com/sadraddini/pypolycontain/blob/master/pypolycontain/containment.py#L123
-        # -1 for sufficient condition
-        # pick `0` for necessary and sufficient encoding (may be too slow) (2019b)
-        pp.subset(prog, AH_X, AH_Y, self._containment_condition)
-
-        return self._solve_containment_prog(prog)
+        return self.is_contained_in(AH_X, AH_Y)
 
     def _nullspace_polyhedron_and_transformation_from_HPoly_and_T(
         self, h_poly: HPolyhedron, T: np.ndarray, t: np.ndarray = None
@@ -236,9 +533,11 @@ class AHContainmentDominationChecker(DominationChecker):
         logger.debug(f"create_path_AH_polytope_from_nullspace_sets")
         # import pdb
         # pdb.set_trace()
-        prog, full_dim = self.get_nullspace_path_mathematical_program(node)
-        # logger.debug(f"full_dim: {full_dim}")
-        h_poly = HPolyhedron(prog)
+        blocks = self.get_path_polytope_blocks(node, from_nullspace_sets=True)
+        H, h = blocks.to_dense(self.include_cost_epigraph)
+        # The dimension of the path polytope constructed from the full sets
+        full_dim = H.shape[1] - blocks.n_x + blocks.full_x_dim
+        h_poly = HPolyhedron(H, h)
         # logger.debug(f"path prog is empty: {h_poly.IsEmpty()}")
         T_H, t_H = self.get_nullspace_H_transformation(node, full_dim=full_dim)
         (
@@ -262,12 +561,8 @@ class AHContainmentDominationChecker(DominationChecker):
         # pdb.set_trace()
         # A, b, C, d = self.get_path_A_b_C_d(node)
         # total_dims = A.shape[1]
-        if self.include_cost_epigraph:
-            H, h = self.get_epigraph_matrices(node)
-            h_poly = HPolyhedron(H, h)
-        else:
-            prog = self.get_path_constraint_mathematical_program(node)
-            h_poly = HPolyhedron(prog)
+        blocks = self.get_path_polytope_blocks(node, from_nullspace_sets=False)
+        h_poly = HPolyhedron(*blocks.to_dense(self.include_cost_epigraph))
         # logger.debug(f"full_dim: {h_poly.ambient_dimension()}")
         T_H = self.get_H_transformation(node, h_poly.ambient_dimension())
         # K, k, T, t = self._nullspace_polyhedron_and_transformation_from_AbCdT(A, b, C, d, T_H)
@@ -283,6 +578,11 @@ class AHContainmentDominationChecker(DominationChecker):
         X = pp.H_polytope(K, k)
         return pp.AH_polytope(t, T, X), reduce_inequalities_succeeded
 
+    @profile_method
+    def _solve_containment_lp(self, lp: ContainmentLP) -> Optional[bool]:
+        logger.debug(f"Solving containment LP with {self._containment_lp_solver}")
+        return lp.solve(self._containment_lp_solver)
+
     @profile_method
     def _solve_containment_prog(self, prog: MathematicalProgram):
         logger.debug(f"Solving containment prog")
@@ -300,6 +600,246 @@ class AHContainmentDominationChecker(DominationChecker):
         # logger.debug(f"Solver name: {result.get_solver_id().name()}")
         return result.is_success()
 
+    def get_path_polytope_blocks(
+        self, node: SearchNode, from_nullspace_sets: bool
+    ) -> PathPolytopeBlocks:
+        """Get the blocks of the polytope of the path of the node, over the
+        same variables as get_path_mathematical_program (or
+        get_path_constraint_mathematical_program if the cost epigraph is
+        not included) or get_nullspace_path_mathematical_program.
+
+        The blocks are cached on the node, and built from those of the
+        closest ancestor that has them.
+        """
+        key = (from_nullspace_sets, self.include_cost_epigraph)
+        uncached = []
+        ancestor = node
+        while ancestor is not None and (
+            ancestor.ah_path_blocks is None or key not in ancestor.ah_path_blocks
+        ):
+            uncached.append(ancestor)
+            ancestor = ancestor.parent
+
+        if ancestor is None:
+            # The path of the oldest node without blocks is built from scratch
+            top = uncached.pop()
+            blocks = self._path_polytope_blocks_from_scratch(
+                list(top.vertex_path), list(top.edge_path), from_nullspace_sets
+            )
+            top.ah_path_blocks = {**(top.ah_path_blocks or {}), key: blocks}
+        else:
+            blocks = ancestor.ah_path_blocks[key]
+        for descendant in reversed(uncached):
+            blocks = self._extend_path_polytope_blocks(
+                blocks,
+                descendant.vertex_path[-2],
+                descendant.edge_path[-1],
+                descendant.vertex_name,
+                from_nullspace_sets,
+            )
+            descendant.ah_path_blocks = {
+                **(descendant.ah_path_blocks or {}),
+                key: blocks,
+            }
+        return blocks
+
+    def _path_polytope_blocks_from_scratch(
+        self, vertex_path: List[str], edge_path: List[str], from_nullspace_sets: bool
+    ) -> PathPolytopeBlocks:
+        blocks = PathPolytopeBlocks.from_vertex(
+            self._get_vertex_block(vertex_path[0], from_nullspace_sets),
+            self._graph.vertices[vertex_path[0]].gcs_vertex.ambient_dimension(),
+        )
+        for i in range(1, len(vertex_path)):
+            blocks = self._extend_path_polytope_blocks(
+                blocks,
+                vertex_path[i - 1],
+                edge_path[i - 1],
+                vertex_path[i],
+                from_nullspace_sets,
+            )
+        return blocks
+
+    def _extend_path_polytope_blocks(
+        self,
+        blocks: PathPolytopeBlocks,
+        u_name: str,
+        edge_key: str,
+        v_name: str,
+        from_nullspace_sets: bool,
+    ) -> PathPolytopeBlocks:
+        return blocks.extended(
+            self._get_vertex_block(v_name, from_nullspace_sets),
+            self._get_edge_block(u_name, edge_key, v_name, from_nullspace_sets),
+            self._graph.vertices[v_name].gcs_vertex.ambient_dimension(),
+        )
+
+    def _get_vertex_block(self, v_name: str, from_nullspace_sets: bool) -> _LocalBlock:
+        key = (v_name, from_nullspace_sets)
+        if key not in self._vertex_blocks:
+            if from_nullspace_sets:
+                block = self._create_nullspace_vertex_block(v_name)
+            else:
+                block = self._create_vertex_block(v_name)
+            self._vertex_blocks[key] = block
+        return self._vertex_blocks[key]
+
+    def _get_edge_block(
+        self, u_name: str, edge_key: str, v_name: str, from_nullspace_sets: bool
+    ) -> _LocalBlock:
+        key = (edge_key, from_nullspace_sets)
+        if key not in self._edge_blocks:
+            if from_nullspace_sets:
+                block = self._create_nullspace_edge_block(u_name, edge_key, v_name)
+            else:
+                block = self._create_edge_block(u_name, edge_key, v_name)
+            self._edge_blocks[key] = block
+        return self._edge_blocks[key]
+
+    def _add_l1_norm_cost(
+        self, prog: MathematicalProgram, A: np.ndarray, x: np.ndarray, name: str
+    ):
+        t = prog.NewContinuousVariables(A.shape[0], name=name)
+        prog.AddLinearCost(np.ones(t.shape), t)
+        prog.AddLinearConstraint(
+            A @ x - t, np.ones(A.shape[0]) * (-np.inf), np.zeros(A.shape[0])
+        )
+        prog.AddLinearConstraint(
+            -A @ x - t, np.ones(A.shape[0]) * (-np.inf), np.zeros(A.shape[0])
+        )
+
+    def _create_vertex_block(self, v_name: str) -> _LocalBlock:
+        """Block of the vertex in get_path_mathematical_program."""
+        v = self._graph.vertices[v_name].gcs_vertex
+        prog = MathematicalProgram()
+        x = prog.NewContinuousVariables(v.ambient_dimension(), name=f"{v_name}_vars")
+        v.set().AddPointInSetConstraints(prog, x)
+        for binding in v.GetConstraints():
+            prog.AddConstraint(binding.evaluator(), x)
+        if self.include_cost_epigraph:
+            for binding in v.GetCosts():
+                cost = binding.evaluator()
+                if isinstance(cost, L1NormCost):
+                    self._add_l1_norm_cost(
+                        prog, cost.A(), x, f"{v_name}_vertex_l1norm_cost"
+                    )
+                else:
+                    prog.AddCost(cost, x)
+        return _LocalBlock.from_prog(prog, (len(x),))
+
+    def _create_edge_block(
+        self, u_name: str, edge_key: str, v_name: str
+    ) -> _LocalBlock:
+        """Block of the edge in get_path_mathematical_program."""
+        e = self._graph.edges[edge_key].gcs_edge
+        prog = MathematicalProgram()
+        u_vars = prog.NewContinuousVariables(
+            self._graph.vertices[u_name].gcs_vertex.ambient_dimension()
+        )
+        v_vars = prog.NewContinuousVariables(
+            self._graph.vertices[v_name].gcs_vertex.ambient_dimension()
+        )
+
+        def edge_variables(binding):
+            variables = binding.variables()
+            variables[: len(u_vars)] = u_vars
+            variables[-len(v_vars) :] = v_vars
+            return variables
+
+        for binding in e.GetConstraints():
+            prog.AddConstraint(binding.evaluator(), edge_variables(binding))
+        if self.include_cost_epigraph:
+            for binding in e.GetCosts():
+                cost = binding.evaluator()
+                variables = edge_variables(binding)
+                if isinstance(cost, L1NormCost):
+                    self._add_l1_norm_cost(
+                        prog, cost.A(), variables, f"{edge_key}_edge_l1norm_cost"
+                    )
+                else:
+                    prog.AddCost(cost, variables)
+        return _LocalBlock.from_prog(prog, (len(u_vars), len(v_vars)))
+
+    def _create_nullspace_vertex_block(self, v_name: str) -> _LocalBlock:
+        """Block of the vertex in get_nullspace_path_mathematical_program."""
+        v = self._graph.vertices[v_name].gcs_vertex
+        ns_set: NullspaceSet = self._graph.vertices[v_name].convex_set.nullspace_set
+        prog = MathematicalProgram()
+        # Handle the case where the affine subspace is a point
+        if ns_set.dim == 0:
+            return _LocalBlock.from_prog(prog, (0,))
+        lam = prog.NewContinuousVariables(ns_set.dim, name=f"{v_name}_ns_vars")
+        ns_set.set.AddPointInSetConstraints(prog, lam)
+        if len(v.GetConstraints()) > 0:
+            raise NotImplementedError()
+        if self.include_cost_epigraph:
+            for binding in v.GetCosts():
+                cost = binding.evaluator()
+                if not isinstance(cost, L1NormCost):
+                    raise NotImplementedError()
+                A = cost.A()
+                l = prog.NewContinuousVariables(
+                    A.shape[0], name=f"{v_name}_vertex_l1norm_cost"
+                )
+                prog.AddLinearCost(np.ones(l.shape), l)
+                variables = np.hstack((lam, l))
+                for sign in [1, -1]:
+                    b_prime = -sign * A @ ns_set.x_0
+                    prog.AddLinearConstraint(
+                        A=np.hstack((sign * A @ ns_set.V, -np.eye(A.shape[0]))),
+                        lb=np.full_like(b_prime, -np.inf),
+                        ub=b_prime,
+                        vars=variables,
+                    )
+        return _LocalBlock.from_prog(prog, (len(lam),))
+
+    def _create_nullspace_edge_block(
+        self, u_name: str, edge_key: str, v_name: str
+    ) -> _LocalBlock:
+        """Block of the edge in get_nullspace_path_mathematical_program, with
+        the affine parts of the linear costs in the constant cost."""
+        e = self._graph.edges[edge_key].gcs_edge
+        u_set: NullspaceSet = self._graph.vertices[u_name].convex_set.nullspace_set
+        v_set: NullspaceSet = self._graph.vertices[v_name].convex_set.nullspace_set
+        prog = MathematicalProgram()
+        u_vars = prog.NewContinuousVariables(u_set.dim)
+        v_vars = prog.NewContinuousVariables(v_set.dim)
+        n_x_parts = (u_set.dim, v_set.dim)
+        # Both are points
+        if u_set.dim == 0 and v_set.dim == 0:
+            return _LocalBlock.from_prog(prog, n_x_parts)
+
+        # Only the parts of the edge over the vertices that are not points
+        # are variables, the others are fixed at their points
+        variables = np.concatenate((u_vars, v_vars))
+        Vs = scipy.linalg.block_diag(u_set.V, v_set.V)
+        x_0s = np.concatenate((u_set.x_0, v_set.x_0))
+        for binding in e.GetConstraints():
+            constraint = binding.evaluator()
+            if not isinstance(constraint, LinearConstraint):
+                raise NotImplementedError(
+                    f"Only linear constraints are supported for now, {constraint} not supported"
+                )
+            lb = constraint.lower_bound() - constraint.GetDenseA() @ x_0s
+            ub = constraint.upper_bound() - constraint.GetDenseA() @ x_0s
+            A = constraint.GetDenseA() @ Vs
+            if u_set.dim > 0 and v_set.dim > 0:
+                A, lb, ub = remove_rows_near_zero(A, lb, ub, AFFINE_SUBSPACE_TOL)
+            prog.AddLinearConstraint(A=A, lb=lb, ub=ub, vars=variables)
+
+        if self.include_cost_epigraph:
+            for binding in e.GetCosts():
+                cost = binding.evaluator()
+                if isinstance(cost, L1NormCost):
+                    raise NotImplementedError()
+                elif isinstance(cost, LinearCost):
+                    prog.AddLinearCost(
+                        cost.a() @ Vs, cost.a() @ x_0s + cost.b(), variables
+                    )
+                else:
+                    raise NotImplementedError()
+        return _LocalBlock.from_prog(prog, n_x_parts)
+
     def get_path_A_b_C_d(
         self, node: SearchNode
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
@@ -882,13 +1422,9 @@ class AHContainmentDominationChecker(DominationChecker):
         c_coeff_vec = np.zeros(len(vars))
         b = 0
         for c in cs:
-            c_vars = c.variables()
-            c_coeff = c.evaluator().a()
+            c_var_inds = prog.FindDecisionVariableIndices(c.variables())
+            np.add.at(c_coeff_vec, c_var_inds, c.evaluator().a())
             b += c.evaluator().b()
-            for i_c_var, c_var in enumerate(c_vars):
-                c_var_ind = self.find_index(vars, c_var)
-
-                c_coeff_vec[c_var_ind] += c_coeff[i_c_var]
 
         col = np.zeros(X.A().shape[0] + 1)
         col[-1] = -1
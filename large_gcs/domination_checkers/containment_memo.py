@@ -0,0 +1,79 @@
+from collections import defaultdict
+from typing import DefaultDict, Hashable, Optional, Set
+
+from large_gcs.algorithms.search_algorithm import SearchNode
+
+
+def path_key(node: SearchNode) -> tuple:
+    return tuple(node.vertex_path)
+
+
+class ContainmentMemo:
+    """Proven containments (A ⊆ B) and non-containments (A ⊄ B) between the
+    path polytopes of paths to the same vertex, keyed by path_key.
+
+    Besides the recorded pairs, containment of A in B can be inferred by
+    transitivity (A ⊆ C and C ⊆ B), and non-containment of A in B from a
+    recorded P ⊄ Q with P ⊆ A and B ⊆ Q (A ⊆ B would give P ⊆ Q). This
+    holds for the sufficient condition LP as well, since the certificates
+    of A ⊆ C and C ⊆ B compose into one of A ⊆ B.
+
+    Only proven results may be recorded, a containment program that could
+    not be solved must not be recorded as a non-containment, since wrong
+    non-containments would be inferred from it.
+    """
+
+    def __init__(self):
+        # A -> {B : A ⊆ B}
+        self._contained_in: DefaultDict[Hashable, Set[Hashable]] = defaultdict(set)
+        # B -> {A : A ⊆ B}
+        self._contains: DefaultDict[Hashable, Set[Hashable]] = defaultdict(set)
+        # A -> {B : A ⊄ B}
+        self._not_contained_in: DefaultDict[Hashable, Set[Hashable]] = defaultdict(set)
+
+    def add(self, a: Hashable, b: Hashable, is_contained: bool) -> None:
+        if is_contained is None:
+            raise ValueError(f"Cannot record unknown containment of {a} in {b}")
+        if is_contained:
+            self._contained_in[a].add(b)
+            self._contains[b].add(a)
+        else:
+            self._not_contained_in[a].add(b)
+
+    def get(self, a: Hashable, b: Hashable) -> Optional[bool]:
+        """Whether a ⊆ b was recorded, None if the pair was not checked."""
+        if b in self._contained_in.get(a, ()):
+            return True
+        if b in self._not_contained_in.get(a, ()):
+            return False
+        return None
+
+    def infer(self, a: Hashable, b: Hashable) -> Optional[bool]:
+        """Whether a ⊆ b follows from the recorded pairs, None if it does
+        not follow either way."""
+        supersets_of_a = self._closure(a, self._contained_in)
+        if b in supersets_of_a:
+            return True
+        supersets_of_b = self._closure(b, self._contained_in)
+        for p in self._closure(a, self._contains):
+            if not self._not_contained_in.get(p, set()).isdisjoint(supersets_of_b):
+                return False
+        return None
+
+    def n_contained_in(self, b: Hashable) -> int:
+        """Number of paths recorded to be contained in b."""
+        return len(self._contains.get(b, ()))
+
+    @staticmethod
+    def _closure(
+        start: Hashable, edges: DefaultDict[Hashable, Set[Hashable]]
+    ) -> Set[Hashable]:
+        """start and everything reachable from it through edges."""
+        reached = {start}
+        stack = [start]
+        while stack:
+            for nxt in edges.get(stack.pop(), ()):
+                if nxt not in reached:
+                    reached.add(nxt)
+                    stack.append(nxt)
+        return reached
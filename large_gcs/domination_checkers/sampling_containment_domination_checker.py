@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 from typing import List
 
 import numpy as np
@@ -12,6 +13,7 @@ from large_gcs.domination_checkers.ah_containment_last_pos import (
     ReachesCheaperLastPosContainment,
     ReachesNewLastPosContainment,
 )
+from large_gcs.domination_checkers.containment_memo import ContainmentMemo
 from large_gcs.domination_checkers.domination_checker import DominationChecker
 from large_gcs.domination_checkers.reaches_cheaper_containment import (
     ReachesCheaperContainment,
@@ -45,6 +47,10 @@ class SamplingContainmentDominationChecker(
         should_use_candidate_sol: bool = False,
         containment_condition: int = -1,
         construct_path_from_nullspaces: bool = False,
+        containment_lp_solver: str = "highs",
+        should_memoize_containment: bool = False,
+        should_prefilter_containment: bool = False,
+        n_prefilter_directions: int = 4,
     ):
         self._graph = graph
         self._target = graph.target_name
@@ -52,6 +58,13 @@ class SamplingContainmentDominationChecker(
         self._num_samples_per_vertex = num_samples_per_vertex
         self._should_use_candidate_sol = should_use_candidate_sol
         self._construct_path_from_nullspaces = construct_path_from_nullspaces
+        self._containment_lp_solver = containment_lp_solver
+        self._should_memoize_containment = should_memoize_containment
+        self._containment_memos = defaultdict(ContainmentMemo)
+        self._should_prefilter_containment = should_prefilter_containment
+        self._n_prefilter_directions = n_prefilter_directions
+        self._vertex_blocks = {}
+        self._edge_blocks = {}
 
         if num_samples_per_vertex != 1:
             raise NotImplementedError()
@@ -70,22 +83,26 @@ class SamplingContainmentDominationChecker(
         if np.all(~sample_is_dominated):
             return False
 
-        AH_n = self._maybe_create_path_AH_polytope(candidate_node)
         logger.debug(
             f"Checking domination of candidate node terminating at vertex {candidate_node.vertex_name}"
             f"\n via path: {candidate_node.vertex_path}"
         )
-        for alt_i, alt_n in enumerate(alternate_nodes):
-            if sample_is_dominated[alt_i]:
-                # Check whether candidate is contained in alternate
-                logger.debug(
-                    f"Checking if candidate node is dominated by alternate node with path:"
-                    f"{alt_n.vertex_path}"
-                )
-                # Might have been added based on the sample so AH Polyhedron might not have been created yet.
-                AH_alt = self._maybe_create_path_AH_polytope(alt_n)
-                if self.is_contained_in(AH_n, AH_alt):
-                    return True
+        sample_dominated_alternates = [
+            alt_n
+            for alt_i, alt_n in enumerate(alternate_nodes)
+            if sample_is_dominated[alt_i]
+        ]
+        for alt_n in self._prefiltered_alternates(
+            candidate_node,
+            self._ordered_alternates(candidate_node, sample_dominated_alternates),
+        ):
+            # Check whether candidate is contained in alternate
+            logger.debug(
+                f"Checking if candidate node is dominated by alternate node with path:"
+                f"{alt_n.vertex_path}"
+            )
+            if self.is_path_contained_in(candidate_node, alt_n):
+                return True
         return False
 
     def sample_is_dominated(
@@ -146,6 +163,7 @@ class SamplingContainmentDominationChecker(
             ],
             "is_contained_in": [
                 "_solve_containment_prog",
+                "_solve_containment_lp",
             ],
         }
         alg_metrics.update_method_call_structure(call_structure)
@@ -6,7 +6,6 @@ from typing import List, Tuple
 
 import numpy as np
 import pypolycontain as pp
-from pydrake.all import GurobiSolver, MathematicalProgram
 
 from large_gcs.algorithms.search_algorithm import AlgMetrics, SearchNode
 from large_gcs.domination_checkers.ah_containment_last_pos import (
@@ -30,6 +29,7 @@ from large_gcs.domination_checkers.sampling_last_pos import (
     ReachesNewLastPosSampling,
     SamplingLastPos,
 )
+from large_gcs.geometry.ah_containment_lp import ContainmentLP
 
 logger = logging.getLogger(__name__)
 
@@ -103,11 +103,19 @@ class SamplingContainmentDoubleDominationChecker(SamplingContainmentDominationCh
 
         p1 = multiprocessing.Process(
             target=target_function,
-            args=(child_conn1, self.solve_containment, (AH_n_ns, AH_alt_ns)),
+            args=(
+                child_conn1,
+                self.solve_containment,
+                (AH_n_ns, AH_alt_ns, self._containment_lp_solver),
+            ),
         )
         p2 = multiprocessing.Process(
             target=target_function,
-            args=(child_conn2, self.solve_containment, (AH_n_fs, AH_alt_fs)),
+            args=(
+                child_conn2,
+                self.solve_containment,
+                (AH_n_fs, AH_alt_fs, self._containment_lp_solver),
+            ),
         )
 
         p1.start()
@@ -156,12 +164,8 @@ class SamplingContainmentDoubleDominationChecker(SamplingContainmentDominationCh
         return first_result
 
     @staticmethod
-    def solve_containment(AH_X, AH_Y):
-        prog = MathematicalProgram()
-        pp.subset(prog, AH_X, AH_Y, -1)
-        solver = GurobiSolver()
-        result = solver.Solve(prog)
-        return result.is_success()
+    def solve_containment(AH_X, AH_Y, containment_lp_solver: str = "highs"):
+        return ContainmentLP.from_AH_polytopes(AH_X, AH_Y).solve(containment_lp_solver)
 
 
 class ReachesNewSamplingContainmentDouble(
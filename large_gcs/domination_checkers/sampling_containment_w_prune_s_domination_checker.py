@@ -44,7 +44,6 @@ class SamplingContainmentWPruneSDominationChecker(SamplingContainmentDominationC
     ) -> bool:
         sample_is_dominated = self.sample_is_dominated(candidate_node, alternate_nodes)
 
-        AH_n = self._maybe_create_path_AH_polytope(candidate_node)
         logger.debug(
             f"Checking domination of candidate node terminating at vertex {candidate_node.vertex_name}"
             f"\n via path: {candidate_node.vertex_path}"
@@ -52,7 +51,6 @@ class SamplingContainmentWPruneSDominationChecker(SamplingContainmentDominationC
         are_keeping = False
         alt_paths_to_prune = []
         for alt_i, alt_n in enumerate(alternate_nodes):
-            AH_alt = self._maybe_create_path_AH_polytope(alt_n)
             if sample_is_dominated[alt_i] and not are_keeping:
                 # Check whether candidate is contained in alternate
                 logger.debug(
@@ -60,10 +58,10 @@ class SamplingContainmentWPruneSDominationChecker(SamplingContainmentDominationC
                     f"{alt_n.vertex_path}"
                 )
 
-                if self.is_contained_in(AH_n, AH_alt):
+                if self.is_path_contained_in(candidate_node, alt_n):
                     return True
             elif not sample_is_dominated[alt_i]:
-                if self.is_contained_in(AH_alt, AH_n):
+                if self.is_path_contained_in(alt_n, candidate_node):
                     alt_paths_to_prune.append(alt_n)
                     are_keeping = True
         # Prune alternate paths
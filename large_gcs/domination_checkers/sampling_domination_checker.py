@@ -13,6 +13,8 @@ from large_gcs.graph.cost_constraint_factory import (
     create_l2norm_squared_vertex_cost_from_point,
 )
 from large_gcs.graph.graph import Edge, Graph, ShortestPathSolution, Vertex
+from large_gcs.graph.path_lp_solver import PathLinearProgramSolver
+from large_gcs.graph.path_sample_projector import PathSampleProjector
 
 logger = logging.getLogger(__name__)
 
@@ -103,7 +105,7 @@ class SetSamples:
             active_edges, skip_post_solve=True, should_return_result=True
         )
 
-        self._alg_metrics.update_after_gcs_solve(sol.time)
+        self._alg_metrics.update_after_gcs_solve(sol.time, is_cached=sol.is_cached)
 
         if not sol.is_success:
             logger.error(
@@ -146,6 +148,49 @@ class SetSamples:
         filtered_results = unique_rows_with_tolerance_ignore_nan(results, tol=1e-3)
         return filtered_results
 
+    @profile_method
+    def project_all_qp(
+        self,
+        graph: Graph,
+        node: SearchNode,
+        alg_metrics: AlgMetrics,
+        path_lp_solver: Optional[PathLinearProgramSolver] = None,
+    ) -> np.ndarray:
+        """Same as project_all_gcs, but projects the samples with QPs over
+        constraints of the path that are compiled once (see
+        PathSampleProjector), falling back to project_all_gcs if the
+        path is not polyhedral."""
+        results = self.project_samples_qp(graph, node, alg_metrics, path_lp_solver)
+        if results is None:
+            return self.project_all_gcs(graph, node, alg_metrics)
+        if np.all(np.isnan(results)):
+            logger.error(f"Failed to project any samples for vertex {self.vertex_name}")
+        return unique_rows_with_tolerance_ignore_nan(results, tol=1e-3)
+
+    def project_samples_qp(
+        self,
+        graph: Graph,
+        node: SearchNode,
+        alg_metrics: AlgMetrics,
+        path_lp_solver: Optional[PathLinearProgramSolver] = None,
+    ) -> Optional[np.ndarray]:
+        """The projections of all samples in the order of self.samples, with
+        nan rows for samples that could not be projected, or None if the
+        path is not supported by PathSampleProjector. Pass the same
+        path_lp_solver of graph for repeated calls."""
+        if path_lp_solver is None:
+            path_lp_solver = PathLinearProgramSolver(graph)
+        projector = PathSampleProjector.from_path(path_lp_solver, node.edge_path)
+        if projector is None:
+            return None
+        # Same work around as in project_single_gcs for a single sample
+        results, solve_times = projector.project(
+            self.samples, should_minimize_distance=len(self.samples) > 1
+        )
+        for solve_time in solve_times:
+            alg_metrics.update_after_gcs_solve(solve_time)
+        return results
+
     def project_single(
         self, graph: Graph, node: SearchNode, sample: np.ndarray
     ) -> np.ndarray:
@@ -286,11 +331,21 @@ class SamplingDominationChecker(DominationChecker):
         graph: Graph,
         num_samples_per_vertex: int,
         should_use_candidate_sol: bool = False,
+        should_batch_sample_projection: bool = False,
     ):
         super().__init__(graph)
 
         self._num_samples_per_vertex = num_samples_per_vertex
         self._should_use_candidate_sol = should_use_candidate_sol
+        # Project all samples of a candidate up front with PathSampleProjector
+        # instead of one convex restriction per sample
+        self._should_batch_sample_projection = should_batch_sample_projection
+        # Shared by the batched projections of all candidates
+        self._path_lp_solver: Optional[PathLinearProgramSolver] = None
+        if should_batch_sample_projection:
+            self._path_lp_solver = graph.path_lp_solver or PathLinearProgramSolver(
+                graph
+            )
         # Keeps track of samples for each vertex(set) in the graph.
         # These samples are not used directly but first projected into the feasible subspace of a particular path.
         self._set_samples: dict[str, SetSamples] = {}
@@ -302,6 +357,8 @@ class SamplingDominationChecker(DominationChecker):
                 "_maybe_add_set_samples",
                 "project_single_gcs",
                 "project_all_gcs",
+                "project_all_qp",
+                "_project_samples_batched",
             ],
         }
         alg_metrics.update_method_call_structure(call_structure)
@@ -324,12 +381,19 @@ class SamplingDominationChecker(DominationChecker):
 
         samples += list(self._set_samples[candidate_node.vertex_name].samples)
 
+        # None if not batched or if the path is not supported, in which case
+        # the samples are projected one by one
+        proj_samples = None
+        if self._should_batch_sample_projection:
+            proj_samples = self._project_samples_batched(candidate_node)
+
         for idx, sample in enumerate(
             self._set_samples[candidate_node.vertex_name].samples
         ):
             # logger.debug(f"Checking sample {idx}")
-            if (not self._should_use_candidate_sol and idx == 0) or (
-                self._should_use_candidate_sol and idx == 1
+            if proj_samples is None and (
+                (not self._should_use_candidate_sol and idx == 0)
+                or (self._should_use_candidate_sol and idx == 1)
             ):
                 # Before we project the first sample we need to init the graph
                 # logger.debug(f"Init graph for projection of samples")
@@ -341,12 +405,21 @@ class SamplingDominationChecker(DominationChecker):
                 # logger.debug(f"Using candidate sol as sample")
                 # Candidate sol does not need to be projected
                 proj_sample = sample
+            elif proj_samples is not None:
+                proj_sample = (
+                    None if np.any(np.isnan(proj_samples[idx])) else proj_samples[idx]
+                )
             else:
                 # logger.debug(f"Projecting sample {idx}")
                 proj_sample = self._set_samples[
                     candidate_node.vertex_name
                 ].project_single_gcs(self._graph, candidate_node, sample)
 
+            if proj_sample is None:
+                # The sample could not be projected onto the candidate path,
+                # so it cannot tell whether the candidate reaches anything new
+                continue
+
             # Create a new vertex for the sample and add it to the graph
             sample_vertex_name = f"{candidate_node.vertex_name}_sample_{idx}"
 
@@ -403,6 +476,14 @@ class SamplingDominationChecker(DominationChecker):
             vertex=Vertex(convex_set=Point(sample)), name=sample_vertex_name
         )
 
+    @profile_method
+    def _project_samples_batched(
+        self, candidate_node: SearchNode
+    ) -> Optional[np.ndarray]:
+        return self._set_samples[candidate_node.vertex_name].project_samples_qp(
+            self._graph, candidate_node, self._alg_metrics, self._path_lp_solver
+        )
+
     @profile_method
     def _maybe_add_set_samples(self, vertex_name: str) -> None:
         # Subtract 1 from the number of samples needed if we should use the provided sample is provided
@@ -437,7 +518,7 @@ class SamplingDominationChecker(DominationChecker):
         active_edges[-1] = edge_to_sample.key
 
         sol = self._graph.solve_convex_restriction(active_edges, skip_post_solve=True)
-        self._alg_metrics.update_after_gcs_solve(sol.time)
+        self._alg_metrics.update_after_gcs_solve(sol.time, is_cached=sol.is_cached)
         # Clean up edge, but leave the sample vertex
         self._graph.remove_edge(edge_to_sample.key)
         return sol
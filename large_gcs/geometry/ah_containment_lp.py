@@ -0,0 +1,267 @@
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+import pypolycontain as pp
+import scipy.sparse as sp
+from pydrake.all import (
+    ClpSolver,
+    GurobiSolver,
+    MathematicalProgram,
+    MosekSolver,
+    SolutionResult,
+)
+from scipy.optimize import linprog
+
+logger = logging.getLogger(__name__)
+
+# Backends that solve the LP through drake, the default "highs" goes through
+# scipy and needs no license.
+DRAKE_CONTAINMENT_LP_SOLVERS = {
+    "clp": ClpSolver,
+    "gurobi": GurobiSolver,
+    "mosek": MosekSolver,
+}
+CONTAINMENT_LP_SOLVERS = ["highs", *DRAKE_CONTAINMENT_LP_SOLVERS]
+# Relative tolerance on support values for the containment prefilter, so
+# that inaccuracies of the support value LPs do not reject containments
+SUPPORT_VALUE_TOL = 1e-5
+
+
+@dataclass
+class ContainmentLP:
+    """Feasibility LP of the sufficient condition for the containment of
+    the AH-polytope X = {T_x x + t_x | H_x x <= h_x} in the AH-polytope
+    Y = {T_y y + t_y | H_y y <= h_y}, from [Sadraddini and Tedrake, 2019]
+    with Theta = I (condition -1 of pypolycontain.subset).
+
+    The variables are [vec(Lambda), vec(Gamma), gamma], with the matrices
+    vectorized row by row, and X is contained in Y if there are
+    Lambda >= 0, Gamma and gamma with
+        T_x = T_y Gamma,
+        t_y - t_x = T_y gamma,
+        Lambda H_x = H_y Gamma,
+        Lambda h_x <= h_y + H_y gamma.
+    """
+
+    A_eq: sp.csr_matrix
+    b_eq: np.ndarray
+    A_ub: sp.csr_matrix
+    b_ub: np.ndarray
+    # Lambda comes first, and is the only bounded block of variables
+    n_lambda: int
+
+    @property
+    def n_vars(self) -> int:
+        return self.A_eq.shape[1]
+
+    @property
+    def lb(self) -> np.ndarray:
+        lb = np.full(self.n_vars, -np.inf)
+        lb[: self.n_lambda] = 0
+        return lb
+
+    @classmethod
+    def from_AH_polytopes(
+        cls, AH_X: pp.objects.AH_polytope, AH_Y: pp.objects.AH_polytope
+    ) -> "ContainmentLP":
+        return cls.from_inbody(_Inbody(AH_X), AH_Y)
+
+    @classmethod
+    def from_inbody(
+        cls, inbody: "_Inbody", AH_Y: pp.objects.AH_polytope
+    ) -> "ContainmentLP":
+        H_y = sp.csr_matrix(AH_Y.P.H)
+        h_y = np.ravel(AH_Y.P.h)
+        T_y = sp.csr_matrix(AH_Y.T)
+        t_y = np.ravel(AH_Y.t)
+        q_x, n_x = inbody.H_x.shape
+        q_y, n_y = H_y.shape
+        if T_y.shape[0] != inbody.T_x.shape[0]:
+            raise ValueError(
+                f"AH-polytopes are in spaces of different dimensions "
+                f"{inbody.T_x.shape[0]} and {T_y.shape[0]}"
+            )
+        n = T_y.shape[0]
+        n_lambda, n_Gamma = q_y * q_x, n_y * n_x
+        I_q_y = sp.identity(q_y, format="csr")
+        I_n_x = sp.identity(n_x, format="csr")
+
+        A_eq = sp.bmat(
+            [
+                # T_x = T_y Gamma
+                [sp.csr_matrix((n * n_x, n_lambda)), sp.kron(T_y, I_n_x), None],
+                # t_y - t_x = T_y gamma
+                [sp.csr_matrix((n, n_lambda)), sp.csr_matrix((n, n_Gamma)), T_y],
+                # Lambda H_x - H_y Gamma = 0
+                [
+                    sp.kron(I_q_y, inbody.H_x_T),
+                    -sp.kron(H_y, I_n_x),
+                    sp.csr_matrix((q_y * n_x, n_y)),
+                ],
+            ],
+            format="csr",
+        )
+        b_eq = np.concatenate(
+            [inbody.T_x.toarray().ravel(), t_y - inbody.t_x, np.zeros(q_y * n_x)]
+        )
+        # Lambda h_x - H_y gamma <= h_y
+        A_ub = sp.hstack(
+            [
+                sp.kron(I_q_y, inbody.h_x_T),
+                sp.csr_matrix((q_y, n_Gamma)),
+                -H_y,
+            ],
+            format="csr",
+        )
+        return cls(A_eq=A_eq, b_eq=b_eq, A_ub=A_ub, b_ub=h_y, n_lambda=n_lambda)
+
+    def solve(self, solver: str = "highs") -> Optional[bool]:
+        """Returns whether the LP is feasible, i.e. whether the sufficient
+        condition for containment holds, or None if the solver failed and
+        it is unknown."""
+        if solver == "highs":
+            bounds = np.stack([self.lb, np.full(self.n_vars, np.inf)], axis=1)
+            res = linprog(
+                np.zeros(self.n_vars),
+                A_ub=self.A_ub,
+                b_ub=self.b_ub,
+                A_eq=self.A_eq,
+                b_eq=self.b_eq,
+                bounds=bounds,
+                # Presolve wrongly finds the LPs of path polytopes with
+                # near zero offsets h infeasible, e.g. when X = Y
+                method="highs-ds",
+                options={"presolve": False},
+            )
+            # 2 is infeasible, anything else is a solver failure
+            if res.status not in (0, 2):
+                logger.warning(f"Containment LP not solved: {res.message}")
+                return None
+            return res.status == 0
+        if solver not in DRAKE_CONTAINMENT_LP_SOLVERS:
+            raise ValueError(
+                f"Unknown containment LP solver {solver}, "
+                f"expected one of {CONTAINMENT_LP_SOLVERS}"
+            )
+        prog = MathematicalProgram()
+        x = prog.NewContinuousVariables(self.n_vars, "x")
+        prog.AddLinearEqualityConstraint(self.A_eq.tocsc(), self.b_eq, x)
+        prog.AddLinearConstraint(
+            self.A_ub.tocsc(), np.full(len(self.b_ub), -np.inf), self.b_ub, x
+        )
+        prog.AddBoundingBoxConstraint(0, np.inf, x[: self.n_lambda])
+        result = DRAKE_CONTAINMENT_LP_SOLVERS[solver]().Solve(prog)
+        if result.is_success():
+            return True
+        # The LP has no cost, so it cannot be unbounded
+        if result.get_solution_result() in (
+            SolutionResult.kInfeasibleConstraints,
+            SolutionResult.kInfeasibleOrUnbounded,
+        ):
+            return False
+        logger.warning(f"Containment LP not solved: {result.get_solution_result()}")
+        return None
+
+
+class _Inbody:
+    """The parts of the containment LP that only depend on the inbody X,
+    shared by the LPs of X against several circumbodies."""
+
+    def __init__(self, AH_X: pp.objects.AH_polytope):
+        self.H_x = sp.csr_matrix(AH_X.P.H)
+        self.H_x_T = self.H_x.T.tocsr()
+        self.h_x_T = sp.csr_matrix(np.ravel(AH_X.P.h)[None, :])
+        self.T_x = sp.csr_matrix(AH_X.T)
+        self.t_x = np.ravel(AH_X.t)
+
+
+def is_contained_in(
+    AH_X: pp.objects.AH_polytope, AH_Y: pp.objects.AH_polytope, solver: str = "highs"
+) -> Optional[bool]:
+    """Whether the sufficient condition for X being contained in Y holds,
+    None if the LP could not be solved."""
+    return ContainmentLP.from_AH_polytopes(AH_X, AH_Y).solve(solver)
+
+
+def are_contained_in(
+    AH_X: pp.objects.AH_polytope,
+    AH_Ys: Iterable[pp.objects.AH_polytope],
+    solver: str = "highs",
+    stop_at_first: bool = False,
+) -> np.ndarray:
+    """Whether the sufficient condition for X being contained in each of the
+    AH_Ys holds, solving one LP per AH-polytope in AH_Ys.
+
+    The parts of the LPs that only depend on X are built once. AH_Ys can be
+    a generator, and with stop_at_first no more AH-polytopes are taken from
+    it after the first one that contains X, so the result ends with that
+    one. LPs that could not be solved count as not contained.
+    """
+    inbody = _Inbody(AH_X)
+    result = []
+    for AH_Y in AH_Ys:
+        result.append(ContainmentLP.from_inbody(inbody, AH_Y).solve(solver))
+        if stop_at_first and result[-1]:
+            break
+    return np.array(result, dtype=bool)
+
+
+def prefilter_directions(dim: int, n_random: int, seed: int = 0) -> np.ndarray:
+    """The 2 dim axis directions (whose support values give the bounding
+    box) followed by n_random random unit directions, as rows.
+
+    The random directions only depend on dim and seed, so the support
+    values of AH-polytopes in the same space can be compared."""
+    rng = np.random.default_rng([seed, dim])
+    random_directions = rng.normal(size=(n_random, dim))
+    random_directions /= np.linalg.norm(random_directions, axis=1, keepdims=True)
+    return np.vstack([np.eye(dim), -np.eye(dim), random_directions])
+
+
+def support_values(AH_X: pp.objects.AH_polytope, directions: np.ndarray) -> np.ndarray:
+    """max d^T z over z in X for each row d of directions, inf if X is
+    unbounded in that direction, -inf if X is empty and nan if the LP
+    failed (unknown)."""
+    H = sp.csr_matrix(AH_X.P.H)
+    h = np.ravel(AH_X.P.h)
+    T = np.atleast_2d(AH_X.T)
+    t = np.ravel(AH_X.t)
+    values = np.empty(len(directions))
+    for i, d in enumerate(directions):
+        res = linprog(
+            -(T.T @ d),
+            A_ub=H,
+            b_ub=h,
+            bounds=(None, None),
+            # See ContainmentLP.solve
+            method="highs-ds",
+            options={"presolve": False},
+        )
+        if res.status == 2:
+            values[:] = -np.inf
+            break
+        if res.status == 3:
+            values[i] = np.inf
+        elif res.status == 0:
+            values[i] = -res.fun + d @ t
+        else:
+            logger.warning(f"Support value LP not solved: {res.message}")
+            values[i] = np.nan
+    return values
+
+
+def may_be_contained_in(
+    support_values_X: np.ndarray, support_values_Ys: np.ndarray
+) -> np.ndarray:
+    """Necessary condition for X being contained in each Y, given their
+    support values in the same directions (one row per Y): X can only be
+    contained in Y if none of its support values exceeds Y's. Directions
+    with an unknown (nan) support value on either side are skipped."""
+    support_values_Ys = np.atleast_2d(support_values_Ys)
+    margin = np.zeros_like(support_values_Ys)
+    is_finite = np.isfinite(support_values_Ys)
+    margin[is_finite] = SUPPORT_VALUE_TOL * (1 + np.abs(support_values_Ys[is_finite]))
+    is_unknown = np.isnan(support_values_X) | np.isnan(support_values_Ys)
+    return np.all((support_values_X <= support_values_Ys + margin) | is_unknown, axis=1)
@@ -78,32 +78,15 @@ def unique_rows_with_tolerance_ignore_nan(arr, tol=1e-5):
 BOUND_FOR_POLYHEDRON = 10.0
 
 
-def HPolyhedronAbFromConstraints(
-    constraints: List[Formula],
-    variables: np.ndarray,
-    make_bounded: bool = False,
-    BOUND: float = BOUND_FOR_POLYHEDRON,
-):
-    """Construct a polyhedron from a list of constraint formulas.
+def AbCdFromConstraints(constraints: List[Formula], variables: np.ndarray):
+    """Decompose a list of linear constraint formulas into the inequalities
+    A x ≤ b and the equalities C x = d, keeping the order of the formulas
+    within each.
 
     Args:
         constraints: array of constraint formulas.
         variables: array of variables.
     """
-    # logger.debug(f"variables: {variables}")
-    # logger.debug(f"constraints len: {len(constraints)}")
-    # for i, constraint in enumerate(constraints):
-    #     logger.debug(f"constraint {i}: {constraint}")
-
-    if make_bounded:
-        ub = np.ones(variables.shape) * BOUND
-        upper_limits = le(variables, ub)
-        lower_limits = le(-ub, variables)
-        # logger.debug(f"ub: {ub}")
-        # logger.debug(f"upper_limits: {upper_limits}")
-        limits = np.concatenate((upper_limits, lower_limits))
-        constraints = np.append(constraints, limits)
-
     ineq_expr = []
     eq_expr = []
     for formula in constraints:
@@ -126,8 +109,36 @@ def HPolyhedronAbFromConstraints(
     A, b_neg = DecomposeAffineExpressions(ineq_expr, variables)
     C, d_neg = DecomposeAffineExpressions(eq_expr, variables)
 
-    b = -b_neg
-    d = -d_neg
+    return A, -b_neg, C, -d_neg
+
+
+def HPolyhedronAbFromConstraints(
+    constraints: List[Formula],
+    variables: np.ndarray,
+    make_bounded: bool = False,
+    BOUND: float = BOUND_FOR_POLYHEDRON,
+):
+    """Construct a polyhedron from a list of constraint formulas.
+
+    Args:
+        constraints: array of constraint formulas.
+        variables: array of variables.
+    """
+    # logger.debug(f"variables: {variables}")
+    # logger.debug(f"constraints len: {len(constraints)}")
+    # for i, constraint in enumerate(constraints):
+    #     logger.debug(f"constraint {i}: {constraint}")
+
+    if make_bounded:
+        ub = np.ones(variables.shape) * BOUND
+        upper_limits = le(variables, ub)
+        lower_limits = le(-ub, variables)
+        # logger.debug(f"ub: {ub}")
+        # logger.debug(f"upper_limits: {upper_limits}")
+        limits = np.concatenate((upper_limits, lower_limits))
+        constraints = np.append(constraints, limits)
+
+    A, b, C, d = AbCdFromConstraints(constraints, variables)
 
     # Rescaled Matrix H, and vector h
     H = np.vstack((A, C, -C))
@@ -1,6 +1,7 @@
 import itertools
 import logging
-from typing import List, Type
+from concurrent.futures import Executor, Future
+from typing import List, Optional, Type
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -37,7 +38,8 @@ class Polyhedron(ConvexSet):
 
         This constructor should be kept cheap to run since many
         polyhedrons are constructed and then thrown away if they are
-        empty or they don't intersect other sets.
+        empty or they don't intersect other sets. The vertices, center
+        and nullspace set are computed on first use.
         """
         self._vertices = None
         self._center = None
@@ -46,39 +48,68 @@ class Polyhedron(ConvexSet):
         self._H = H
         self._h = h
 
-        if should_compute_vertices:
-            if H.shape[1] == 1 or self._h_polyhedron.IsEmpty():
-                logger.warning("Polyhedron is empty or 1D, skipping compute vertices")
-                return
+        # Computing the vertices also reorders H and h to follow the
+        # vertices, so it is done before H, h or the set are accessed
+        self._should_compute_vertices = should_compute_vertices
+        self._should_compute_center = should_compute_vertices
+
+        self._nullspace_set = None
+        self._is_nullspace_set_created = False
+        self._nullspace_set_future: Optional[Future] = None
+
+    def _compute_vertices(self):
+        self._should_compute_vertices = False
+        H, h = self._H, self._h
+        if H.shape[1] == 1 or self._h_polyhedron.IsEmpty():
+            logger.warning("Polyhedron is empty or 1D, skipping compute vertices")
+            self._should_compute_center = False
+            return
 
-            self._vertices = order_vertices_counter_clockwise(
-                VPolytope(self._h_polyhedron).vertices().T
-            )
-            H, h = Polyhedron._reorder_A_b_by_vertices(H, h, self._vertices)
+        self._vertices = order_vertices_counter_clockwise(
+            VPolytope(self._h_polyhedron).vertices().T
+        )
+        H, h = Polyhedron._reorder_A_b_by_vertices(H, h, self._vertices)
 
-            self._h_polyhedron = HPolyhedron(H, h)
-            self._H = H
-            self._h = h
+        self._h_polyhedron = HPolyhedron(H, h)
+        self._H = H
+        self._h = h
 
-            # Compute center
-            try:
-                max_ellipsoid = self._h_polyhedron.MaximumVolumeInscribedEllipsoid()
-                self._center = np.array(max_ellipsoid.center())
-            except:
-                logger.warning("Could not compute center")
-                self._center = None
+    def _compute_center(self):
+        if self._should_compute_vertices:
+            self._compute_vertices()
+        if not self._should_compute_center:
+            return
+        self._should_compute_center = False
+        try:
+            max_ellipsoid = self._h_polyhedron.MaximumVolumeInscribedEllipsoid()
+            self._center = np.array(max_ellipsoid.center())
+        except:
+            logger.warning("Could not compute center")
+            self._center = None
 
     def create_nullspace_set(self):
         # logger.debug(f"H size before: {self._h_polyhedron.A().shape}")
         # self._h_polyhedron = self._h_polyhedron.ReduceInequalities(tol=0)
         # logger.debug(f"H size after: {self._h_polyhedron.A().shape}")
-        if self._h_polyhedron.IsEmpty():
-            logger.warning("Polyhedron is empty, skipping nullspace set creation")
+        self._is_nullspace_set_created = True
+        self._nullspace_set = _nullspace_set_from_hpolyhedron(self._h_polyhedron)
+
+    def precompute_nullspace_set(self, executor: Executor):
+        """Starts computing the nullspace set in the background on executor
+        (e.g. a ProcessPoolExecutor). The nullspace_set property waits for
+        the result if it is needed before it is done."""
+        if self._is_nullspace_set_created or self._nullspace_set_future is not None:
             return
-        self._nullspace_set = NullspaceSet.from_hpolyhedron(
-            self._h_polyhedron, should_reduce_inequalities=False
+        self._nullspace_set_future = executor.submit(
+            _nullspace_set_from_H_h, self.set.A(), self.set.b()
         )
 
+    def __getstate__(self):
+        # Futures can not be pickled, so wait for the nullspace set
+        if self._nullspace_set_future is not None:
+            self.nullspace_set
+        return self.__dict__
+
     @classmethod
     def from_vertices(cls, vertices):
         """Construct a polyhedron from a list of vertices.
@@ -112,7 +143,6 @@ class Polyhedron(ConvexSet):
         ) = Polyhedron.get_separated_inequality_equality_constraints(
             h_polyhedron.A(), h_polyhedron.b()
         )
-        polyhedron.create_nullspace_set()
         return polyhedron
 
     @classmethod
@@ -154,14 +184,27 @@ class Polyhedron(ConvexSet):
             d = -d_neg
             # logger.debug(f"Decomposed equality constraints: C = {C}, d = {d}")
 
-        if ineq_expr and eq_expr:
+        return cls.from_separated_constraints(A, b, C, d)
+
+    @classmethod
+    def from_separated_constraints(
+        cls: Type["Polyhedron"],
+        A: Optional[np.ndarray],
+        b: Optional[np.ndarray],
+        C: Optional[np.ndarray],
+        d: Optional[np.ndarray],
+    ):
+        """Construct the polyhedron {x| A x ≤ b, C x = d} from numeric
+        constraints. Either the inequalities or the equalities can be None.
+        """
+        if A is not None and C is not None:
             # Rescaled Matrix H, and vector h
             H = np.vstack((A, C, -C))
             h = np.concatenate((b, d, -d))
             polyhedron = cls(H, h, should_compute_vertices=False)
-        elif ineq_expr:
+        elif A is not None:
             polyhedron = cls(A, b, should_compute_vertices=False)
-        elif eq_expr:
+        elif C is not None:
             polyhedron = cls(C, d, should_compute_vertices=False)
         else:
             raise ValueError("No constraints given")
@@ -392,22 +435,28 @@ class Polyhedron(ConvexSet):
         return np.array(A_ineq), np.array(b_ineq), C, d
 
     def get_samples(self, n_samples=100):
-        return self._nullspace_set.get_samples(n_samples)
+        return self.nullspace_set.get_samples(n_samples)
 
     @property
     def dim(self):
-        return self.set.A().shape[1]
+        return self._h_polyhedron.ambient_dimension()
 
     @property
     def set(self):
+        if self._should_compute_vertices:
+            self._compute_vertices()
         return self._h_polyhedron
 
     @property
     def H(self):
+        if self._should_compute_vertices:
+            self._compute_vertices()
         return self._H
 
     @property
     def h(self):
+        if self._should_compute_vertices:
+            self._compute_vertices()
         return self._h
 
     @property
@@ -428,6 +477,14 @@ class Polyhedron(ConvexSet):
 
     @property
     def nullspace_set(self):
+        """The nullspace set, computed on first use. None if the polyhedron
+        is empty."""
+        if self._nullspace_set_future is not None:
+            self._nullspace_set = self._nullspace_set_future.result()
+            self._nullspace_set_future = None
+            self._is_nullspace_set_created = True
+        elif not self._is_nullspace_set_created:
+            self.create_nullspace_set()
         return self._nullspace_set
 
     # The following properties rely on vertices and center being set,
@@ -439,8 +496,26 @@ class Polyhedron(ConvexSet):
 
     @property
     def vertices(self):
+        if self._should_compute_vertices:
+            self._compute_vertices()
         return self._vertices
 
     @property
     def center(self):
+        if self._should_compute_center:
+            self._compute_center()
         return self._center
+
+
+def _nullspace_set_from_hpolyhedron(
+    h_polyhedron: HPolyhedron,
+) -> Optional[NullspaceSet]:
+    if h_polyhedron.IsEmpty():
+        logger.warning("Polyhedron is empty, skipping nullspace set creation")
+        return None
+    return NullspaceSet.from_hpolyhedron(h_polyhedron, should_reduce_inequalities=False)
+
+
+def _nullspace_set_from_H_h(H: np.ndarray, h: np.ndarray) -> Optional[NullspaceSet]:
+    # Runs in a worker process, Drake sets are rebuilt from the matrices
+    return _nullspace_set_from_hpolyhedron(HPolyhedron(H, h))
@@ -0,0 +1,145 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Bump when the layout of the files changes in a way that old readers can
+# not handle
+COLUMNAR_GRAPH_FILE_VERSION = 1
+HEADER_FILE_NAME = "header.json"
+
+
+class ColumnarGraphFile:
+    """Read only view of a graph saved as a directory of columns.
+
+    The directory holds a JSON header with the small, structured parts of
+    the graph (e.g. the body parameters) and one .npy file per column
+    (e.g. the edge index pairs or the stacked constraint matrices of the
+    sets). Columns are loaded on first access and memory mapped read
+    only, so loading is independent of the size of the graph and several
+    processes reading the same file share one copy of it in memory. No
+    column is pickled.
+    """
+
+    def __init__(self, path: str, kind: str, mmap_mode: Optional[str] = "r"):
+        header_path = os.path.join(path, HEADER_FILE_NAME)
+        if not os.path.isfile(header_path):
+            raise FileNotFoundError(f"{path} is not a columnar graph file")
+        with open(header_path, "r") as f:
+            self.header: Dict[str, Any] = json.load(f)
+        if self.header.get("version") != COLUMNAR_GRAPH_FILE_VERSION:
+            raise ValueError(
+                f"{path} has version {self.header.get('version')}, "
+                f"expected {COLUMNAR_GRAPH_FILE_VERSION}"
+            )
+        if self.header.get("kind") != kind:
+            raise ValueError(
+                f"{path} holds a {self.header.get('kind')}, expected a {kind}"
+            )
+        self.path = path
+        self._mmap_mode = mmap_mode
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            if name not in self.header["columns"]:
+                raise KeyError(f"{self.path} has no column {name}")
+            column_path = os.path.join(self.path, f"{name}.npy")
+            try:
+                column = np.load(
+                    column_path, mmap_mode=self._mmap_mode, allow_pickle=False
+                )
+            except ValueError:
+                # Empty columns can not be memory mapped
+                column = np.load(column_path, allow_pickle=False)
+            self._columns[name] = column
+        return column
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.header["columns"]
+
+    @staticmethod
+    def is_columnar_graph_file(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, HEADER_FILE_NAME))
+
+    @staticmethod
+    def write(
+        path: str, kind: str, header: Dict[str, Any], columns: Dict[str, np.ndarray]
+    ) -> None:
+        """Writes the header and columns to the directory path.
+
+        The header is written last, so a directory without a header is
+        an incomplete file.
+        """
+        os.makedirs(path, exist_ok=True)
+        header_path = os.path.join(path, HEADER_FILE_NAME)
+        if os.path.exists(header_path):
+            os.remove(header_path)
+        for name, column in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), column, allow_pickle=False)
+        header = {
+            **header,
+            "version": COLUMNAR_GRAPH_FILE_VERSION,
+            "kind": kind,
+            "columns": list(columns.keys()),
+        }
+        with open(header_path, "w") as f:
+            json.dump(header, f, default=_numpy_to_json)
+
+
+def _numpy_to_json(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"{type(value)} can not be saved in a columnar graph file header")
+
+
+def pack_ragged(
+    arrays: Sequence[Sequence], dtype=np.int64
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenates variable length 1D arrays into a flat array of values
+    and the offsets of each array, array i being
+    values[offsets[i] : offsets[i + 1]]."""
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(array) for array in arrays])
+    if len(arrays) == 0:
+        return np.zeros(0, dtype=dtype), offsets
+    return np.concatenate([np.asarray(a, dtype=dtype) for a in arrays]), offsets
+
+
+def unpack_ragged(values: np.ndarray, offsets: np.ndarray, i: int) -> np.ndarray:
+    return values[offsets[i] : offsets[i + 1]]
+
+
+def pack_blocks(
+    blocks: Sequence[Optional[np.ndarray]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Packs 2D float blocks of different shapes into a flat array of
+    values, the offsets of each block and their shapes. None blocks are
+    stored with shape (0, 0)."""
+    shapes = np.array(
+        [(0, 0) if block is None else np.shape(block) for block in blocks],
+        dtype=np.int64,
+    ).reshape(len(blocks), 2)
+    values, offsets = pack_ragged(
+        [[] if block is None else np.ravel(block) for block in blocks],
+        dtype=np.float64,
+    )
+    return values, offsets, shapes
+
+
+def unpack_block(
+    values: np.ndarray, offsets: np.ndarray, shapes: np.ndarray, i: int
+) -> Optional[np.ndarray]:
+    """Returns a writable copy of block i, None if it was stored as None."""
+    n_rows, n_cols = shapes[i]
+    if n_rows == 0 and n_cols == 0:
+        return None
+    return np.array(unpack_ragged(values, offsets, i)).reshape(n_rows, n_cols)
+
+
+def pack_names(names: List[str]) -> np.ndarray:
+    """Fixed width unicode array of the names, which can be saved without
+    pickling."""
+    return np.array(names, dtype=np.str_)
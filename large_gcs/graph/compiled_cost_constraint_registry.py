@@ -0,0 +1,67 @@
+import logging
+from typing import Callable, Dict, Hashable, Optional
+
+from large_gcs.contact.contact_set_decision_variables import ContactSetDecisionVariables
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledCostConstraintRegistry:
+    """Shares the costs and constraints created by the contact cost and
+    constraint factories between all the vertices and edges whose decision
+    variables have the same layout.
+
+    The factories in contact_cost_constraint_factory decompose symbolic
+    expressions into the A/b of drake costs and constraints, which only
+    depend on the shapes of the position and force variables of the
+    sets and not on the variables themselves. So each distinct
+    (factory, variable layouts, other arguments) is decomposed once, and
+    the resulting drake objects are shared by reference between the
+    bindings of every vertex or edge with that layout.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, object] = {}
+        self.n_hits = 0
+        self.n_misses = 0
+
+    @staticmethod
+    def layout_key(vars: ContactSetDecisionVariables) -> Hashable:
+        return (
+            "vars",
+            vars.pos.shape,
+            vars.force_act.shape,
+            vars.force_mag_AB.shape,
+        )
+
+    @classmethod
+    def _make_key(cls, factory: Callable, kwargs: dict) -> Optional[Hashable]:
+        items = []
+        for name, value in sorted(kwargs.items()):
+            if isinstance(value, ContactSetDecisionVariables):
+                value = cls.layout_key(value)
+            elif not isinstance(value, (int, float, bool, str, type(None))):
+                # Arguments of unknown type cannot be keyed safely
+                return None
+            items.append((name, value))
+        return (factory, tuple(items))
+
+    def get(self, factory: Callable, **kwargs):
+        """Returns factory(**kwargs), created once per variable layout."""
+        key = self._make_key(factory, kwargs)
+        if key is None:
+            return factory(**kwargs)
+        if key in self._entries:
+            self.n_hits += 1
+        else:
+            self.n_misses += 1
+            self._entries[key] = factory(**kwargs)
+        entry = self._entries[key]
+        # Copy lists so that appending to the costs of one edge does not affect others
+        return list(entry) if isinstance(entry, list) else entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
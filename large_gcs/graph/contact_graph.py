@@ -1,32 +1,60 @@
 import logging
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import partial
 from itertools import combinations, product
-from multiprocessing import Pool
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
-from pydrake.all import Constraint, Cost, Expression, eq
+from pydrake.all import Constraint, Cost, Expression, HPolyhedron, eq
 from tqdm import tqdm
 
+from large_gcs.contact.contact_location import (
+    ContactLocationFace,
+    ContactLocationVertex,
+)
 from large_gcs.contact.contact_pair_mode import (
     ContactPairMode,
     InContactPairMode,
+    NoContactPairMode,
+    RelaxedInContactPairMode,
+    RelaxedNoContactPairMode,
     generate_contact_pair_modes,
 )
 from large_gcs.contact.contact_regions_set import ContactRegionParams, ContactRegionsSet
 from large_gcs.contact.contact_set import ContactPointSet, ContactSet
-from large_gcs.contact.rigid_body import BodyColor, MobilityType, RigidBody
+from large_gcs.contact.contact_set_decision_variables import ContactSetDecisionVariables
+from large_gcs.contact.contact_set_template import ContactSetTemplate
+from large_gcs.contact.rigid_body import (
+    BodyColor,
+    MobilityType,
+    RigidBody,
+    RigidBodyParams,
+)
 from large_gcs.geometry.polyhedron import Polyhedron
+from large_gcs.graph.columnar_graph_file import (
+    ColumnarGraphFile,
+    pack_blocks,
+    pack_ragged,
+    unpack_block,
+    unpack_ragged,
+)
+from large_gcs.graph.compiled_cost_constraint_registry import (
+    CompiledCostConstraintRegistry,
+)
 from large_gcs.graph.contact_cost_constraint_factory import (
     edge_constraint_position_continuity,
     edge_cost_constant,
     vertex_cost_position_l1_norm,
     vertex_cost_position_path_length,
 )
-from large_gcs.graph.graph import Graph, ShortestPathSolution
+from large_gcs.graph.graph import Graph, ShortestPathSolution, Vertex
+from large_gcs.graph.intersection_service import (
+    IntersectionService,
+    intersection_service_or_new,
+)
 from large_gcs.visualize.visualize_trajectory import (
     plot_trajectory,
     plot_trajectory_legacy,
@@ -34,6 +62,20 @@ from large_gcs.visualize.visualize_trajectory import (
 
 logger = logging.getLogger(__name__)
 
+_CONTACT_PAIR_MODE_TYPES = {
+    mode_type.__name__: mode_type
+    for mode_type in (
+        NoContactPairMode,
+        InContactPairMode,
+        RelaxedNoContactPairMode,
+        RelaxedInContactPairMode,
+    )
+}
+_CONTACT_LOCATION_TYPES = {
+    location_type.__name__: location_type
+    for location_type in (ContactLocationFace, ContactLocationVertex)
+}
+
 
 @dataclass
 class ContactShortestPathSolution:
@@ -45,6 +87,10 @@ class ContactShortestPathSolution:
 
 
 class ContactGraph(Graph):
+    # Subclasses that do not call ContactGraph.__init__ start their own
+    # intersection service when generating edges
+    _intersection_service: Optional[IntersectionService] = None
+
     def __init__(
         self,
         static_obstacles: List[RigidBody],
@@ -65,6 +111,9 @@ class ContactGraph(Graph):
         edge_keys: List[str] = None,  # For loading a saved graph
         should_add_const_edge_cost: bool = True,
         should_use_l1_norm_vertex_cost: bool = False,
+        # For lazily loading a saved graph
+        graph_file: Optional[ColumnarGraphFile] = None,
+        intersection_service: Optional[IntersectionService] = None,
     ):
         """
         Args:
@@ -72,9 +121,18 @@ class ContactGraph(Graph):
             unactuated_objects: List of unactuated objects.
             actuated_robots: List of actuated robots.
             initial_positions: List of initial positions of.
+            graph_file: Columnar graph file to load the contact sets and
+                edges from. Their vertices and edges are lazy, the sets,
+                costs and drake vertices and edges are created on first
+                use.
+            intersection_service: Service used to check which contact sets
+                intersect when generating the edges. A new service is
+                started and closed afterwards if not given.
         """
         Graph.__init__(self, workspace=workspace)
         assert self.workspace is not None, "Must specify workspace"
+        self._compiled_costs_constraints = CompiledCostConstraintRegistry()
+        self._intersection_service = intersection_service
         if not should_add_const_edge_cost:
 
             def _create_single_empty_edge_cost(u: str, v: str) -> List[Cost]:
@@ -109,9 +167,20 @@ class ContactGraph(Graph):
         self.objects: List[RigidBody] = unactuated_objects
         self.robots: List[RigidBody] = actuated_robots
 
-        sets, set_ids = self._generate_contact_sets(
-            contact_pair_modes, contact_set_mode_ids, vertex_exclusion, vertex_inclusion
-        )
+        if graph_file is None:
+            sets, set_ids = self._generate_contact_sets(
+                contact_pair_modes,
+                contact_set_mode_ids,
+                vertex_exclusion,
+                vertex_inclusion,
+            )
+        else:
+            # Added before the source and target to keep the order of the
+            # vertices of the saved graph
+            sets, set_ids = [], []
+            file_vertex_names = self._add_lazy_vertices_from_columnar_file(
+                graph_file, vertex_exclusion, vertex_inclusion
+            )
         self.source_pos = source_pos_objs + source_pos_robs
 
         sets += [
@@ -156,15 +225,20 @@ class ContactGraph(Graph):
         )
         self.set_source("source")
         self.set_target("target")
-        if edge_keys is None:
-            edges = self._generate_contact_graph_edges(set_ids)
+        if graph_file is not None:
+            self._add_lazy_edges_from_columnar_file(
+                graph_file, file_vertex_names + set_ids
+            )
         else:
-            edges = self._filter_edge_keys(edge_keys)
-        self.add_edges_from_vertex_names(
-            *zip(*edges),
-            costs=self._create_edge_costs(edges),
-            constraints=self._create_edge_constraints(edges),
-        )
+            if edge_keys is None:
+                edges = self._generate_contact_graph_edges(set_ids)
+            else:
+                edges = self._filter_edge_keys(edge_keys)
+            self.add_edges_from_vertex_names(
+                *zip(*edges),
+                costs=self._create_edge_costs(edges),
+                constraints=self._create_edge_constraints(edges),
+            )
 
         # Check that the source and target are reachable
         if len(self.outgoing_edges(self.source_name)) == 0:
@@ -172,7 +246,13 @@ class ContactGraph(Graph):
         if len(self.incoming_edges(self.target_name)) == 0:
             logger.warning("Target is not reachable from any other set")
 
-        logger.info(f"Created contact graph: {self.params}")
+        if graph_file is None:
+            logger.info(f"Created contact graph: {self.params}")
+        else:
+            logger.info(
+                f"Loaded contact graph with {self.n_vertices} vertices and "
+                f"{self.n_edges} edges from {graph_file.path}"
+            )
 
     ### VERTEX AND EDGE COSTS AND CONSTRAINTS ###
     def _create_vertex_costs(self, sets: List[ContactSet]) -> List[List[Cost]]:
@@ -185,10 +265,16 @@ class ContactGraph(Graph):
 
     def _create_single_vertex_costs(self, set: ContactSet) -> List[Cost]:
         if self._should_use_l1_norm_vertex_cost:
-            return [vertex_cost_position_l1_norm(set.vars)]
+            return [
+                self._compiled_costs_constraints.get(
+                    vertex_cost_position_l1_norm, vars=set.vars
+                )
+            ]
         else:
             return [
-                vertex_cost_position_path_length(set.vars),
+                self._compiled_costs_constraints.get(
+                    vertex_cost_position_path_length, vars=set.vars
+                ),
                 # vertex_cost_force_actuation_norm(set.vars),
             ]
 
@@ -206,9 +292,10 @@ class ContactGraph(Graph):
 
     def _create_single_edge_costs(self, u: str, v: str) -> List[Cost]:
         return [
-            edge_cost_constant(
-                self.vertices[u].convex_set.vars,
-                self.vertices[v].convex_set.vars,
+            self._compiled_costs_constraints.get(
+                edge_cost_constant,
+                u_vars=self.vertices[u].convex_set.vars,
+                v_vars=self.vertices[v].convex_set.vars,
                 constant_cost=1,
             )
         ]
@@ -221,9 +308,10 @@ class ContactGraph(Graph):
 
     def _create_single_edge_constraints(self, u: str, v: str) -> List[Constraint]:
         return [
-            edge_constraint_position_continuity(
-                self.vertices[u].convex_set.vars,
-                self.vertices[v].convex_set.vars,
+            self._compiled_costs_constraints.get(
+                edge_constraint_position_continuity,
+                u_vars=self.vertices[u].convex_set.vars,
+                v_vars=self.vertices[v].convex_set.vars,
             )
         ]
 
@@ -234,25 +322,23 @@ class ContactGraph(Graph):
     ) -> List[Tuple[str, str]]:
         """Generates all possible edges given a set of contact sets."""
         logger.info("Generating edges...(parallel)")
-        with Pool() as pool:
-            pairs = list(combinations(contact_set_ids, 2))
-            sets = [
-                (
-                    self.vertices[u].convex_set.base_set,
-                    self.vertices[v].convex_set.base_set,
-                )
-                for u, v in pairs
-            ]
-            intersections = list(
-                tqdm(pool.imap(self._check_intersection, sets), total=len(sets))
+        pairs = list(combinations(contact_set_ids, 2))
+        set_pairs = np.array(
+            list(combinations(range(len(contact_set_ids)), 2)), dtype=np.int64
+        ).reshape(-1, 2)
+        with intersection_service_or_new(self._intersection_service) as service:
+            set_ids = service.add_sets(
+                [self.vertices[id].convex_set.base_set for id in contact_set_ids]
             )
-            edges = []
-            for (u, v), intersect in zip(pairs, intersections):
-                if intersect:
-                    if v != self.source_name:
-                        edges.append((u, v))
-                    if v != self.target_name:
-                        edges.append((v, u))
+            intersections = service.intersects(set_ids[set_pairs], show_progress=True)
+            service.remove_sets(set_ids)
+        edges = []
+        for (u, v), intersect in zip(pairs, intersections):
+            if intersect:
+                if v != self.source_name:
+                    edges.append((u, v))
+                if v != self.target_name:
+                    edges.append((v, u))
         logger.info(f"{len(edges)} edges generated")
         return edges
 
@@ -268,6 +354,144 @@ class ContactGraph(Graph):
                 edges.append((u, v))
         return edges
 
+    def _add_lazy_vertices_from_columnar_file(
+        self,
+        graph_file: ColumnarGraphFile,
+        vertex_exclusion: List[str] = None,
+        vertex_inclusion: List[str] = None,
+    ) -> List[Optional[str]]:
+        """Adds a lazy vertex for each contact set in graph_file that passes
+        the vertex exclusion and inclusion filters.
+
+        Returns the vertex names of all the sets in the file, None for
+        the sets that were filtered out.
+        """
+        self._contact_pair_modes: Dict[str, ContactPairMode] = {}
+        mode_ids = graph_file.header["mode_ids"]
+        set_modes = graph_file["set_modes"].tolist()
+        set_mode_offsets = graph_file["set_mode_offsets"].tolist()
+        vertex_names = []
+        for set_index in range(len(set_mode_offsets) - 1):
+            name = str(
+                tuple(
+                    mode_ids[mode_index]
+                    for mode_index in unpack_ragged(
+                        set_modes, set_mode_offsets, set_index
+                    )
+                )
+            )
+            if (
+                vertex_exclusion is not None
+                and any(exclusion in name for exclusion in vertex_exclusion)
+            ) or (
+                vertex_inclusion is not None
+                and not any(inclusion in name for inclusion in vertex_inclusion)
+            ):
+                vertex_names.append(None)
+                continue
+            self.add_lazy_vertex(
+                name,
+                partial(self._create_vertex_from_columnar_file, graph_file, set_index),
+            )
+            vertex_names.append(name)
+        logger.info(
+            f"Added {self.n_vertices} of {len(vertex_names)} sets from {graph_file.path}"
+        )
+        return vertex_names
+
+    def _add_lazy_edges_from_columnar_file(
+        self, graph_file: ColumnarGraphFile, vertex_names: List[Optional[str]]
+    ) -> None:
+        """Adds a lazy edge for each edge in graph_file between vertices in
+        the graph, vertex_names being the names of the vertices by their
+        index in the file."""
+        for u_index, v_index in graph_file["edges"].tolist():
+            u = vertex_names[u_index]
+            v = vertex_names[v_index]
+            if u is None or v is None:
+                continue
+            self.add_lazy_edge(
+                u, v, partial(self._create_single_edge_costs_constraints, u, v)
+            )
+
+    def _create_single_edge_costs_constraints(
+        self, u: str, v: str
+    ) -> Tuple[List[Cost], List[Constraint]]:
+        return (
+            self._create_single_edge_costs(u, v),
+            self._create_single_edge_constraints(u, v),
+        )
+
+    def _create_vertex_from_columnar_file(
+        self, graph_file: ColumnarGraphFile, set_index: int
+    ) -> Vertex:
+        contact_set = self._create_contact_set_from_columnar_file(graph_file, set_index)
+        return Vertex(
+            contact_set,
+            costs=self._create_single_vertex_costs(contact_set),
+            constraints=self._create_single_vertex_constraints(contact_set),
+        )
+
+    def _create_contact_set_from_columnar_file(
+        self, graph_file: ColumnarGraphFile, set_index: int
+    ) -> ContactSet:
+        """Creates the contact set from its saved constraint blocks, without
+        compiling any constraint formulas."""
+        mode_indices = unpack_ragged(
+            graph_file["set_modes"], graph_file["set_mode_offsets"], set_index
+        )
+        modes = [
+            self._get_contact_pair_mode_from_columnar_file(graph_file, mode_index)
+            for mode_index in mode_indices
+        ]
+        Ab, Cd, base_Hh = [
+            unpack_block(
+                graph_file["set_blocks"],
+                graph_file["set_block_offsets"],
+                graph_file["set_block_shapes"],
+                _N_SET_BLOCKS * set_index + i,
+            )
+            for i in range(_N_SET_BLOCKS)
+        ]
+        polyhedron = Polyhedron.from_separated_constraints(
+            *_split_block(Ab), *_split_block(Cd)
+        )
+        base_polyhedron = HPolyhedron(*_split_block(base_Hh))
+        vars = ContactSetDecisionVariables.from_contact_pair_modes(
+            self.objects, self.robots, modes
+        )
+        return ContactSet.from_polyhedra(vars, modes, polyhedron, base_polyhedron)
+
+    def _get_contact_pair_mode_from_columnar_file(
+        self, graph_file: ColumnarGraphFile, mode_index: int
+    ) -> ContactPairMode:
+        header = graph_file.header
+        mode_id = header["mode_ids"][mode_index]
+        mode = self._contact_pair_modes.get(mode_id)
+        if mode is not None:
+            return mode
+        bodies = self.obstacles + self.objects + self.robots
+        body_a, body_b = [bodies[i] for i in graph_file["mode_bodies"][mode_index]]
+        location_a_type, location_b_type = [
+            _CONTACT_LOCATION_TYPES[header["location_type_names"][i]]
+            for i in graph_file["mode_location_types"][mode_index]
+        ]
+        location_a_index, location_b_index = graph_file["mode_location_indices"][
+            mode_index
+        ].tolist()
+        mode_type = _CONTACT_PAIR_MODE_TYPES[
+            header["mode_type_names"][graph_file["mode_types"][mode_index]]
+        ]
+        mode = mode_type(
+            body_a,
+            body_b,
+            location_a_type(body_a, location_a_index),
+            location_b_type(body_b, location_b_index),
+        )
+        assert mode.id == mode_id
+        self._contact_pair_modes[mode_id] = mode
+        return mode
+
     def _generate_contact_sets(
         self,
         contact_pair_modes: Dict[
@@ -339,9 +563,8 @@ class ContactGraph(Graph):
                 f"{len(sets_to_keep)} sets remain after filtering for inclusion sets"
             )
 
-        # Generate nullspace sets for each contact set
-        for contact_set in sets_to_keep:
-            contact_set._polyhedron.create_nullspace_set()
+        # Nullspace sets are created on first use, since only some
+        # domination checkers need them
 
         sets_to_keep_ids = [str(contact_set.id) for contact_set in sets_to_keep]
         return sets_to_keep, sets_to_keep_ids
@@ -363,6 +586,12 @@ class ContactGraph(Graph):
             body.create_workspace_position_constraints(self.workspace)
             self._workspace_constraints += body.workspace_constraints
             self._base_workspace_constraints += body.base_workspace_constraints
+        self._contact_set_template = ContactSetTemplate(
+            self.objects,
+            self.robots,
+            self._workspace_constraints,
+            self._base_workspace_constraints,
+        )
 
         static_movable_pairs = list(product(obs_names, movable))
         movable_pairs = list(combinations(movable, 2))
@@ -392,6 +621,21 @@ class ContactGraph(Graph):
     def _create_contact_set_from_contact_pair_mode_ids(
         self, mode_ids: Iterable[str]
     ) -> ContactSet:
+        try:
+            contact_set = self._contact_set_template.create_contact_set(
+                [self._contact_pair_modes[mode_id] for mode_id in mode_ids]
+            )
+        except:
+            logger.error(f"Error creating contact set for mode_ids {mode_ids}")
+            raise
+
+        return contact_set
+
+    def _create_contact_set_from_constraint_formulas(
+        self, mode_ids: Iterable[str]
+    ) -> ContactSet:
+        """Builds the same set as _create_contact_set_from_contact_pair_mode_ids
+        by decomposing the symbolic constraint formulas of the set."""
         # Collect the forces acting on each body
         body_force_sums = defaultdict(lambda: np.full((self.base_dim,), Expression()))
         for mode_id in mode_ids:
@@ -733,6 +977,11 @@ class ContactGraph(Graph):
     ### SERIALIZATION METHODS ###
 
     def save_to_file(self, path: str):
+        """Saves the graph to a columnar graph file (a directory, see
+        ColumnarGraphFile), or to a pickled dict if path ends in .npy."""
+        if not path.endswith(".npy"):
+            self._save_to_columnar_file(path)
+            return
         if self.target_pos is None:
             target_pos_objs = None
             target_pos_robs = None
@@ -766,6 +1015,163 @@ class ContactGraph(Graph):
             },
         )
 
+    def _columnar_file_header(self) -> dict:
+        """Header of the bodies, source, target and workspace of the graph
+        in a columnar graph file."""
+        if self.target_pos is None:
+            target_pos_objs = None
+            target_pos_robs = None
+        else:
+            target_pos_objs = self.target_pos[: self.n_objects]
+            target_pos_robs = self.target_pos[self.n_objects :]
+        return {
+            "obs_params": [_body_params_to_dict(obs.params) for obs in self.obstacles],
+            "objs_params": [_body_params_to_dict(obj.params) for obj in self.objects],
+            "robs_params": [_body_params_to_dict(rob.params) for rob in self.robots],
+            "source_pos_objs": _positions_to_list(self.source_pos[: self.n_objects]),
+            "source_pos_robs": _positions_to_list(self.source_pos[self.n_objects :]),
+            "target_pos_objs": _positions_to_list(target_pos_objs),
+            "target_pos_robs": _positions_to_list(target_pos_robs),
+            "target_region_params": (
+                None
+                if self.target_region_params is None
+                else [
+                    _region_params_to_dict(params)
+                    for params in self.target_region_params
+                ]
+            ),
+            "workspace": np.asarray(self.workspace).tolist(),
+        }
+
+    @staticmethod
+    def _init_kwargs_from_columnar_file_header(header: dict) -> dict:
+        return {
+            "static_obstacles": [
+                RigidBody.from_params(_body_params_from_dict(params))
+                for params in header["obs_params"]
+            ],
+            "unactuated_objects": [
+                RigidBody.from_params(_body_params_from_dict(params))
+                for params in header["objs_params"]
+            ],
+            "actuated_robots": [
+                RigidBody.from_params(_body_params_from_dict(params))
+                for params in header["robs_params"]
+            ],
+            "source_pos_objs": _positions_from_list(header["source_pos_objs"]),
+            "source_pos_robs": _positions_from_list(header["source_pos_robs"]),
+            "target_pos_objs": _positions_from_list(header["target_pos_objs"]),
+            "target_pos_robs": _positions_from_list(header["target_pos_robs"]),
+            "target_region_params": (
+                None
+                if header["target_region_params"] is None
+                else [
+                    _region_params_from_dict(params)
+                    for params in header["target_region_params"]
+                ]
+            ),
+            "workspace": np.array(header["workspace"]),
+        }
+
+    def _save_to_columnar_file(self, path: str):
+        contact_set_names = [
+            name
+            for name, v in self.vertices.items()
+            if isinstance(v.convex_set, ContactSet)
+        ]
+        contact_sets = [self.vertices[name].convex_set for name in contact_set_names]
+        vertex_index = {
+            name: i
+            for i, name in enumerate(
+                contact_set_names + [self.source_name, self.target_name]
+            )
+        }
+        # Only the modes of the sets are needed to load the graph
+        modes = {
+            mode.id: mode
+            for contact_set in contact_sets
+            for mode in contact_set.contact_pair_modes
+        }
+        mode_index = {mode_id: i for i, mode_id in enumerate(modes)}
+        body_index = {
+            body.name: i
+            for i, body in enumerate(self.obstacles + self.objects + self.robots)
+        }
+        mode_type_names = list(_CONTACT_PAIR_MODE_TYPES)
+        location_type_names = list(_CONTACT_LOCATION_TYPES)
+
+        set_modes, set_mode_offsets = pack_ragged(
+            [
+                [mode_index[mode.id] for mode in contact_set.contact_pair_modes]
+                for contact_set in contact_sets
+            ]
+        )
+        set_blocks, set_block_offsets, set_block_shapes = pack_blocks(
+            [
+                block
+                for contact_set in contact_sets
+                for block in (
+                    _join_block(contact_set.A, contact_set.b),
+                    _join_block(contact_set.C, contact_set.d),
+                    _join_block(contact_set.base_set.A(), contact_set.base_set.b()),
+                )
+            ]
+        )
+        header = self._columnar_file_header()
+        header.update(
+            {
+                "vertex_exclusion": self.vertex_exclusion,
+                "vertex_inclusion": self.vertex_inclusion,
+                "mode_ids": list(modes),
+                "mode_type_names": mode_type_names,
+                "location_type_names": location_type_names,
+            }
+        )
+        columns = {
+            "mode_types": np.array(
+                [mode_type_names.index(type(mode).__name__) for mode in modes.values()],
+                dtype=np.int64,
+            ),
+            "mode_bodies": np.array(
+                [
+                    (body_index[mode.body_a.name], body_index[mode.body_b.name])
+                    for mode in modes.values()
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 2),
+            "mode_location_types": np.array(
+                [
+                    (
+                        location_type_names.index(
+                            type(mode.contact_location_a).__name__
+                        ),
+                        location_type_names.index(
+                            type(mode.contact_location_b).__name__
+                        ),
+                    )
+                    for mode in modes.values()
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 2),
+            "mode_location_indices": np.array(
+                [
+                    (mode.contact_location_a.index, mode.contact_location_b.index)
+                    for mode in modes.values()
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 2),
+            "set_modes": set_modes,
+            "set_mode_offsets": set_mode_offsets,
+            "set_blocks": set_blocks,
+            "set_block_offsets": set_block_offsets,
+            "set_block_shapes": set_block_shapes,
+            "edges": np.array(
+                [(vertex_index[e.u], vertex_index[e.v]) for e in self.edges.values()],
+                dtype=np.int64,
+            ).reshape(-1, 2),
+        }
+        ColumnarGraphFile.write(path, _COLUMNAR_FILE_KIND, header, columns)
+
     @classmethod
     def load_from_file(
         cls,
@@ -774,6 +1180,31 @@ class ContactGraph(Graph):
         vertex_exclusion: List[str] = None,
         should_use_l1_norm_vertex_cost: bool = False,
     ):
+        """Loads a graph saved with save_to_file.
+
+        Graphs in columnar graph files are loaded lazily: the contact
+        sets, costs and drake vertices and edges are created on first
+        use, from the memory mapped constraint blocks of the file.
+        """
+        if ColumnarGraphFile.is_columnar_graph_file(path):
+            graph_file = ColumnarGraphFile(path, _COLUMNAR_FILE_KIND)
+            header = graph_file.header
+            return cls(
+                **cls._init_kwargs_from_columnar_file_header(header),
+                vertex_exclusion=(
+                    header["vertex_exclusion"]
+                    if vertex_exclusion is None
+                    else vertex_exclusion
+                ),
+                vertex_inclusion=(
+                    header["vertex_inclusion"]
+                    if vertex_inclusion is None
+                    else vertex_inclusion
+                ),
+                should_use_l1_norm_vertex_cost=should_use_l1_norm_vertex_cost,
+                graph_file=graph_file,
+            )
+
         data = np.load(path, allow_pickle=True).item()
         obs = [RigidBody.from_params(params) for params in data["obs_params"]]
         objs = [RigidBody.from_params(params) for params in data["objs_params"]]
@@ -830,6 +1261,10 @@ class ContactGraph(Graph):
             params.target = "regions"
         return params
 
+    @property
+    def compiled_costs_constraints(self) -> CompiledCostConstraintRegistry:
+        return self._compiled_costs_constraints
+
     @property
     def n_obstacles(self):
         return len(self.obstacles)
@@ -845,3 +1280,75 @@ class ContactGraph(Graph):
     @property
     def base_dim(self):
         return self.robots[0].dim
+
+
+# Blocks saved per contact set in a columnar graph file: [A b], [C d] and
+# [H h] of the base set
+_N_SET_BLOCKS = 3
+_COLUMNAR_FILE_KIND = "contact_graph"
+
+
+def _join_block(
+    M: Optional[np.ndarray], v: Optional[np.ndarray]
+) -> Optional[np.ndarray]:
+    if M is None:
+        return None
+    return np.hstack([M, np.reshape(v, (-1, 1))])
+
+
+def _split_block(block: Optional[np.ndarray]):
+    if block is None:
+        return None, None
+    return block[:, :-1], block[:, -1]
+
+
+def _body_params_to_dict(params: RigidBodyParams) -> dict:
+    return {
+        "name": params.name,
+        "vertices": np.asarray(params.vertices).tolist(),
+        "mobility_type": params.mobility_type.name,
+        "n_pos_points": params.n_pos_points,
+    }
+
+
+def _body_params_from_dict(params: dict) -> RigidBodyParams:
+    return RigidBodyParams(
+        name=params["name"],
+        vertices=np.array(params["vertices"]),
+        mobility_type=MobilityType[params["mobility_type"]],
+        n_pos_points=params["n_pos_points"],
+    )
+
+
+def _region_params_to_dict(params: ContactRegionParams) -> dict:
+    return {
+        "region_vertices": np.asarray(params.region_vertices).tolist(),
+        "obj_indices": _indices_to_list(params.obj_indices),
+        "rob_indices": _indices_to_list(params.rob_indices),
+    }
+
+
+def _region_params_from_dict(params: dict) -> ContactRegionParams:
+    return ContactRegionParams(
+        region_vertices=params["region_vertices"],
+        obj_indices=params["obj_indices"],
+        rob_indices=params["rob_indices"],
+    )
+
+
+def _indices_to_list(indices: Optional[List[int]]) -> Optional[List[int]]:
+    if indices is None:
+        return None
+    return [int(i) for i in indices]
+
+
+def _positions_to_list(positions: Optional[List[np.ndarray]]) -> Optional[list]:
+    if positions is None:
+        return None
+    return [np.asarray(pos).tolist() for pos in positions]
+
+
+def _positions_from_list(positions: Optional[list]) -> Optional[List[np.ndarray]]:
+    if positions is None:
+        return None
+    return [np.array(pos) for pos in positions]
@@ -0,0 +1,223 @@
+import logging
+from collections import OrderedDict, defaultdict
+from copy import copy
+from enum import Enum
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+from pydrake.all import (
+    ClarabelSolver,
+    ClpSolver,
+    GurobiSolver,
+    L1NormCost,
+    L2NormCost,
+    LinearConstraint,
+    LinearCost,
+    MosekSolver,
+    QuadraticCost,
+    SolverOptions,
+)
+
+logger = logging.getLogger(__name__)
+
+# Solvers whose options are included in the cache key.
+_KEYED_SOLVER_IDS = [
+    MosekSolver.id(),
+    GurobiSolver.id(),
+    ClpSolver.id(),
+    ClarabelSolver.id(),
+]
+
+
+class CacheEvictionPolicy(Enum):
+    # Evict the least recently used entry
+    LRU = 1
+    # Evict the oldest inserted entry, regardless of use
+    FIFO = 2
+
+
+def solver_options_key(solver_options: Optional[SolverOptions]) -> Hashable:
+    """Hashable representation of the options that affect a solve."""
+    if solver_options is None:
+        return None
+    key = []
+    for solver_id in _KEYED_SOLVER_IDS:
+        options = solver_options.GetOptions(solver_id)
+        if options:
+            key.append((solver_id.name(), tuple(sorted(options.items()))))
+    common_options = solver_options.common_solver_options()
+    key.append(tuple(sorted((str(k), v) for k, v in common_options.items())))
+    return tuple(key)
+
+
+def costs_constraints_fingerprint(costs: Optional[List], constraints: Optional[List]):
+    """Fingerprint of the numeric data of a list of costs and constraints.
+
+    Two edges with the same fingerprint define the same costs and
+    constraints, even if the underlying drake objects are different
+    instances (e.g. the shortcut edges that are recreated for every
+    cost estimate). Evaluators with an unknown type only match the same
+    evaluator instance, which is conservative.
+    """
+
+    def evaluator_fingerprint(evaluator):
+        if isinstance(evaluator, L1NormCost):
+            arrays = (evaluator.A(), evaluator.b())
+        elif isinstance(evaluator, L2NormCost):
+            arrays = (evaluator.GetDenseA(), evaluator.b())
+        elif isinstance(evaluator, LinearCost):
+            arrays = (evaluator.a(), np.array([evaluator.b()]))
+        elif isinstance(evaluator, QuadraticCost):
+            arrays = (evaluator.Q(), evaluator.b(), np.array([evaluator.c()]))
+        elif isinstance(evaluator, LinearConstraint):
+            # Also covers LinearEqualityConstraint
+            arrays = (
+                evaluator.GetDenseA(),
+                evaluator.lower_bound(),
+                evaluator.upper_bound(),
+            )
+        else:
+            # Keeps a reference to the evaluator, so that it only matches
+            # itself (its id could be reused once it is garbage collected)
+            return (type(evaluator).__name__, evaluator)
+        return (type(evaluator).__name__,) + tuple(
+            (np.asarray(a, dtype=float).shape, np.asarray(a, dtype=float).tobytes())
+            for a in arrays
+        )
+
+    return (
+        tuple(evaluator_fingerprint(c) for c in costs or []),
+        tuple(evaluator_fingerprint(c) for c in constraints or []),
+    )
+
+
+class EdgePathCache:
+    """Bounded cache of values that depend on the costs and constraints of a
+    path of edges. Keys are tuples whose first element is the tuple of edge
+    keys in the path.
+
+    Entries are invalidated whenever the costs or constraints of an
+    edge that they depend on change, or when one of the edge's vertices
+    is removed. Removing an edge does not invalidate entries by itself;
+    if an edge with the same key and the same costs and constraints is
+    added again (such as the temporary shortcut edges), the entries
+    remain valid.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        eviction_policy: CacheEvictionPolicy = CacheEvictionPolicy.LRU,
+    ):
+        if isinstance(eviction_policy, str):
+            eviction_policy = CacheEvictionPolicy[eviction_policy]
+        assert max_size > 0, "max_size must be positive"
+        self._max_size = max_size
+        self._eviction_policy = eviction_policy
+        self._entries: OrderedDict[Hashable, object] = OrderedDict()
+        # Maps an edge key to the cache keys of all the entries that use that edge
+        self._edge_to_cache_keys: Dict[str, Set[Hashable]] = defaultdict(set)
+        # Fingerprint of the costs and constraints last seen under each edge key
+        self._edge_fingerprints: Dict[str, Tuple] = {}
+        # Maps a vertex name to the keys of all the edges seen from or to it
+        self._vertex_to_edge_keys: Dict[str, Set[str]] = defaultdict(set)
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_evictions = 0
+        self.n_invalidations = 0
+
+    def get(self, key: Hashable):
+        if key not in self._entries:
+            self.n_misses += 1
+            return None
+        self.n_hits += 1
+        if self._eviction_policy == CacheEvictionPolicy.LRU:
+            self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Hashable, value) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = value
+        for edge_key in key[0]:
+            self._edge_to_cache_keys[edge_key].add(key)
+        while len(self._entries) > self._max_size:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._forget_key(evicted_key)
+            self.n_evictions += 1
+
+    def on_edge_added(self, edge_key: str, u: str, v: str, costs, constraints) -> None:
+        fingerprint = costs_constraints_fingerprint(costs, constraints)
+        if self._edge_fingerprints.get(edge_key, fingerprint) != fingerprint:
+            self.invalidate_edge(edge_key)
+        self._edge_fingerprints[edge_key] = fingerprint
+        self._vertex_to_edge_keys[u].add(edge_key)
+        self._vertex_to_edge_keys[v].add(edge_key)
+
+    def invalidate_vertex(self, vertex_name: str) -> None:
+        """Drop all the entries that use an edge from or to this vertex, even
+        if the edge was already removed, since a vertex with the same name
+        may be re-added with a different set."""
+        for edge_key in self._vertex_to_edge_keys.pop(vertex_name, set()):
+            self.invalidate_edge(edge_key)
+
+    def invalidate_edge(self, edge_key: str) -> None:
+        """Drop all the entries that use this edge."""
+        for key in self._edge_to_cache_keys.pop(edge_key, set()):
+            if key in self._entries:
+                del self._entries[key]
+                self._forget_key(key, skip_edge_key=edge_key)
+                self.n_invalidations += 1
+        self._edge_fingerprints.pop(edge_key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._edge_to_cache_keys.clear()
+        self._edge_fingerprints.clear()
+        self._vertex_to_edge_keys.clear()
+
+    def _forget_key(self, key: Hashable, skip_edge_key: Optional[str] = None):
+        for edge_key in key[0]:
+            if edge_key == skip_edge_key:
+                continue
+            cache_keys = self._edge_to_cache_keys.get(edge_key)
+            if cache_keys is not None:
+                cache_keys.discard(key)
+                if not cache_keys:
+                    del self._edge_to_cache_keys[edge_key]
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ConvexRestrictionCache(EdgePathCache):
+    """Cache of convex restriction solutions keyed by the active edge path,
+    whether the post solve was skipped and the solver options."""
+
+    @staticmethod
+    def make_key(
+        active_edge_keys: List[str],
+        skip_post_solve: bool,
+        solver_options: Optional[SolverOptions] = None,
+    ) -> Hashable:
+        return (
+            tuple(active_edge_keys),
+            skip_post_solve,
+            solver_options_key(solver_options),
+        )
+
+    def get(self, key: Hashable):
+        sol = super().get(key)
+        if sol is None:
+            return None
+        # Cached solutions did not require any solve, so the solve statistics
+        # of the original solve do not apply to them
+        sol = copy(sol)
+        sol.time = 0.0
+        sol.n_iterations = None
+        sol.is_warm_started = False
+        sol.is_cached = True
+        return sol
@@ -0,0 +1,206 @@
+import logging
+import multiprocessing as mp
+import queue
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple, Type, Union
+
+from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.graph import ShortestPathSolution
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+
+logger = logging.getLogger(__name__)
+
+# Messages sent to the workers
+_SOLVE = "solve"
+_REPLAY = "replay"
+_STOP = "stop"
+
+# Seconds to wait for a result before checking that the workers are alive
+_RESULT_POLL_INTERVAL = 1.0
+# Seconds to wait for a worker to stop before terminating it
+_STOP_TIMEOUT = 10.0
+
+
+def _worker_main(
+    graph_cls: Type[ContactGraph],
+    graph_file: str,
+    graph_kwargs: dict,
+    shortcut_edge_cost_factory: Optional[Union[str, Callable]],
+    add_const_cost: bool,
+    task_queue: mp.Queue,
+    result_queue: mp.Queue,
+):
+    """Loads a replica of the graph, then replays growth events and solves
+    convex restrictions in the order that they are received.
+
+    The solutions are sent back with their solve times, the metrics are
+    collected by the main process. If the graph cannot be loaded, the
+    error is sent back under job id None and the worker exits.
+    """
+    # Imported here so that the graph package does not depend on the cost
+    # estimators at import time
+    from large_gcs.cost_estimators.shortcut_edge_ce import ShortcutEdgeCE
+
+    try:
+        graph = graph_cls.load_from_file(graph_file, **graph_kwargs)
+        cost_estimator = ShortcutEdgeCE(
+            graph, shortcut_edge_cost_factory, add_const_cost
+        )
+    except Exception as e:
+        result_queue.put((None, None, repr(e)))
+        return
+    while True:
+        msg, payload = task_queue.get()
+        if msg == _STOP:
+            break
+        elif msg == _REPLAY:
+            method_name, args = payload
+            getattr(graph, method_name)(*args)
+        elif msg == _SOLVE:
+            job_id, edge_key, active_edge_keys = payload
+            try:
+                sol = cost_estimator.solve_on_graph(
+                    graph,
+                    graph.edges[edge_key],
+                    active_edge_keys,
+                    solve_convex_restriction=True,
+                )
+                # MathematicalProgramResult cannot be sent between processes
+                sol.result = None
+                result_queue.put((job_id, sol, None))
+            except Exception as e:
+                result_queue.put((job_id, None, repr(e)))
+
+
+class ConvexRestrictionSolveService:
+    """Pool of worker processes that each hold a replica of a contact graph,
+    to solve many shortcut edge convex restrictions concurrently.
+
+    Drake's GraphOfConvexSets cannot be shared between Python threads,
+    so each worker loads its own replica of the graph from file once.
+    Replicas of an IncrementalContactGraph are kept in sync by
+    replaying the calls that grow the graph (see attach) in every worker
+    before any later solve.
+    """
+
+    def __init__(
+        self,
+        graph_file: str,
+        graph_cls: Type[ContactGraph] = IncrementalContactGraph,
+        graph_kwargs: Optional[dict] = None,
+        n_workers: Optional[int] = None,
+        shortcut_edge_cost_factory: Optional[Union[str, Callable]] = None,
+        add_const_cost: bool = False,
+    ):
+        self._graph_file = graph_file
+        self._graph_cls = graph_cls
+        self._graph_kwargs = graph_kwargs or {}
+        self._n_workers = n_workers or mp.cpu_count()
+        self._shortcut_edge_cost_factory = shortcut_edge_cost_factory
+        self._add_const_cost = add_const_cost
+        self._job_ids = count()
+        self._workers: List[mp.Process] = []
+        self._task_queues: List[mp.Queue] = []
+        self._result_queue: Optional[mp.Queue] = None
+
+    def start(self) -> "ConvexRestrictionSolveService":
+        # Spawn instead of fork so that workers do not inherit drake state.
+        ctx = mp.get_context("spawn")
+        self._result_queue = ctx.Queue()
+        logger.info(f"Starting {self._n_workers} convex restriction solve workers")
+        for _ in range(self._n_workers):
+            task_queue = ctx.Queue()
+            # Not a daemon, since loading the graph uses a multiprocessing Pool
+            worker = ctx.Process(
+                target=_worker_main,
+                args=(
+                    self._graph_cls,
+                    self._graph_file,
+                    self._graph_kwargs,
+                    self._shortcut_edge_cost_factory,
+                    self._add_const_cost,
+                    task_queue,
+                    self._result_queue,
+                ),
+            )
+            worker.start()
+            self._workers.append(worker)
+            self._task_queues.append(task_queue)
+        return self
+
+    def attach(self, graph: IncrementalContactGraph) -> None:
+        """Replay every growth of the graph in the replicas."""
+        graph.add_growth_callback(self.replay)
+
+    def replay(self, method_name: str, *args) -> None:
+        for task_queue in self._task_queues:
+            task_queue.put((_REPLAY, (method_name, args)))
+
+    def solve(self, jobs: List[Tuple[str, List[str]]]) -> List[ShortestPathSolution]:
+        """Solves the convex restriction through each (edge key, active edge
+        keys) job, with a shortcut edge to the target if the edge does not
+        end at the target.
+
+        Blocks until all jobs are solved, and returns the solutions
+        in the order of the jobs.
+        """
+        assert len(self._workers) > 0, "Service must be started before solving"
+        job_ids = []
+        for i, (edge_key, active_edge_keys) in enumerate(jobs):
+            job_id = next(self._job_ids)
+            job_ids.append(job_id)
+            self._task_queues[i % self._n_workers].put(
+                (_SOLVE, (job_id, edge_key, list(active_edge_keys)))
+            )
+
+        sols: Dict[int, ShortestPathSolution] = {}
+        errors = []
+        for _ in range(len(jobs)):
+            job_id, sol, error = self._get_result()
+            if job_id is None:
+                raise RuntimeError(
+                    "Convex restriction solve worker failed to load the graph: "
+                    f"{error}"
+                )
+            if error is not None:
+                errors.append(error)
+            sols[job_id] = sol
+        if len(errors) > 0:
+            raise RuntimeError(
+                f"Convex restriction solve failed in worker: {errors[0]}"
+            )
+        return [sols[job_id] for job_id in job_ids]
+
+    def _get_result(self):
+        """Next result from the workers, raises if a worker died instead of
+        waiting for its results forever."""
+        while True:
+            try:
+                return self._result_queue.get(timeout=_RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                for worker in self._workers:
+                    if not worker.is_alive():
+                        raise RuntimeError(
+                            f"Convex restriction solve worker {worker.name} "
+                            f"exited with code {worker.exitcode}"
+                        )
+
+    def close(self) -> None:
+        """Stops the workers, terminating those that do not stop in time
+        (e.g. in the middle of a long solve). Safe to call more than once."""
+        for task_queue in self._task_queues:
+            task_queue.put((_STOP, None))
+        for worker in self._workers:
+            worker.join(timeout=_STOP_TIMEOUT)
+            if worker.is_alive():
+                logger.warning(f"Terminating solve worker {worker.name}")
+                worker.terminate()
+                worker.join()
+        self._workers = []
+        self._task_queues = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -11,6 +11,9 @@ from large_gcs.contact.contact_regions_set import ContactRegionParams, ContactRe
 from large_gcs.contact.contact_set import ContactPointSet, ContactSet
 from large_gcs.contact.rigid_body import MobilityType, RigidBody
 from large_gcs.geometry.polyhedron import Polyhedron
+from large_gcs.graph.compiled_cost_constraint_registry import (
+    CompiledCostConstraintRegistry,
+)
 from large_gcs.graph.contact_cost_constraint_factory import (
     vertex_cost_position_path_length,
 )
@@ -33,6 +36,7 @@ class FactoredCollisionFreeGraph(ContactGraph):
         add_source_set: bool = False,
     ):
         Graph.__init__(self, workspace=workspace)
+        self._compiled_costs_constraints = CompiledCostConstraintRegistry()
         self._cost_scaling = cost_scaling
         self.movable_body = movable_body
         self.obstacles = []
@@ -144,7 +148,11 @@ class FactoredCollisionFreeGraph(ContactGraph):
         costs = [
             (
                 [
-                    vertex_cost_position_path_length(set.vars, self._cost_scaling),
+                    self._compiled_costs_constraints.get(
+                        vertex_cost_position_path_length,
+                        vars=set.vars,
+                        scaling=self._cost_scaling,
+                    ),
                 ]
                 if isinstance(set, ContactSet)
                 else []
@@ -1,10 +1,11 @@
 import logging
 import pickle
+import sys
 from collections import defaultdict
 from copy import copy
 from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import matplotlib.patches as patches
 import matplotlib.pyplot as plt
@@ -23,11 +24,31 @@ from pydrake.all import (
 from tqdm import tqdm
 
 from large_gcs.geometry.convex_set import ConvexSet
+from large_gcs.graph.convex_restriction_cache import (
+    CacheEvictionPolicy,
+    ConvexRestrictionCache,
+    EdgePathCache,
+)
+from large_gcs.graph.name_interner import NameInterner
+from large_gcs.graph.path_lp_solver import (
+    PathLinearProgramResult,
+    PathLinearProgramSolver,
+)
+from large_gcs.graph.path_program_builder import PathProgramBuilder
 from large_gcs.utils.utils import dict_to_dataclass
 
 logger = logging.getLogger(__name__)
 
 
+def get_solver_iterations(result: MathematicalProgramResult) -> Optional[int]:
+    """Number of iterations taken by the solver, if the solver reports it."""
+    details = result.get_solver_details()
+    for attr in ["iterations", "iter"]:
+        if hasattr(details, attr):
+            return int(getattr(details, attr))
+    return None
+
+
 @dataclass
 class ShortestPathSolution:
     # Whether the optimization was successful
@@ -42,6 +63,21 @@ class ShortestPathSolution:
     flows: Optional[List[float]] = None
     # Result of the optimization
     result: Optional[MathematicalProgramResult] = None
+    # Number of solver iterations, if reported by the solver
+    n_iterations: Optional[int] = None
+    # Whether the solver was given an initial guess
+    is_warm_started: bool = False
+    # Whether the solution was taken from the convex restriction cache
+    # instead of being solved
+    is_cached: bool = False
+
+    @property
+    def vertex_solutions(self) -> Dict[str, np.ndarray]:
+        """Maps the vertices in the path to their solution, e.g. to warm
+        start the convex restriction of a longer path."""
+        if self.vertex_path is None or self.ambient_path is None:
+            return {}
+        return dict(zip(self.vertex_path, self.ambient_path))
 
     def __str__(self):
         result = []
@@ -95,6 +131,74 @@ class ShortestPathSolution:
         sol = dict_to_dataclass(ShortestPathSolution, loaded_dict)
         return sol
 
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the solution (excluding the
+        MathematicalProgramResult, whose size is not exposed)."""
+        nbytes = sys.getsizeof(self) + sys.getsizeof(self.__dict__)
+        for path in [self.vertex_path, self.ambient_path, self.flows]:
+            if path is not None:
+                nbytes += sys.getsizeof(path)
+        if self.ambient_path is not None:
+            nbytes += sum(sys.getsizeof(a) for a in self.ambient_path)
+        return nbytes
+
+
+@dataclass
+class CompactShortestPathSolution:
+    """Compact record of a convex restriction solution for storing on the
+    many nodes of a search.
+
+    Only keeps the cost, success flag and solve time, plus the values
+    of a single vertex (the last vertex of the node's path) in one
+    contiguous buffer. The values of the other vertices can be
+    recomputed by solving the convex restriction of the node's path.
+    """
+
+    is_success: bool
+    cost: float
+    time: float
+    vertex_name: Optional[str] = None
+    vertex_values: Optional[np.ndarray] = None
+    n_iterations: Optional[int] = None
+    is_warm_started: bool = False
+
+    @classmethod
+    def from_solution(
+        cls, sol: ShortestPathSolution, vertex_name: str, dtype=np.float64
+    ) -> "CompactShortestPathSolution":
+        vertex_values = sol.vertex_solutions.get(vertex_name)
+        if vertex_values is not None:
+            # Copy so that a view does not keep the full solution alive
+            vertex_values = np.array(vertex_values, dtype=dtype)
+        return cls(
+            sol.is_success,
+            sol.cost,
+            sol.time,
+            vertex_name if vertex_values is not None else None,
+            vertex_values,
+            sol.n_iterations,
+            sol.is_warm_started,
+        )
+
+    @property
+    def result(self) -> None:
+        # The MathematicalProgramResult is never kept
+        return None
+
+    @property
+    def vertex_solutions(self) -> Dict[str, np.ndarray]:
+        if self.vertex_values is None:
+            return {}
+        return {self.vertex_name: self.vertex_values}
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = sys.getsizeof(self) + sys.getsizeof(self.__dict__)
+        if self.vertex_values is not None:
+            nbytes += sys.getsizeof(self.vertex_values)
+        return nbytes
+
 
 @dataclass
 class DefaultGraphCostsConstraints:
@@ -146,6 +250,119 @@ class Edge:
         return f'("{u}", "{v}")'
 
 
+class LazyVertex(Vertex):
+    """Vertex whose convex set, costs and constraints are created on first
+    access, and which is added to the gcs of its graph on first access of
+    gcs_vertex.
+
+    Used to load large graphs without building every set and drake vertex
+    up front, see Graph.add_lazy_vertex.
+    """
+
+    def __init__(self, graph: "Graph", name: str, create_vertex: Callable[[], Vertex]):
+        self._graph = graph
+        self._name = name
+        self._create_vertex = create_vertex
+        self._vertex: Optional[Vertex] = None
+        self._gcs_vertex: Optional[GraphOfConvexSets.Vertex] = None
+
+    def _get_vertex(self) -> Vertex:
+        if self._vertex is None:
+            self._vertex = self._create_vertex()
+            self._create_vertex = None
+        return self._vertex
+
+    @property
+    def is_created(self) -> bool:
+        return self._vertex is not None
+
+    @property
+    def is_in_gcs(self) -> bool:
+        return self._gcs_vertex is not None
+
+    @property
+    def convex_set(self) -> ConvexSet:
+        return self._get_vertex().convex_set
+
+    @property
+    def costs(self) -> List[Cost]:
+        return self._get_vertex().costs
+
+    @property
+    def constraints(self) -> List[Constraint]:
+        return self._get_vertex().constraints
+
+    @property
+    def gcs_vertex(self) -> GraphOfConvexSets.Vertex:
+        if self._gcs_vertex is None:
+            self._gcs_vertex = self._graph._add_vertex_to_gcs(self._name, self)
+        return self._gcs_vertex
+
+    def to_vertex(self) -> Vertex:
+        """Plain vertex with the same convex set, costs and constraints, not
+        tied to this graph or its gcs (for adding to another graph)."""
+        return Vertex(self.convex_set, self.costs, self.constraints)
+
+    def __repr__(self):
+        return f"LazyVertex(name={self._name!r}, is_created={self.is_created})"
+
+
+class LazyEdge(Edge):
+    """Edge whose costs and constraints are created on first access, and
+    which is added to the gcs of its graph on first access of gcs_edge.
+
+    See Graph.add_lazy_edge.
+    """
+
+    def __init__(
+        self,
+        graph: "Graph",
+        u: str,
+        v: str,
+        create_costs_constraints: Callable[[], Tuple[List[Cost], List[Constraint]]],
+    ):
+        self.u = u
+        self.v = v
+        self.key_suffix = None
+        self.__post_init__()
+        self._graph = graph
+        self._create_costs_constraints = create_costs_constraints
+        self._costs_constraints: Optional[Tuple[List[Cost], List[Constraint]]] = None
+        self._gcs_edge: Optional[GraphOfConvexSets.Edge] = None
+
+    def _get_costs_constraints(self) -> Tuple[List[Cost], List[Constraint]]:
+        if self._costs_constraints is None:
+            self._costs_constraints = self._create_costs_constraints()
+            self._create_costs_constraints = None
+        return self._costs_constraints
+
+    @property
+    def is_in_gcs(self) -> bool:
+        return self._gcs_edge is not None
+
+    @property
+    def costs(self) -> List[Cost]:
+        return self._get_costs_constraints()[0]
+
+    @property
+    def constraints(self) -> List[Constraint]:
+        return self._get_costs_constraints()[1]
+
+    @property
+    def gcs_edge(self) -> GraphOfConvexSets.Edge:
+        if self._gcs_edge is None:
+            self._gcs_edge = self._graph._add_edge_to_gcs(self)
+        return self._gcs_edge
+
+    def to_edge(self) -> Edge:
+        """Plain edge with the same costs and constraints, not tied to this
+        graph or its gcs (for adding to another graph)."""
+        return Edge(self.u, self.v, self.costs, self.constraints)
+
+    def __repr__(self):
+        return f"LazyEdge(u={self.u!r}, v={self.v!r})"
+
+
 @dataclass
 class GraphParams:
     # Tuple of the smallest and largest ambient dimension of the vertices
@@ -180,7 +397,16 @@ class Graph:
         self._default_costs_constraints = default_costs_constraints
         self.vertices: Dict[str, Vertex] = {}
         self.edges: Dict[str, Edge] = {}
-        self._adjacency_list: Dict[str, List[str]] = defaultdict(list)
+        # Dense integer ids of the vertex names and edge keys. The names
+        # are kept as a view for logging and serialization.
+        self._vertex_interner = NameInterner()
+        self._edge_interner = NameInterner()
+        # Edges indexed by edge id, None if removed
+        self._edges_by_id: List[Optional[Edge]] = []
+        # Per-vertex indexes of edge ids so that edge lookups are O(degree).
+        # Dicts are used as insertion-ordered sets so that removal is O(1).
+        self._outgoing_edge_ids: Dict[int, Dict[int, None]] = defaultdict(dict)
+        self._incoming_edge_ids: Dict[int, Dict[int, None]] = defaultdict(dict)
         self._source_name = None
         self._target_name = None
 
@@ -208,6 +434,88 @@ class Graph:
         self._gcs_options_wo_relaxation = GraphOfConvexSetsOptions()
         self._gcs_options_wo_relaxation.convex_relaxation = False
 
+        # Opt-in cache of convex restriction solutions, see enable_convex_restriction_cache
+        self._conv_res_cache: Optional[ConvexRestrictionCache] = None
+        # Opt-in incremental construction of convex restrictions, see enable_incremental_path_programs
+        self._path_program_builder: Optional[PathProgramBuilder] = None
+        # Opt-in SciPy HiGHS backend for linear convex restrictions, see enable_path_lp_solver
+        self._path_lp_solver: Optional[PathLinearProgramSolver] = None
+        self._should_cross_check_path_lp = False
+        self.n_path_lp_cross_check_mismatches = 0
+        # Whether lazy vertices or edges were added, which are only added
+        # to the gcs on first use
+        self._has_lazy_elements = False
+
+    def enable_convex_restriction_cache(
+        self,
+        max_size: int = 10000,
+        eviction_policy: CacheEvictionPolicy = CacheEvictionPolicy.LRU,
+    ):
+        """Cache the solutions of solve_convex_restriction keyed by the
+        active edge path and the solver options.
+
+        Entries are invalidated when an edge on the path is re-added
+        with different costs or constraints, or when one of its
+        vertices is removed.
+        """
+        self._conv_res_cache = ConvexRestrictionCache(max_size, eviction_policy)
+        for edge_key, e in self.edges.items():
+            self._conv_res_cache.on_edge_added(
+                edge_key, e.u, e.v, e.costs, e.constraints
+            )
+
+    def disable_convex_restriction_cache(self):
+        self._conv_res_cache = None
+
+    def enable_incremental_path_programs(
+        self,
+        max_cached_prefixes: int = 1000,
+        eviction_policy: CacheEvictionPolicy = CacheEvictionPolicy.LRU,
+    ):
+        """Build the programs of solve_convex_restriction by extending the
+        cached program of the path's prefix by one edge instead of
+        rebuilding the whole path program in every solve.
+
+        Paths that visit a vertex more than once fall back to
+        GraphOfConvexSets.SolveConvexRestriction.
+        """
+        self._path_program_builder = PathProgramBuilder(
+            self, max_cached_prefixes, eviction_policy
+        )
+        for edge_key, e in self.edges.items():
+            self._path_program_builder.programs.on_edge_added(
+                edge_key, e.u, e.v, e.costs, e.constraints
+            )
+
+    def disable_incremental_path_programs(self):
+        self._path_program_builder = None
+
+    def enable_path_lp_solver(self, should_cross_check: bool = False):
+        """Solve convex restrictions that are linear programs over polyhedral
+        sets (e.g. contact graphs with L1 norm costs) directly with SciPy's
+        HiGHS instead of building a drake program. The solver options
+        passed to solve_convex_restriction are ignored for these paths,
+        except by the drake solve of the cross check.
+
+        Other paths, and solves that need the MathematicalProgramResult,
+        fall back to drake. If should_cross_check, every path is also
+        solved with drake and cost mismatches are logged and counted in
+        n_path_lp_cross_check_mismatches.
+        """
+        self._path_lp_solver = PathLinearProgramSolver(self)
+        self._should_cross_check_path_lp = should_cross_check
+
+    def disable_path_lp_solver(self):
+        self._path_lp_solver = None
+
+    def _edge_path_caches(self) -> List[EdgePathCache]:
+        caches = []
+        if self._conv_res_cache is not None:
+            caches.append(self._conv_res_cache)
+        if self._path_program_builder is not None:
+            caches.append(self._path_program_builder.programs)
+        return caches
+
     def add_vertex(
         self, vertex: Vertex, name: str = "", should_add_to_gcs: bool = True
     ):
@@ -215,6 +523,12 @@ class Graph:
         if name == "":
             name = len(self.vertices)
         assert name not in self.vertices
+        # Use the same name object as any previous vertex with this name
+        name = self._vertex_interner.canonical(name)
+
+        if isinstance(vertex, LazyVertex):
+            # Its gcs_vertex belongs to the graph it was loaded into
+            vertex = vertex.to_vertex()
 
         # Set default costs and constraints if necessary
         v = vertex
@@ -234,30 +548,53 @@ class Graph:
         # allows for convenient adding of vertices from one graph to another
         v = copy(vertex)
         if should_add_to_gcs:
-            v.gcs_vertex = self._gcs.AddVertex(v.convex_set.set, name)
-            # Add costs and constraints to gcs vertex
-            if v.costs:
-                for cost in v.costs:
-                    binding = Binding[Cost](cost, v.gcs_vertex.x().flatten())
-                    v.gcs_vertex.AddCost(binding)
-            if v.constraints:
-                for constraint in v.constraints:
-                    binding = Binding[Constraint](
-                        constraint, v.gcs_vertex.x().flatten()
-                    )
-                    v.gcs_vertex.AddConstraint(binding)
+            v.gcs_vertex = self._add_vertex_to_gcs(name, v)
 
         self.vertices[name] = v
 
+    def add_lazy_vertex(self, name: str, create_vertex: Callable[[], Vertex]):
+        """Add a vertex whose convex set, costs and constraints are created
+        by create_vertex on first access, and which is added to the gcs on
+        first access of its gcs_vertex."""
+        assert name not in self.vertices
+        name = self._vertex_interner.canonical(name)
+        self.vertices[name] = LazyVertex(self, name, create_vertex)
+        self._has_lazy_elements = True
+
+    def _add_vertex_to_gcs(self, name: str, v: Vertex) -> GraphOfConvexSets.Vertex:
+        gcs_vertex = self._gcs.AddVertex(v.convex_set.set, name)
+        # Add costs and constraints to gcs vertex
+        if v.costs or v.constraints:
+            x = gcs_vertex.x().flatten()
+        if v.costs:
+            for cost in v.costs:
+                gcs_vertex.AddCost(Binding[Cost](cost, x))
+        if v.constraints:
+            for constraint in v.constraints:
+                gcs_vertex.AddConstraint(Binding[Constraint](constraint, x))
+        return gcs_vertex
+
     def remove_vertex(self, name: str):
         """Remove a vertex from the graph as well as any edges from or to that
         vertex."""
-        self._gcs.RemoveVertex(self.vertices[name].gcs_vertex)
+        v = self.vertices[name]
+        if not isinstance(v, LazyVertex) or v.is_in_gcs:
+            self._gcs.RemoveVertex(v.gcs_vertex)
         self.vertices.pop(name)
-        for edge in self.edge_keys:
-            if name in edge:
+        if self._path_lp_solver is not None:
+            self._path_lp_solver.forget_vertex(name)
+        for cache in self._edge_path_caches():
+            # A vertex with the same name may be re-added with a different set
+            cache.invalidate_vertex(name)
+        vertex_id = self._vertex_interner.get_id(name)
+        incident_edge_ids = list(self._outgoing_edge_ids.pop(vertex_id, {})) + list(
+            self._incoming_edge_ids.pop(vertex_id, {})
+        )
+        for edge_id in incident_edge_ids:
+            # Self loops appear in both indexes
+            if self._edges_by_id[edge_id] is not None:
                 self.remove_edge(
-                    edge, remove_from_gcs=False
+                    self._edge_interner.name(edge_id), remove_from_gcs=False
                 )  # gcs.RemoveVertex already removes edges from gcs
 
     def add_vertices_from_sets(
@@ -288,7 +625,13 @@ class Graph:
 
     def add_edge(self, edge: Edge, should_add_to_gcs: bool = True):
         """Add an edge to the graph."""
-        e = copy(edge)
+        if isinstance(edge, LazyEdge):
+            # Its gcs_edge belongs to the graph it was loaded into
+            e = edge.to_edge()
+        else:
+            e = copy(edge)
+        e.u = self._vertex_interner.canonical(e.u)
+        e.v = self._vertex_interner.canonical(e.v)
         # Set default costs and constraints if necessary
         if self._default_costs_constraints:  # Have defaults
             if (
@@ -304,36 +647,75 @@ class Graph:
                 e.constraints = self._default_costs_constraints.edge_constraints
 
         if should_add_to_gcs:
-            e.gcs_edge = self._gcs.AddEdge(
-                u=self.vertices[e.u].gcs_vertex,
-                v=self.vertices[e.v].gcs_vertex,
-                name=e.key,
-            )
+            e.gcs_edge = self._add_edge_to_gcs(e)
+
+        return self._register_edge(e)
+
+    def add_lazy_edge(
+        self,
+        u: str,
+        v: str,
+        create_costs_constraints: Callable[[], Tuple[List[Cost], List[Constraint]]],
+    ):
+        """Add an edge whose costs and constraints are created by
+        create_costs_constraints on first access, and which is added to the
+        gcs on first access of its gcs_edge."""
+        e = LazyEdge(
+            self,
+            self._vertex_interner.canonical(u),
+            self._vertex_interner.canonical(v),
+            create_costs_constraints,
+        )
+        self._has_lazy_elements = True
+        return self._register_edge(e)
+
+    def _add_edge_to_gcs(self, e: Edge) -> GraphOfConvexSets.Edge:
+        gcs_edge = self._gcs.AddEdge(
+            u=self.vertices[e.u].gcs_vertex,
+            v=self.vertices[e.v].gcs_vertex,
+            name=e.key,
+        )
 
-            # Add costs and constraints to gcs edge
-            if e.costs:
-                for cost in e.costs:
-                    x = np.concatenate([e.gcs_edge.xu(), e.gcs_edge.xv()])
-                    binding = Binding[Cost](cost, x)
-                    e.gcs_edge.AddCost(binding)
-            if e.constraints:
-                for constraint in e.constraints:
-                    x = np.concatenate([e.gcs_edge.xu(), e.gcs_edge.xv()])
-                    binding = Binding[Constraint](constraint, x)
-                    e.gcs_edge.AddConstraint(binding)
+        # Add costs and constraints to gcs edge
+        if e.costs or e.constraints:
+            x = np.concatenate([gcs_edge.xu(), gcs_edge.xv()])
+        if e.costs:
+            for cost in e.costs:
+                gcs_edge.AddCost(Binding[Cost](cost, x))
+        if e.constraints:
+            for constraint in e.constraints:
+                gcs_edge.AddConstraint(Binding[Constraint](constraint, x))
+        return gcs_edge
+
+    def _register_edge(self, e: Edge) -> Edge:
+        for cache in self._edge_path_caches():
+            cache.on_edge_added(e.key, e.u, e.v, e.costs, e.constraints)
 
         self.edges[e.key] = e
-        self._adjacency_list[e.u].append(e.v)
+        edge_id = self._edge_interner.intern(e.key)
+        if edge_id == len(self._edges_by_id):
+            self._edges_by_id.append(e)
+        else:
+            self._edges_by_id[edge_id] = e
+        self._outgoing_edge_ids[self._vertex_interner.get_id(e.u)][edge_id] = None
+        self._incoming_edge_ids[self._vertex_interner.get_id(e.v)][edge_id] = None
         return e
 
     def remove_edge(self, edge_key: str, remove_from_gcs: bool = True):
         """Remove an edge from the graph."""
         e = self.edges[edge_key]
-        if remove_from_gcs:
+        if remove_from_gcs and (not isinstance(e, LazyEdge) or e.is_in_gcs):
             self._gcs.RemoveEdge(e.gcs_edge)
 
         self.edges.pop(edge_key)
-        self._adjacency_list[e.u].remove(e.v)
+        edge_id = self._edge_interner.get_id(edge_key)
+        self._edges_by_id[edge_id] = None
+        u_id = self._vertex_interner.get_id(e.u)
+        if u_id in self._outgoing_edge_ids:
+            self._outgoing_edge_ids[u_id].pop(edge_id, None)
+        v_id = self._vertex_interner.get_id(e.v)
+        if v_id in self._incoming_edge_ids:
+            self._incoming_edge_ids[v_id].pop(edge_id, None)
 
     def add_edges_from_vertex_names(
         self,
@@ -367,33 +749,77 @@ class Graph:
         assert vertex_name in self.vertices
         self._target_name = vertex_name
 
+    def vertex_id(self, vertex_name: str) -> Optional[int]:
+        """Dense integer id of a vertex name, None if the name was never
+        added. Ids are kept when a vertex is removed and added again."""
+        return self._vertex_interner.get_id(vertex_name)
+
+    def vertex_name_from_id(self, vertex_id: int) -> str:
+        return self._vertex_interner.name(vertex_id)
+
+    def edge_id(self, edge_key: str) -> Optional[int]:
+        """Dense integer id of an edge key, None if the key was never
+        added."""
+        return self._edge_interner.get_id(edge_key)
+
+    def edge_from_id(self, edge_id: int) -> Optional[Edge]:
+        """The edge with the given id, None if it has been removed."""
+        return self._edges_by_id[edge_id]
+
+    def outgoing_edge_ids(self, vertex_id: int) -> List[int]:
+        return list(self._outgoing_edge_ids.get(vertex_id, ()))
+
+    def incoming_edge_ids(self, vertex_id: int) -> List[int]:
+        return list(self._incoming_edge_ids.get(vertex_id, ()))
+
     def outgoing_edges(self, vertex_name: str) -> List[Edge]:
         """Get the outgoing edges of a vertex."""
         assert vertex_name in self.vertices
-        return [edge for edge in self.edges.values() if edge.u == vertex_name]
+        return [
+            self._edges_by_id[id]
+            for id in self._outgoing_edge_ids.get(self.vertex_id(vertex_name), ())
+        ]
 
     def successors(self, vertex_name: str) -> List[str]:
         """Get the successors of a vertex."""
-        return self._adjacency_list[vertex_name]
+        return [
+            self._edges_by_id[id].v
+            for id in self._outgoing_edge_ids.get(self.vertex_id(vertex_name), ())
+        ]
 
     def incoming_edges(self, vertex_name: str) -> List[Edge]:
         """Get the incoming edges of a vertex."""
         assert vertex_name in self.vertices
-        return [edge for edge in self.edges.values() if edge.v == vertex_name]
+        return [
+            self._edges_by_id[id]
+            for id in self._incoming_edge_ids.get(self.vertex_id(vertex_name), ())
+        ]
 
     def incident_edges(self, vertex_name: str) -> List[Edge]:
         """Get the incident edges of a vertex."""
         assert vertex_name in self.vertices
-        return [
-            edge
-            for edge in self.edges.values()
-            if edge.u == vertex_name or edge.v == vertex_name
-        ]
+        vertex_id = self.vertex_id(vertex_name)
+        # Merge while preserving order and dropping duplicates from self loops
+        ids = dict.fromkeys(self._outgoing_edge_ids.get(vertex_id, ()))
+        ids.update(dict.fromkeys(self._incoming_edge_ids.get(vertex_id, ())))
+        return [self._edges_by_id[id] for id in ids]
+
+    def _add_lazy_elements_to_gcs(self):
+        """Adds the lazy vertices and edges that are not in the gcs yet,
+        for solves over the whole gcs."""
+        if not self._has_lazy_elements:
+            return
+        for v in self.vertices.values():
+            v.gcs_vertex
+        for e in self.edges.values():
+            e.gcs_edge
+        self._has_lazy_elements = False
 
     def solve_shortest_path(self, use_convex_relaxation=False) -> ShortestPathSolution:
         """Solve the shortest path problem."""
         assert self._source_name is not None
         assert self._target_name is not None
+        self._add_lazy_elements_to_gcs()
         result = self._gcs.SolveShortestPath(
             self.vertices[self._source_name].gcs_vertex,
             self.vertices[self._target_name].gcs_vertex,
@@ -416,16 +842,65 @@ class Graph:
         skip_post_solve: bool = False,
         should_return_result: bool = False,
         solver_options: Optional[SolverOptions] = None,
+        initial_guess: Optional[Dict[str, np.ndarray]] = None,
     ) -> ShortestPathSolution:
+        """
+        Args:
+            initial_guess: Initial guess for the vertices in the path (e.g. the
+                parent's solution, see ShortestPathSolution.vertex_solutions),
+                vertices that are not included are initialized to zero. Only
+                used with incremental path programs, since
+                GraphOfConvexSets.SolveConvexRestriction does not take an
+                initial guess.
+        """
         # logger.debug(f"active edge keys: {active_edge_keys}")
         active_edges = [self.edges[edge_key] for edge_key in active_edge_keys]
-        gcs_edges = [edge.gcs_edge for edge in active_edges]
+        # The raw result is not cached, so only solutions without it are cached
+        use_cache = self._conv_res_cache is not None and not should_return_result
+        if use_cache:
+            cache_key = self._conv_res_cache.make_key(
+                active_edge_keys, skip_post_solve, solver_options
+            )
+            sol = self._conv_res_cache.get(cache_key)
+            if sol is not None:
+                if not skip_post_solve:
+                    self._post_solve(sol)
+                return sol
         if solver_options is not None:
             self._gcs_options_wo_relaxation.solver_options = solver_options
-        result = self._gcs.SolveConvexRestriction(
-            gcs_edges,
-            self._gcs_options_wo_relaxation,
+        if self._path_lp_solver is not None and not should_return_result:
+            lp_result = self._path_lp_solver.solve(active_edge_keys)
+            if lp_result is not None:
+                sol = self._parse_path_lp_result(lp_result, skip_post_solve)
+                if self._should_cross_check_path_lp:
+                    # Uses the given solver options, like the drake solve would
+                    self._cross_check_path_lp_result(active_edges, sol)
+                self._gcs_options_wo_relaxation.solver_options = SolverOptions()
+                if not skip_post_solve:
+                    self._post_solve(sol)
+                if use_cache:
+                    self._conv_res_cache.put(cache_key, sol)
+                return sol
+        result = None
+        if self._path_program_builder is not None:
+            result = self._path_program_builder.solve(
+                active_edge_keys, self._gcs_options_wo_relaxation, initial_guess
+            )
+        # Only a guess for a vertex of the path warm starts the solve, e.g. not
+        # the empty guess of a compact parent solution
+        is_warm_started = (
+            result is not None
+            and bool(initial_guess)
+            and any(
+                v in initial_guess for v in self.path_vertex_names(active_edge_keys)
+            )
         )
+        if result is None:
+            gcs_edges = [edge.gcs_edge for edge in active_edges]
+            result = self._gcs.SolveConvexRestriction(
+                gcs_edges,
+                self._gcs_options_wo_relaxation,
+            )
         # logger.debug(f"solver options used: {self._gcs_options_wo_relaxation.solver_options.GetOptions(MosekSolver.id())}")
         self._gcs_options_wo_relaxation.solver_options = SolverOptions()
         # logger.debug(f"is_success: {result.is_success()}")
@@ -434,13 +909,27 @@ class Graph:
             sol = self._parse_partial_convex_restriction_result(
                 result, should_return_result
             )
+            if self._path_program_builder is not None and result.is_success():
+                # The vertex path is known when the program is built incrementally,
+                # so the solution is cheaply kept to warm start longer paths.
+                vertex_path = self.path_vertex_names(active_edge_keys)
+                if vertex_path is not None:
+                    sol.vertex_path = vertex_path
+                    sol.ambient_path = [
+                        result.GetSolution(self.vertices[v].gcs_vertex.x())
+                        for v in vertex_path
+                    ]
         else:
             sol = self._parse_convex_restriction_result(
                 result, active_edges, should_return_result
             )
             # Optional post solve hook for subclasses
             self._post_solve(sol)
+        sol.n_iterations = get_solver_iterations(result)
+        sol.is_warm_started = is_warm_started
 
+        if use_cache:
+            self._conv_res_cache.put(cache_key, sol)
         return sol
 
     def solve_convex_restrictions(
@@ -453,11 +942,18 @@ class Graph:
         ]
         gcs_paths = [[edge.gcs_edge for edge in path] for path in paths]
 
-        all_results: List[MathematicalProgramResult] = (
-            self._gcs.SolveConvexRestrictions(
-                active_edges=gcs_paths, parallelism=Parallelism(True)
+        if hasattr(self._gcs, "SolveConvexRestrictions"):
+            all_results: List[MathematicalProgramResult] = (
+                self._gcs.SolveConvexRestrictions(
+                    active_edges=gcs_paths, parallelism=Parallelism(True)
+                )
             )
-        )
+        else:
+            # Fall back to serial solves on Drake versions without the parallel API
+            all_results = [
+                self._gcs.SolveConvexRestriction(path, self._gcs_options_wo_relaxation)
+                for path in gcs_paths
+            ]
 
         sols = []
         for e_path, result in zip(paths, all_results):
@@ -478,6 +974,7 @@ class Graph:
                     a_path,
                     None,
                     None,
+                    n_iterations=get_solver_iterations(result),
                 )
             )
         return sols
@@ -486,6 +983,7 @@ class Graph:
         self, transition: str, targets: List[str], use_convex_relaxation=False
     ) -> ShortestPathSolution:
         assert self._source_name is not None
+        self._add_lazy_elements_to_gcs()
 
         result = self._gcs.SolveFactoredShortestPath(
             self.vertices[self._source_name].gcs_vertex,
@@ -537,13 +1035,15 @@ class Graph:
         ambient_path = []
         flows = []
         if result.is_success():
-            flow_variables = [e.phi() for e in self._gcs.Edges()]
-            flows = [result.GetSolution(p) for p in flow_variables]
+            gcs_edges = self._gcs.Edges()
+            flows = [result.GetSolution(e.phi()) for e in gcs_edges]
             edge_path = []
-            for k, flow in enumerate(flows):
+            # Lazy edges are added to the gcs out of order, so the edges are
+            # looked up by name (the edge key)
+            for gcs_edge, flow in zip(gcs_edges, flows):
                 if flow >= 0.99:
-                    edge_path.append(self.edges[self.edge_keys[k]])
-            assert len(self._gcs.Edges()) == self.n_edges
+                    edge_path.append(self.edges[gcs_edge.name()])
+            assert len(gcs_edges) == self.n_edges
             # Edges are in order they were added to the graph and not in order of the path
             (
                 vertex_path,
@@ -556,6 +1056,43 @@ class Graph:
             result.is_success(), cost, time, vertex_path, ambient_path, flows, result
         )
 
+    def _parse_path_lp_result(
+        self, lp_result: PathLinearProgramResult, skip_post_solve: bool
+    ) -> ShortestPathSolution:
+        if lp_result.is_success:
+            vertex_path, ambient_path = lp_result.vertex_path, lp_result.ambient_path
+        elif skip_post_solve:
+            vertex_path, ambient_path = None, None
+        else:
+            vertex_path, ambient_path = [], []
+        return ShortestPathSolution(
+            lp_result.is_success,
+            lp_result.cost,
+            lp_result.time,
+            vertex_path,
+            ambient_path,
+            None if skip_post_solve else [],
+            n_iterations=lp_result.n_iterations,
+        )
+
+    def _cross_check_path_lp_result(
+        self, active_edges: List[Edge], sol: ShortestPathSolution, rtol: float = 1e-4
+    ) -> None:
+        result = self._gcs.SolveConvexRestriction(
+            [edge.gcs_edge for edge in active_edges],
+            self._gcs_options_wo_relaxation,
+        )
+        drake_cost = result.get_optimal_cost()
+        if result.is_success() != sol.is_success or (
+            sol.is_success and not np.isclose(sol.cost, drake_cost, rtol=rtol)
+        ):
+            self.n_path_lp_cross_check_mismatches += 1
+            logger.warning(
+                f"HiGHS and drake disagree on convex restriction "
+                f"{[edge.key for edge in active_edges]}: "
+                f"HiGHS cost {sol.cost}, drake cost {drake_cost}"
+            )
+
     def _parse_partial_convex_restriction_result(
         self, result: MathematicalProgramResult, should_return_result: bool = False
     ) -> ShortestPathSolution:
@@ -617,13 +1154,15 @@ class Graph:
         ambient_path = []
         flows = []
         if result.is_success():
-            flow_variables = [e.phi() for e in self._gcs.Edges()]
-            flows = [result.GetSolution(p) for p in flow_variables]
+            gcs_edges = self._gcs.Edges()
+            flows = [result.GetSolution(e.phi()) for e in gcs_edges]
             edge_path = []
-            for k, flow in enumerate(flows):
+            # Lazy edges are added to the gcs out of order, so the edges are
+            # looked up by name (the edge key)
+            for gcs_edge, flow in zip(gcs_edges, flows):
                 if flow >= 0.99:
-                    edge_path.append(self.edges[self.edge_keys[k]])
-            assert len(self._gcs.Edges()) == self.n_edges
+                    edge_path.append(self.edges[gcs_edge.name()])
+            assert len(gcs_edges) == self.n_edges
             # Edges are in order they were added to the graph and not in order of the path
             vertex_path = self._convert_active_edges_to_vertex_path(
                 self.source_name, self.target_name, edge_path
@@ -715,6 +1254,21 @@ class Graph:
 
         return transposed_paths
 
+    def path_vertex_names(self, active_edge_keys: List[str]) -> Optional[List[str]]:
+        """Names of the vertices along the path, or None if the edges do not
+        form a path that visits each vertex at most once."""
+        if len(active_edge_keys) == 0:
+            return None
+        edges = [self.edges[key] for key in active_edge_keys]
+        vertex_names = [edges[0].u]
+        for e in edges:
+            if e.u != vertex_names[-1]:
+                return None
+            vertex_names.append(e.v)
+        if len(set(vertex_names)) != len(vertex_names):
+            return None
+        return vertex_names
+
     @staticmethod
     def _convert_active_edges_to_vertex_path(
         source_name,
@@ -888,6 +1442,18 @@ class Graph:
         largest_dim = max([v.convex_set.dim for v in self.vertices.values()])
         return (smallest_dim, largest_dim)
 
+    @property
+    def convex_restriction_cache(self) -> Optional[ConvexRestrictionCache]:
+        return self._conv_res_cache
+
+    @property
+    def path_program_builder(self) -> Optional[PathProgramBuilder]:
+        return self._path_program_builder
+
+    @property
+    def path_lp_solver(self) -> Optional[PathLinearProgramSolver]:
+        return self._path_lp_solver
+
     @property
     def n_vertices(self):
         return len(self.vertices)
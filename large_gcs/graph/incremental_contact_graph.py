@@ -1,25 +1,40 @@
 import ast
+import hashlib
 import logging
+import os
+import weakref
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from copy import copy
 from itertools import combinations, product
-from multiprocessing import Pool
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
-from pydrake.all import Cost
-from tqdm import tqdm
+from pydrake.all import Cost, HPolyhedron
 
 from large_gcs.contact.contact_regions_set import ContactRegionParams, ContactRegionsSet
 from large_gcs.contact.contact_set import ContactPointSet, ContactSet
 from large_gcs.contact.contact_set_decision_variables import ContactSetDecisionVariables
 from large_gcs.contact.rigid_body import MobilityType, RigidBody
 from large_gcs.geometry.polyhedron import Polyhedron
+from large_gcs.graph.columnar_graph_file import ColumnarGraphFile
+from large_gcs.graph.compiled_cost_constraint_registry import (
+    CompiledCostConstraintRegistry,
+)
 from large_gcs.graph.contact_graph import ContactGraph
 from large_gcs.graph.graph import Edge, Graph, ShortestPathSolution, Vertex
+from large_gcs.graph.intersection_service import (
+    IntersectionService,
+    intersection_service_or_new,
+)
+from large_gcs.graph.name_interner import NameInterner
 
 logger = logging.getLogger(__name__)
 
+# Bump when the contents of the adjacency cache change
+_ADJACENCY_CACHE_VERSION = 1
+_COLUMNAR_FILE_KIND = "incremental_contact_graph"
+
 
 class IncrementalContactGraph(ContactGraph):
     def __init__(
@@ -37,6 +52,9 @@ class IncrementalContactGraph(ContactGraph):
         should_add_gcs: bool = False,
         should_add_const_edge_cost: bool = True,
         should_use_l1_norm_vertex_cost: bool = True,
+        n_nullspace_workers: int = 0,
+        adjacency_cache_path: Optional[str] = None,
+        intersection_service: Optional[IntersectionService] = None,
     ):
         """Can either specify target_pos or target_region_params, but not both.
 
@@ -45,10 +63,22 @@ class IncrementalContactGraph(ContactGraph):
         determines whether or not to add the drake gcs vertices and
         edges to the graph. It is not required if you are only using the
         incremental graph as a reference but not actually solving any
-        gcs problems on it directly.
+        gcs problems on it directly. The nullspace sets of the vertices
+        are created on first use, or in the background by
+        n_nullspace_workers processes as vertices are generated if it
+        is positive. If adjacency_cache_path is given, the adjacency of
+        the contact pair modes is loaded from it when it was computed for
+        the same bodies, workspace, source and target, and is otherwise
+        computed and saved to it. The adjacency is computed with
+        intersection_service if given, otherwise with a new service that
+        is closed afterwards.
         """
         Graph.__init__(self, workspace=workspace)
         assert self.workspace is not None, "Workspace must be set"
+        self._compiled_costs_constraints = CompiledCostConstraintRegistry()
+        # Called with the name and arguments of each method that grows the graph,
+        # so that replicas of the graph can be kept in sync by replaying them.
+        self._growth_callbacks: List[Callable] = []
         self._should_use_l1_norm_vertex_cost = should_use_l1_norm_vertex_cost
         if not should_use_l1_norm_vertex_cost:
             raise NotImplementedError(
@@ -62,6 +92,10 @@ class IncrementalContactGraph(ContactGraph):
         self._should_incl_simul_mode_switches = should_incl_simul_mode_switches
         self._should_add_gcs = should_add_gcs
         self._should_add_const_edge_cost = should_add_const_edge_cost
+        self._n_nullspace_workers = n_nullspace_workers
+        self._nullspace_executor: Optional[ProcessPoolExecutor] = None
+        self._adjacency_cache_path = adjacency_cache_path
+        self._intersection_service = intersection_service
 
         if not should_add_const_edge_cost:
 
@@ -140,6 +174,8 @@ class IncrementalContactGraph(ContactGraph):
     ):
         self._initialize_set_generation_variables()
 
+        body_name_to_target_pos = None
+        body_name_to_indiv_target_region_params = None
         body_name_to_source_pos = {}
         for i, body in enumerate(self._movable):
             body_name_to_source_pos[body] = self.source_pos[i]
@@ -171,12 +207,56 @@ class IncrementalContactGraph(ContactGraph):
                         ] = individual_params
                         self._bodies_w_target_region.add(self.robots[body_index].name)
 
+        source_neighbor_contact_pair_modes = self._load_contact_pair_mode_adjacency()
+        if source_neighbor_contact_pair_modes is None:
+            source_neighbor_contact_pair_modes = (
+                self._compute_contact_pair_mode_adjacency(
+                    body_name_to_source_pos,
+                    body_name_to_target_pos,
+                    body_name_to_indiv_target_region_params,
+                )
+            )
+            self._save_contact_pair_mode_adjacency(source_neighbor_contact_pair_modes)
+
+        assert len(self._body_pair_to_mode_ids.keys()) == len(
+            source_neighbor_contact_pair_modes
+        ), "Should have a single contact pair mode for each "
+        self._intern_contact_pair_modes()
+        source_neighbor_mode_ids = tuple(
+            self._mode_interner.get_id(id) for id in source_neighbor_contact_pair_modes
+        )
+        v_name = self._vertex_name_from_mode_ids(source_neighbor_mode_ids)
+        self._register_vertex_mode_ids(v_name, source_neighbor_mode_ids)
+        self._generate_neighbor(
+            u=self.source_name,
+            v=v_name,
+            is_v_in_vertices=False,
+            v_set=self._create_contact_set_from_contact_pair_mode_ids(
+                source_neighbor_contact_pair_modes
+            ),
+        )
+
+    def _compute_contact_pair_mode_adjacency(
+        self,
+        body_name_to_source_pos: Dict[str, np.ndarray],
+        body_name_to_target_pos: Optional[Dict[str, np.ndarray]],
+        body_name_to_indiv_target_region_params: Optional[
+            Dict[str, ContactRegionParams]
+        ],
+    ) -> List[str]:
+        """Computes the adjacent contact pair modes of each mode and the
+        modes with possible edges to the target.
+
+        Returns the ids of the contact pair modes, one per body pair, of
+        the neighbor of the source.
+        """
         self._modes_w_possible_edge_to_target = set()
         self._body_pair_to_mode_ids_w_possible_edge_to_target = defaultdict(list)
 
         self._adj_modes = defaultdict(list)
-        sets = []
+        base_polyhedra_list: List[HPolyhedron] = []
         pairs_of_modes = []
+        pairs_of_sets = []
         source_neighbor_contact_pair_modes = []
 
         for body_pair, mode_ids in self._body_pair_to_mode_ids.items():
@@ -202,13 +282,15 @@ class IncrementalContactGraph(ContactGraph):
                 )
                 for id in mode_ids
             }
+            set_indices = {
+                id: len(base_polyhedra_list) + i for i, id in enumerate(mode_ids)
+            }
+            base_polyhedra_list.extend(base_polyhedra[id] for id in mode_ids)
             tmp_pairs_of_modes = list(combinations(mode_ids, 2))
             pairs_of_modes.extend(tmp_pairs_of_modes)
-            sets.extend(
-                [
-                    (base_polyhedra[mode_id1], base_polyhedra[mode_id2])
-                    for mode_id1, mode_id2 in tmp_pairs_of_modes
-                ]
+            pairs_of_sets.extend(
+                (set_indices[mode_id1], set_indices[mode_id2])
+                for mode_id1, mode_id2 in tmp_pairs_of_modes
             )
             # Determining an outgoing edge for source vertex
             source_pos = np.array([])
@@ -265,29 +347,187 @@ class IncrementalContactGraph(ContactGraph):
                             body_pair
                         ].append(id)
 
-        with Pool() as pool:
-            logger.info(f"Calculating adjacent contact pair modes ({len(sets)})")
-            intersections = list(
-                tqdm(pool.imap(self._check_intersection, sets), total=len(sets))
+        logger.info(f"Calculating adjacent contact pair modes ({len(pairs_of_sets)})")
+        with intersection_service_or_new(self._intersection_service) as service:
+            set_ids = service.add_sets(base_polyhedra_list)
+            intersections = service.intersects(
+                set_ids[np.array(pairs_of_sets, dtype=np.int64).reshape(-1, 2)],
+                show_progress=True,
             )
-            for (mode_id1, mode_id2), intersection in zip(
-                pairs_of_modes, intersections
-            ):
-                if intersection:
-                    self._adj_modes[mode_id1].append(mode_id2)
-                    self._adj_modes[mode_id2].append(mode_id1)
+            service.remove_sets(set_ids)
+        for (mode_id1, mode_id2), intersection in zip(pairs_of_modes, intersections):
+            if intersection:
+                self._adj_modes[mode_id1].append(mode_id2)
+                self._adj_modes[mode_id2].append(mode_id1)
+
+        return source_neighbor_contact_pair_modes
+
+    def _adjacency_cache_key(self) -> str:
+        """Hash of everything the contact pair mode adjacency depends on:
+        the bodies, the workspace and the source and target."""
+        hasher = hashlib.sha256()
+        hasher.update(f"{_ADJACENCY_CACHE_VERSION}|{type(self).__name__}".encode())
+        for body in self.obstacles + self.objects + self.robots:
+            hasher.update(
+                f"{body.name}|{body.mobility_type.name}|{body.n_pos_points}".encode()
+            )
+            hasher.update(np.asarray(body.geometry.vertices, dtype=float).tobytes())
+        for pos in (self.workspace, self.source_pos, self.target_pos):
+            if pos is not None:
+                hasher.update(np.asarray(pos, dtype=float).tobytes())
+        if self.target_region_params is not None:
+            for params in self.target_region_params:
+                hasher.update(np.asarray(params.region_vertices, dtype=float).tobytes())
+                hasher.update(f"{params.obj_indices}|{params.rob_indices}".encode())
+        return hasher.hexdigest()
 
-        assert len(self._body_pair_to_mode_ids.keys()) == len(
-            source_neighbor_contact_pair_modes
-        ), "Should have a single contact pair mode for each "
-        self._generate_neighbor(
-            u=self.source_name,
-            v=str(tuple(source_neighbor_contact_pair_modes)),
-            is_v_in_vertices=False,
-            v_set=self._create_contact_set_from_contact_pair_mode_ids(
-                source_neighbor_contact_pair_modes
+    def _load_contact_pair_mode_adjacency(self) -> Optional[List[str]]:
+        """Loads the contact pair mode adjacency from the adjacency cache if
+        it was computed for the same inputs.
+
+        Returns the ids of the source neighbor contact pair modes, or
+        None if there is no valid cache.
+        """
+        path = self._adjacency_cache_path
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            data = np.load(path, allow_pickle=True).item()
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning(f"Could not read adjacency cache {path}: {e}")
+            return None
+        if data.get("key") != self._adjacency_cache_key():
+            logger.info(f"Adjacency cache {path} is stale, recomputing")
+            return None
+
+        logger.info(f"Loaded contact pair mode adjacency from {path}")
+        self._adj_modes = defaultdict(list, data["adj_modes"])
+        self._modes_w_possible_edge_to_target = set(
+            data["modes_w_possible_edge_to_target"]
+        )
+        self._body_pair_to_mode_ids_w_possible_edge_to_target = defaultdict(
+            list, data["body_pair_to_mode_ids_w_possible_edge_to_target"]
+        )
+        return list(data["source_neighbor_contact_pair_modes"])
+
+    def _save_contact_pair_mode_adjacency(
+        self, source_neighbor_contact_pair_modes: List[str]
+    ) -> None:
+        path = self._adjacency_cache_path
+        if path is None:
+            return
+        data = {
+            "key": self._adjacency_cache_key(),
+            "adj_modes": dict(self._adj_modes),
+            "modes_w_possible_edge_to_target": sorted(
+                self._modes_w_possible_edge_to_target
+            ),
+            "body_pair_to_mode_ids_w_possible_edge_to_target": dict(
+                self._body_pair_to_mode_ids_w_possible_edge_to_target
             ),
+            "source_neighbor_contact_pair_modes": source_neighbor_contact_pair_modes,
+        }
+        # Write to a temporary file first so that a concurrent reader never
+        # sees a partially written cache.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write adjacency cache {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _intern_contact_pair_modes(self) -> None:
+        """Assigns dense integer ids to the contact pair modes, so that
+        neighbor generation runs on tuples of ints instead of parsing
+        vertex names. Vertex names stay str(tuple(mode names)), as a view
+        for logging and serialization."""
+        self._mode_interner = NameInterner(self._contact_pair_modes.keys())
+        self._adj_mode_ids: List[List[int]] = [
+            [self._mode_interner.get_id(adj_id) for adj_id in self._adj_modes[id]]
+            for id in self._mode_interner
+        ]
+        # Per mode flags used by _does_vertex_have_possible_edge_to_target
+        # and num_modes_not_adj_to_target
+        self._mode_blocks_edge_to_target: List[bool] = []
+        self._mode_not_adj_to_target: List[bool] = []
+        for id in self._mode_interner:
+            mode = self._contact_pair_modes[id]
+            # Only consider body pairs that are not both movable.
+            # Because target is defined by absolute position of movable bodies
+            # not relative position between bodies, so the contact pair mode
+            # between movable bodies not not matter.
+            is_considered = not (
+                mode.body_a.mobility_type != MobilityType.STATIC
+                and mode.body_b.mobility_type != MobilityType.STATIC
+            )
+            if self.target_pos is None:
+                # Where the movable body has a target set for it
+                is_considered = is_considered and (
+                    mode.body_a.name in self._bodies_w_target_region
+                    or mode.body_b.name in self._bodies_w_target_region
+                )
+            self._mode_blocks_edge_to_target.append(
+                is_considered and id not in self._modes_w_possible_edge_to_target
+            )
+            # If this body pair has modes with possible edges to target specified
+            # but this mode is not one of them
+            self._mode_not_adj_to_target.append(
+                mode.body_pair in self._body_pair_to_mode_ids_w_possible_edge_to_target
+                and id
+                not in self._body_pair_to_mode_ids_w_possible_edge_to_target[
+                    mode.body_pair
+                ]
+            )
+        self._vertex_mode_ids: Dict[str, Tuple[int, ...]] = {}
+        self._mode_ids_vertex_name: Dict[Tuple[int, ...], str] = {}
+
+        # Whether the base sets of a set of modes intersect, keyed by the
+        # sorted unique mode ids. Shared between all the vertices, so e.g.
+        # the edges u -> v and v -> u are only checked once.
+        self._mode_set_intersections: Dict[Tuple[int, ...], bool] = {}
+        self.n_mode_set_intersection_hits = 0
+        self.n_mode_set_intersection_misses = 0
+
+    def _do_modes_intersect(self, mode_ids: Tuple[int, ...]) -> bool:
+        """Whether the base constraints of the modes and the workspace are
+        feasible together, memoized by the set of modes."""
+        key = tuple(sorted(set(mode_ids)))
+        intersects = self._mode_set_intersections.get(key)
+        if intersects is not None:
+            self.n_mode_set_intersection_hits += 1
+            return intersects
+        self.n_mode_set_intersection_misses += 1
+        H, h = self._contact_set_template.base_rows(
+            [self._contact_pair_modes[id] for id in self._mode_interner.names(key)]
         )
+        intersects = not HPolyhedron(H, h).IsEmpty()
+        self._mode_set_intersections[key] = intersects
+        return intersects
+
+    def _vertex_name_from_mode_ids(self, mode_ids: Tuple[int, ...]) -> str:
+        v_name = self._mode_ids_vertex_name.get(mode_ids)
+        if v_name is None:
+            v_name = str(tuple(self._mode_interner.names(mode_ids)))
+        return v_name
+
+    def _register_vertex_mode_ids(self, v_name: str, mode_ids: Tuple[int, ...]):
+        # Only vertices that are added to the graph are registered, so that
+        # candidate neighbors that do not intersect are not kept
+        self._vertex_mode_ids[v_name] = mode_ids
+        self._mode_ids_vertex_name[mode_ids] = v_name
+
+    def _mode_ids_from_vertex_name(self, vertex_name: str) -> Tuple[int, ...]:
+        mode_ids = self._vertex_mode_ids.get(vertex_name)
+        if mode_ids is None:
+            # Vertex names that were not generated by this graph
+            mode_ids = tuple(
+                self._mode_interner.get_id(id) for id in ast.literal_eval(vertex_name)
+            )
+            self._register_vertex_mode_ids(vertex_name, mode_ids)
+        return mode_ids
 
     def solve_shortest_path(self, use_convex_relaxation=False) -> ShortestPathSolution:
         if self._should_add_gcs:
@@ -330,8 +570,7 @@ class IncrementalContactGraph(ContactGraph):
         elif u_vertex_name == self.target_name:
             raise ValueError("Should not need to generate neighbors for target vertex")
 
-        # Convert string representation of tuple to actual tuple
-        mode_ids = ast.literal_eval(u_vertex_name)
+        mode_ids = self._mode_ids_from_vertex_name(u_vertex_name)
 
         if self._should_incl_simul_mode_switches:
             mode_ids_for_each_body_pair = []
@@ -339,7 +578,7 @@ class IncrementalContactGraph(ContactGraph):
                 mode_ids_for_each_body_pair.append(
                     # This order is what allows us to remove the first element in set_ids
                     [id]
-                    + self._adj_modes[id]
+                    + self._adj_mode_ids[id]
                 )
             set_ids = list(product(*mode_ids_for_each_body_pair))
             # Remove the first entry in the list which would be the current set
@@ -351,41 +590,44 @@ class IncrementalContactGraph(ContactGraph):
             # but we are not considering them for now.
             set_ids = []
             for i, id in enumerate(mode_ids):
-                for adj_id in self._adj_modes[id]:
-                    neighbor_set_id = list(copy(mode_ids))
-                    neighbor_set_id[i] = adj_id
-                    set_ids.append(tuple(neighbor_set_id))
-        potential_neighbors = []
+                for adj_id in self._adj_mode_ids[id]:
+                    set_ids.append(mode_ids[:i] + (adj_id,) + mode_ids[i + 1 :])
         neighbor_generator_inputs = []
         for set_id in set_ids:
-            v_name = str(set_id)
-            if (u_vertex_name, v_name) in self.edges:
+            v_name = self._vertex_name_from_mode_ids(set_id)
+            if Edge.key_from_uv(u_vertex_name, v_name) in self.edges:
                 # vertex and edge already exits, do nothing.
                 logger.debug(
                     f"vertex and edge already exist for {u_vertex_name} -> {v_name}"
                 )
                 continue
+            # The base sets of u and the neighbor intersect iff the base
+            # constraints of all their modes are feasible together.
+            if not self._do_modes_intersect(mode_ids + set_id):
+                continue
 
             if v_name in self.vertices:
                 is_v_in_vertices = True
                 v_set = self.vertices[v_name].convex_set
             else:
+                # Only build the contact set of neighbors that intersect
                 is_v_in_vertices = False
-                v_set = self._create_contact_set_from_contact_pair_mode_ids(set_id)
-            potential_neighbors.append(
-                (self.vertices[u_vertex_name].convex_set.base_set, v_set.base_set)
-            )
+                v_set = self._create_contact_set_from_contact_pair_mode_ids(
+                    self._mode_interner.names(set_id)
+                )
+                self._register_vertex_mode_ids(v_name, set_id)
             neighbor_generator_inputs.append(
                 (u_vertex_name, v_name, is_v_in_vertices, v_set)
             )
 
-        if self._does_vertex_have_possible_edge_to_target(u_vertex_name):
-            potential_neighbors.append(
-                (
-                    self.vertices[u_vertex_name].convex_set.base_set,
-                    self.vertices[self.target_name].convex_set.base_set,
-                )
+        if self._does_vertex_have_possible_edge_to_target(
+            u_vertex_name
+        ) and self._check_intersection(
+            (
+                self.vertices[u_vertex_name].convex_set.base_set,
+                self.vertices[self.target_name].convex_set.base_set,
             )
+        ):
             neighbor_generator_inputs.append(
                 (
                     u_vertex_name,
@@ -395,27 +637,19 @@ class IncrementalContactGraph(ContactGraph):
                 )
             )
 
-        # Parallelization seems to add significant overhead and the above code is already very slow when there are many potential neighbors
-        # with Pool() as pool:
-        #     logger.debug(f"Generating {len(set_ids)} possible neighbors for {u_vertex_name}")
-        #     intersections = list(
-        #         tqdm(pool.imap(self._check_intersection, potential_neighbors), total=len(potential_neighbors))
-        #     )
-        intersections = [
-            self._check_intersection(potential_neighbor)
-            for potential_neighbor in potential_neighbors
-        ]
+        for inputs in neighbor_generator_inputs:
+            self._generate_neighbor(*inputs)
 
-        for inputs, intersect in zip(neighbor_generator_inputs, intersections):
-            if intersect:
-                self._generate_neighbor(*inputs)
+        self._notify_growth("generate_neighbors", u_vertex_name)
 
     def _generate_neighbor(
         self, u: str, v: str, is_v_in_vertices: bool, v_set: Optional[ContactSet] = None
     ) -> None:
         if not is_v_in_vertices:
-            # Create the nullspace set for the vertex.
-            v_set._polyhedron.create_nullspace_set()
+            if self._n_nullspace_workers > 0:
+                v_set._polyhedron.precompute_nullspace_set(
+                    self._get_nullspace_executor()
+                )
 
             vertex = Vertex(
                 v_set,
@@ -433,6 +667,13 @@ class IncrementalContactGraph(ContactGraph):
             should_add_to_gcs=self._should_add_gcs,
         )
 
+    def _get_nullspace_executor(self) -> ProcessPoolExecutor:
+        if self._nullspace_executor is None:
+            self._nullspace_executor = ProcessPoolExecutor(self._n_nullspace_workers)
+            # Shut the workers down with the graph
+            weakref.finalize(self, self._nullspace_executor.shutdown, wait=False)
+        return self._nullspace_executor
+
     def add_vertex_path_to_graph(self, vertex_path: List[str]) -> None:
         """Adds the vertices and edges along a vertex path to the graph.
 
@@ -443,73 +684,48 @@ class IncrementalContactGraph(ContactGraph):
             v_set = None
             is_v_in_vertices = v_name in self.vertices
             if not is_v_in_vertices:
-                mode_ids = ast.literal_eval(v_name)
-                v_set = self._create_contact_set_from_contact_pair_mode_ids(mode_ids)
+                mode_ids = self._mode_ids_from_vertex_name(v_name)
+                v_set = self._create_contact_set_from_contact_pair_mode_ids(
+                    self._mode_interner.names(mode_ids)
+                )
                 assert v_set.set.IsEmpty() == False, f"Vertex {v_name} is empty"
             self._generate_neighbor(u_name, v_name, is_v_in_vertices, v_set)
 
+        self._notify_growth("add_vertex_path_to_graph", vertex_path)
+
+    def add_growth_callback(self, callback: Callable) -> None:
+        """Register a callback that is called as callback(method_name, *args)
+        after generate_neighbors or add_vertex_path_to_graph grows the
+        graph."""
+        self._growth_callbacks.append(callback)
+
+    def _notify_growth(self, method_name: str, *args) -> None:
+        for callback in self._growth_callbacks:
+            callback(method_name, *args)
+
     def _does_vertex_have_possible_edge_to_target(self, vertex_name: str) -> bool:
         # Determine if we can add an edge to the target vertex
-        # Convert string representation of tuple to actual tuple
-        mode_ids = ast.literal_eval(vertex_name)
-        possible_edge_to_target = []
-        if self.target_pos is not None:
-            for id in mode_ids:
-                mode = self._contact_pair_modes[id]
-                # Only consider body pairs that are not both movable.
-                # Because target is defined by absolute position of movable bodies
-                # not relative position between bodies, so the contact pair mode
-                # between movable bodies not not matter.
-                # Note for target pos, all movable bodies have a position set for them
-                if not (
-                    mode.body_a.mobility_type != MobilityType.STATIC
-                    and mode.body_b.mobility_type != MobilityType.STATIC
-                ):
-                    possible_edge_to_target.append(
-                        id in self._modes_w_possible_edge_to_target
-                    )
-        else:
-            for id in mode_ids:
-                mode = self._contact_pair_modes[id]
-                # Only consider body pairs that are not both movable AND
-                # where the movable body has a target set for it
-                if not (
-                    mode.body_a.mobility_type != MobilityType.STATIC
-                    and mode.body_b.mobility_type != MobilityType.STATIC
-                ) and (
-                    mode.body_a.name in self._bodies_w_target_region
-                    or mode.body_b.name in self._bodies_w_target_region
-                ):
-                    # logger.debug(f"considering {id}")
-                    possible_edge_to_target.append(
-                        id in self._modes_w_possible_edge_to_target
-                    )
-        if all(possible_edge_to_target):
-            return True
-        return False
+        mode_ids = self._mode_ids_from_vertex_name(vertex_name)
+        return not any(self._mode_blocks_edge_to_target[id] for id in mode_ids)
 
     def num_modes_not_adj_to_target(self, vertex_name: str) -> int:
         if vertex_name == self.source_name or vertex_name == self.target_name:
             # This computation is not valid for source or target vertex.
             return 0
-        mode_ids = ast.literal_eval(vertex_name)
-        n_modes = 0
-        for id in mode_ids:
-            mode = self._contact_pair_modes[id]
-            # If this body pair has modes with possible edges to target specified but this mode is not one of them, increment n_modes
-            if (
-                mode.body_pair in self._body_pair_to_mode_ids_w_possible_edge_to_target
-                and id
-                not in self._body_pair_to_mode_ids_w_possible_edge_to_target[
-                    mode.body_pair
-                ]
-            ):
-                n_modes += 1
-        return n_modes
+        mode_ids = self._mode_ids_from_vertex_name(vertex_name)
+        return sum(self._mode_not_adj_to_target[id] for id in mode_ids)
 
     ### SERIALIZATION METHODS ###
 
     def save_only_inc_to_file(self, path: str):
+        """Saves the bodies, source, target and workspace of the graph to a
+        columnar graph file (a directory, see ColumnarGraphFile), or to a
+        pickled dict if path ends in .npy."""
+        if not path.endswith(".npy"):
+            ColumnarGraphFile.write(
+                path, _COLUMNAR_FILE_KIND, self._columnar_file_header(), {}
+            )
+            return
         if self.target_pos is None:
             target_pos_objs = None
             target_pos_robs = None
@@ -531,12 +747,27 @@ class IncrementalContactGraph(ContactGraph):
             },
         )
 
+    @staticmethod
+    def adjacency_cache_file_path(path: str) -> str:
+        """Path of the adjacency cache stored next to the graph file."""
+        root, ext = os.path.splitext(os.path.normpath(path))
+        return f"{root}_adj_cache{ext or '.npy'}"
+
     @classmethod
     def load_from_file(
         cls,
         path: str,
         **kwargs,
     ):
+        """Pass adjacency_cache_path=None to not use the adjacency cache."""
+        kwargs.setdefault("adjacency_cache_path", cls.adjacency_cache_file_path(path))
+        if ColumnarGraphFile.is_columnar_graph_file(path):
+            graph_file = ColumnarGraphFile(path, _COLUMNAR_FILE_KIND)
+            return cls(
+                **cls._init_kwargs_from_columnar_file_header(graph_file.header),
+                **kwargs,
+            )
+
         data = np.load(path, allow_pickle=True).item()
         obs = [RigidBody.from_params(params) for params in data["obs_params"]]
         objs = [RigidBody.from_params(params) for params in data["objs_params"]]
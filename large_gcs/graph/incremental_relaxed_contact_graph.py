@@ -16,6 +16,7 @@ from large_gcs.contact.contact_pair_mode import (
     generate_relaxed_contact_pair_modes,
 )
 from large_gcs.contact.contact_set import ContactSet
+from large_gcs.contact.contact_set_template import ContactSetTemplate
 from large_gcs.contact.rigid_body import MobilityType, RigidBody
 from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
 
@@ -52,6 +53,7 @@ class IncrementalRelaxedContactGraph(IncrementalContactGraph):
             should_incl_simul_mode_switches=inc_contact_graph._should_incl_simul_mode_switches,
             should_add_gcs=inc_contact_graph._should_add_gcs,
             should_add_const_edge_cost=inc_contact_graph._should_add_const_edge_cost,
+            n_nullspace_workers=inc_contact_graph._n_nullspace_workers,
         )
 
     def _create_contact_set_from_contact_pair_mode_ids(
@@ -127,6 +129,12 @@ class IncrementalRelaxedContactGraph(IncrementalContactGraph):
             body.create_workspace_position_constraints(self.workspace)
             self._workspace_constraints += body.workspace_constraints
             self._base_workspace_constraints += body.base_workspace_constraints
+        self._contact_set_template = ContactSetTemplate(
+            self.objects,
+            self.robots,
+            self._workspace_constraints,
+            self._base_workspace_constraints,
+        )
 
         static_movable_pairs = list(product(obs_names, movable))
         obj_obj_pairs = list(combinations(obj_names, 2))
@@ -0,0 +1,210 @@
+import logging
+import multiprocessing as mp
+import queue
+from contextlib import contextmanager
+from itertools import count
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from pydrake.all import ConvexSet as DrakeConvexSet
+from tqdm import tqdm
+
+logger = logging.getLogger(__name__)
+
+# Messages sent to the workers
+_ADD = "add"
+_REMOVE = "remove"
+_INTERSECTS = "intersects"
+_STOP = "stop"
+
+# Seconds to wait for a result before checking that the workers are alive
+_RESULT_POLL_INTERVAL = 1.0
+
+
+def _intersects(sets: Dict[int, DrakeConvexSet], pairs: np.ndarray) -> np.ndarray:
+    return np.fromiter(
+        (sets[u].IntersectsWith(sets[v]) for u, v in pairs.tolist()),
+        dtype=bool,
+        count=len(pairs),
+    )
+
+
+def _worker_main(task_queue: mp.Queue, result_queue: mp.Queue):
+    """Holds the sets sent to it by id, and checks the intersection of
+    chunks of pairs of set ids in the order that they are received."""
+    sets: Dict[int, DrakeConvexSet] = {}
+    while True:
+        msg, payload = task_queue.get()
+        if msg == _STOP:
+            break
+        elif msg == _ADD:
+            first_id, new_sets = payload
+            sets.update(zip(count(first_id), new_sets))
+        elif msg == _REMOVE:
+            for id in payload:
+                sets.pop(id, None)
+        elif msg == _INTERSECTS:
+            chunk_id, pairs = payload
+            try:
+                result_queue.put((chunk_id, _intersects(sets, pairs), None))
+            except Exception as e:
+                result_queue.put((chunk_id, None, repr(e)))
+
+
+class IntersectionService:
+    """Pool of long lived worker processes that check whether pairs of
+    drake convex sets intersect.
+
+    Each set is sent to the workers once, when it is added, and is
+    referred to by its id afterwards, so checking many pairs only sends
+    arrays of id pairs to the workers and boolean arrays back. The same
+    service can be used to build several graphs (see the
+    intersection_service arguments of ContactGraph and
+    IncrementalContactGraph, and LowerBoundGraph.set_intersection_service).
+
+    With n_workers=0 the intersections are checked in the calling
+    process, which avoids the worker startup and the pickling of the sets
+    when there is no parallelism to gain.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None, chunk_size: int = 512):
+        if n_workers is None:
+            n_workers = mp.cpu_count() if mp.cpu_count() > 1 else 0
+        self._n_workers = n_workers
+        self._chunk_size = chunk_size
+        self._set_ids = count()
+        # Only used when checking in the calling process
+        self._sets: Dict[int, DrakeConvexSet] = {}
+        self._workers: List[mp.Process] = []
+        self._task_queues: List[mp.Queue] = []
+        self._result_queue: Optional[mp.Queue] = None
+        self._is_started = False
+
+    @property
+    def n_workers(self) -> int:
+        return self._n_workers
+
+    def start(self) -> "IntersectionService":
+        if self._is_started:
+            return self
+        self._is_started = True
+        if self._n_workers == 0:
+            return self
+        ctx = mp.get_context()
+        self._result_queue = ctx.Queue()
+        logger.debug(f"Starting {self._n_workers} intersection workers")
+        for _ in range(self._n_workers):
+            task_queue = ctx.Queue()
+            # Daemon, so that forgotten workers do not block the exit
+            worker = ctx.Process(
+                target=_worker_main,
+                args=(task_queue, self._result_queue),
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+            self._task_queues.append(task_queue)
+        return self
+
+    def add_sets(self, sets: Sequence[DrakeConvexSet]) -> np.ndarray:
+        """Sends the sets to the workers, and returns their ids."""
+        assert self._is_started, "Service must be started before adding sets"
+        ids = np.fromiter(
+            (next(self._set_ids) for _ in range(len(sets))),
+            dtype=np.int64,
+            count=len(sets),
+        )
+        if len(sets) == 0:
+            return ids
+        if self._n_workers == 0:
+            self._sets.update(zip(ids.tolist(), sets))
+        else:
+            for task_queue in self._task_queues:
+                task_queue.put((_ADD, (int(ids[0]), list(sets))))
+        return ids
+
+    def remove_sets(self, ids: Sequence[int]) -> None:
+        """Frees the sets with ids in the workers."""
+        ids = [int(id) for id in ids]
+        if self._n_workers == 0:
+            for id in ids:
+                self._sets.pop(id, None)
+        else:
+            for task_queue in self._task_queues:
+                task_queue.put((_REMOVE, ids))
+
+    def intersects(self, pairs: np.ndarray, show_progress: bool = False) -> np.ndarray:
+        """Returns whether the sets of each (n_pairs, 2) pair of set ids
+        intersect.
+
+        Blocks until all pairs are checked.
+        """
+        assert self._is_started, "Service must be started before checking"
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        n_chunks = -(-len(pairs) // self._chunk_size)
+        chunks = np.array_split(pairs, max(n_chunks, 1))
+        result = np.zeros(len(pairs), dtype=bool)
+        offsets = np.cumsum([0] + [len(chunk) for chunk in chunks])
+        with tqdm(total=len(pairs), disable=not show_progress) as pbar:
+            if self._n_workers == 0:
+                for i, chunk in enumerate(chunks):
+                    result[offsets[i] : offsets[i + 1]] = _intersects(self._sets, chunk)
+                    pbar.update(len(chunk))
+                return result
+
+            for i, chunk in enumerate(chunks):
+                self._task_queues[i % self._n_workers].put((_INTERSECTS, (i, chunk)))
+            errors = []
+            for _ in range(len(chunks)):
+                i, chunk_result, error = self._get_result()
+                if error is not None:
+                    errors.append(error)
+                    continue
+                result[offsets[i] : offsets[i + 1]] = chunk_result
+                pbar.update(len(chunk_result))
+        if len(errors) > 0:
+            raise RuntimeError(f"Intersection check failed in worker: {errors[0]}")
+        return result
+
+    def _get_result(self):
+        """Next result from the workers, raises if a worker died (e.g.
+        killed by the OS) instead of waiting for its results forever."""
+        while True:
+            try:
+                return self._result_queue.get(timeout=_RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                for worker in self._workers:
+                    if not worker.is_alive():
+                        raise RuntimeError(
+                            f"Intersection worker {worker.name} exited with "
+                            f"code {worker.exitcode}"
+                        )
+
+    def close(self) -> None:
+        for task_queue in self._task_queues:
+            task_queue.put((_STOP, None))
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        self._task_queues = []
+        self._sets = {}
+        self._is_started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+@contextmanager
+def intersection_service_or_new(
+    intersection_service: Optional[IntersectionService],
+) -> Iterator[IntersectionService]:
+    """Yields intersection_service if given, otherwise a new service that
+    is closed on exit."""
+    if intersection_service is not None:
+        yield intersection_service.start()
+    else:
+        with IntersectionService() as intersection_service:
+            yield intersection_service
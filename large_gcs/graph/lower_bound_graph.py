@@ -1,25 +1,35 @@
-import heapq as heap
 import itertools
 import logging
 import os
 import time
+import weakref
 from collections import defaultdict, namedtuple
 from copy import copy
 from dataclasses import dataclass
-from multiprocessing import Pool
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
+import scipy.sparse as sp
+from pydrake.all import ConvexSet as DrakeConvexSet
+from scipy.sparse.csgraph import dijkstra
 from tqdm import tqdm
 
-from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.columnar_graph_file import (
+    ColumnarGraphFile,
+    pack_names,
+    pack_ragged,
+    unpack_ragged,
+)
 from large_gcs.graph.graph import Edge, Graph, Vertex
+from large_gcs.graph.intersection_service import IntersectionService
 
 logger = logging.getLogger(__name__)
 
 # Named tuple for the key in the vertices dictionary
 LBGVertexKey = namedtuple("LBGVertexKey", ["pred", "vertex", "succ"])
 
+_COLUMNAR_FILE_KIND = "lower_bound_graph"
+
 
 @dataclass
 class LBGVertex:
@@ -62,6 +72,20 @@ class LowerBoundGraph:
         self._parent_edge_to_vertices: Dict[str, List[LBGVertexKey]] = defaultdict(list)
         self._g: Dict[LBGVertexKey, float] = {}
         self.metrics = {}
+        # Integer indexed view of the graph used by run_dijkstra, built from
+        # the dicts above on first use and dropped whenever they change
+        self._vertex_keys: Optional[List[LBGVertexKey]] = None
+        self._vertex_index: Optional[Dict[LBGVertexKey, int]] = None
+        self._csr: Optional[sp.csr_matrix] = None
+        # Cost to go of each vertex in _vertex_keys from the last run_dijkstra
+        self._g_array: Optional[np.ndarray] = None
+        # Index of the first lbg vertex of each parent vertex
+        self._parent_vertex_index: Dict[str, int] = {}
+        self._intersection_service: Optional[IntersectionService] = None
+        # Ids in the intersection service of the base sets of the vertices
+        # of the graph, and the base sets they were registered for
+        self._intersection_set_ids: Dict[str, Tuple[int, DrakeConvexSet]] = {}
+        self._intersection_graph: Optional[Graph] = None
 
     @classmethod
     def generate_from_gcs(
@@ -224,48 +248,91 @@ class LowerBoundGraph:
         """Assumes that there's no source and target already in the gcs
         graph."""
         logger.debug(f"Checking intersections with parent vertex")
-        v_names = self._graph.vertex_names
-        sets = [
-            (parent_vertex.convex_set.base_set, v.convex_set.base_set)
-            for v in self._graph.vertices.values()
-        ]
-        batch_size = 100
-        total = len(sets)
         lbg_vertex = LBGVertex(
             ("", "", parent_vertex_name), parent_vertex.convex_set.center
         )
         self.add_vertex(lbg_vertex)
-        with tqdm(total=total, desc="Processing batches", unit="batch") as pbar:
-            for batch_start in range(0, total, batch_size):
-                batch_end = min(batch_start + batch_size, total)
-                batch_v_names = v_names[batch_start:batch_end]
-                batch_sets = sets[batch_start:batch_end]
-                batch_intersections = []
-                with Pool() as pool:
-                    batch_intersections += list(
-                        pool.imap(ContactGraph._check_intersection, batch_sets)
-                    )
-                for v_name, intersection in zip(batch_v_names, batch_intersections):
-                    if intersection:
-                        u = self._parent_vertex_to_vertices[v_name][0]
-                        self.add_edge(u, lbg_vertex.key, 0)
-                        self.add_edge(lbg_vertex.key, u, 0)
-                pbar.update(batch_end - batch_start)
+        service = self._get_intersection_service()
+        # The base sets of the vertices of the graph are sent to the workers
+        # once, and reused by later updates of the same graph
+        if self._intersection_graph is not self._graph:
+            self._release_intersection_sets(list(self._intersection_set_ids))
+            self._intersection_graph = self._graph
+        # Vertices removed from the graph since the last update, or removed
+        # and added again with a different set
+        self._release_intersection_sets(
+            [
+                v_name
+                for v_name, (_, base_set) in self._intersection_set_ids.items()
+                if v_name not in self._graph.vertices
+                or self._graph.vertices[v_name].convex_set.base_set is not base_set
+            ]
+        )
+        v_names = self._graph.vertex_names
+        new_v_names = [
+            v_name for v_name in v_names if v_name not in self._intersection_set_ids
+        ]
+        new_base_sets = [
+            self._graph.vertices[v_name].convex_set.base_set for v_name in new_v_names
+        ]
+        new_set_ids = service.add_sets(new_base_sets)
+        self._intersection_set_ids.update(
+            zip(new_v_names, zip(new_set_ids.tolist(), new_base_sets))
+        )
+        (parent_set_id,) = service.add_sets([parent_vertex.convex_set.base_set])
+        set_ids = np.array(
+            [self._intersection_set_ids[v_name][0] for v_name in v_names],
+            dtype=np.int64,
+        )
+        intersections = service.intersects(
+            np.column_stack([np.full_like(set_ids, parent_set_id), set_ids]),
+            show_progress=True,
+        )
+        service.remove_sets([parent_set_id])
+        for i in np.flatnonzero(intersections):
+            u = self._parent_vertex_to_vertices[v_names[i]][0]
+            self.add_edge(u, lbg_vertex.key, 0)
+            self.add_edge(lbg_vertex.key, u, 0)
+
+    def set_intersection_service(self, intersection_service: IntersectionService):
+        """Use intersection_service in update_lbg, e.g. to share it with the
+        graph, instead of starting one."""
+        if self._intersection_service is not None:
+            self._release_intersection_sets(list(self._intersection_set_ids))
+        self._intersection_service = intersection_service.start()
+        self._intersection_graph = None
+
+    def _release_intersection_sets(self, v_names: List[str]) -> None:
+        """Frees the sets of these vertices in the intersection service."""
+        if len(v_names) == 0:
+            return
+        self._intersection_service.remove_sets(
+            [self._intersection_set_ids.pop(v_name)[0] for v_name in v_names]
+        )
+
+    def _get_intersection_service(self) -> IntersectionService:
+        if self._intersection_service is None:
+            self._intersection_service = IntersectionService().start()
+            # Shut the workers down with the lower bound graph
+            weakref.finalize(self, self._intersection_service.close)
+        return self._intersection_service
 
     def add_vertex(self, LBG_vertex: LBGVertex):
+        self._invalidate_csr()
         self._vertices[LBG_vertex.key] = LBG_vertex
         self._parent_vertex_to_vertices[LBG_vertex.parent_vertex].append(LBG_vertex.key)
         self._parent_edge_to_vertices[LBG_vertex.parent_edge].append(LBG_vertex.key)
 
     def add_edge(self, u: LBGVertexKey, v: LBGVertexKey, cost: float):
+        self._invalidate_csr()
         self._edges[(u, v)] = cost
         self._adjacency_list[u].append(v)
 
-    def outgoing_edges(self, v: str) -> List[Tuple[str, str]]:
+    def outgoing_edges(
+        self, v: LBGVertexKey
+    ) -> List[Tuple[LBGVertexKey, LBGVertexKey]]:
         """Get the outgoing edges of a vertex."""
-        # assert v in self._vertices
-        return [edge_key for edge_key in self._edges.keys() if edge_key[0] == v]
-        # return self._adjacency_list[v]
+        return [(v, succ) for succ in self._adjacency_list.get(v, [])]
 
     def successors(self, v: LBGVertexKey) -> List[LBGVertexKey]:
         return self._adjacency_list[v]
@@ -273,30 +340,68 @@ class LowerBoundGraph:
     def incoming_edges(self, vertex_name: str) -> List[Tuple[str, str]]:
         """Get the incoming edges of a vertex."""
         assert vertex_name in self._vertices
-        return [
-            edge_key for edge_key in self._edges.values() if edge_key[1] == vertex_name
-        ]
-
-    def run_dijkstra(self, parent_vertex_start) -> Tuple[float, List[str]]:
+        return [edge_key for edge_key in self._edges if edge_key[1] == vertex_name]
+
+    def _invalidate_csr(self):
+        self._vertex_keys = None
+        self._vertex_index = None
+        self._csr = None
+        self._g_array = None
+        self._parent_vertex_index = {}
+
+    def _build_csr(self, edges: np.ndarray = None, edge_costs: np.ndarray = None):
+        """Builds the integer indexed CSR adjacency matrix of the graph.
+
+        Vertices are indexed in the order of self._vertices. edges and
+        edge_costs are the (n_edges, 2) index pairs and costs of the edges
+        if they are already known, e.g. from a columnar graph file,
+        otherwise they are read from self._edges. Zero cost edges are kept
+        as explicit zeros, which csgraph treats as edges.
+        """
+        self._vertex_keys = list(self._vertices)
+        self._vertex_index = {key: i for i, key in enumerate(self._vertex_keys)}
+        if edges is None:
+            edges = np.array(
+                [
+                    (self._vertex_index[u], self._vertex_index[v])
+                    for u, v in self._edges
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 2)
+            edge_costs = np.fromiter(
+                self._edges.values(), dtype=np.float64, count=len(self._edges)
+            )
+        n_vertices = len(self._vertex_keys)
+        self._csr = sp.csr_matrix(
+            (edge_costs, (edges[:, 0], edges[:, 1])), shape=(n_vertices, n_vertices)
+        )
+        self._parent_vertex_index = {
+            parent: self._vertex_index[keys[0]]
+            for parent, keys in self._parent_vertex_to_vertices.items()
+            if len(keys) > 0
+        }
+
+    def run_dijkstra(self, parent_vertex_start):
+        """Computes the cost of the cheapest path from any of the lbg vertices
+        of parent_vertex_start to every lbg vertex.
+
+        The lbg edges come in both directions with equal costs, so when
+        started from the target this is the cost to go of every vertex.
+        """
         start_time = time.time()
-        self._g = {vertex: float("inf") for vertex in self._vertices.keys()}
-        expanded = set()
-        Q = []
-        for source in self._parent_vertex_to_vertices[parent_vertex_start]:
-            self._g[source] = 0
-            heap.heappush(Q, (0, source, []))
-        while len(Q) > 0:
-            cost, vertex_key, path = heap.heappop(Q)
-            if vertex_key in expanded:
-                continue
-            expanded.add(vertex_key)
-            for neighbor in self.successors(vertex_key):
-                if neighbor in expanded:
-                    continue
-                edge_cost = self._edges[(vertex_key, neighbor)]
-                if self._g[neighbor] > self._g[vertex_key] + edge_cost:
-                    self._g[neighbor] = self._g[vertex_key] + edge_cost
-                    heap.heappush(Q, (self._g[neighbor], neighbor, path + [vertex_key]))
+        if self._csr is None:
+            self._build_csr()
+        sources = [
+            self._vertex_index[key]
+            for key in self._parent_vertex_to_vertices[parent_vertex_start]
+        ]
+        if len(sources) == 0:
+            self._g_array = np.full(len(self._vertex_keys), np.inf)
+        else:
+            self._g_array = dijkstra(
+                self._csr, directed=True, indices=sources, min_only=True
+            )
+        self._g = dict(zip(self._vertex_keys, self._g_array.tolist()))
         duration = time.time() - start_time
         logger.info(f"Finished Dijkstra in {duration} seconds")
         logger.info(
@@ -304,10 +409,26 @@ class LowerBoundGraph:
         )
 
     def get_cost_to_go(self, gcs_vertex_name: str) -> float:
-        lbg_vertex = self._parent_vertex_to_vertices[gcs_vertex_name][0]
-        return self._g[lbg_vertex]
+        if self._g_array is None:
+            lbg_vertex = self._parent_vertex_to_vertices[gcs_vertex_name][0]
+            return self._g[lbg_vertex]
+        return self._g_array[self._parent_vertex_index[gcs_vertex_name]]
+
+    def get_costs_to_go(self, gcs_vertex_names: List[str]) -> np.ndarray:
+        """Vectorized get_cost_to_go, requires a prior run_dijkstra."""
+        indices = np.fromiter(
+            (self._parent_vertex_index[name] for name in gcs_vertex_names),
+            dtype=np.int64,
+            count=len(gcs_vertex_names),
+        )
+        return self._g_array[indices]
 
     def save_to_file(self, path: str):
+        """Saves the graph to a columnar graph file (a directory, see
+        ColumnarGraphFile), or to a pickled dict if path ends in .npy."""
+        if not path.endswith(".npy"):
+            self._save_to_columnar_file(path)
+            return
         np.save(
             path,
             {
@@ -324,8 +445,147 @@ class LowerBoundGraph:
             },
         )
 
+    def _save_to_columnar_file(self, path: str):
+        vertex_keys = list(self._vertices)
+        vertex_index = {key: i for i, key in enumerate(vertex_keys)}
+        names = {}
+        for key in vertex_keys:
+            for name in key:
+                names.setdefault(name, len(names))
+        for parent_name in itertools.chain(
+            self._parent_vertex_to_vertices, self._parent_edge_to_vertices
+        ):
+            names.setdefault(parent_name, len(names))
+
+        def pack_parent_to_vertices(parent_to_vertices):
+            values, offsets = pack_ragged(
+                [
+                    [vertex_index[key] for key in keys]
+                    for keys in parent_to_vertices.values()
+                ]
+            )
+            parents = np.array(
+                [names[name] for name in parent_to_vertices], dtype=np.int64
+            )
+            return parents, values, offsets
+
+        vertex_points, vertex_point_offsets = pack_ragged(
+            [self._vertices[key].point for key in vertex_keys], dtype=np.float64
+        )
+        adjacency, adjacency_offsets = pack_ragged(
+            [
+                [vertex_index[succ] for succ in self._adjacency_list.get(key, [])]
+                for key in vertex_keys
+            ]
+        )
+        (
+            parent_vertices,
+            parent_vertex_vertices,
+            parent_vertex_vertex_offsets,
+        ) = pack_parent_to_vertices(self._parent_vertex_to_vertices)
+        (
+            parent_edges,
+            parent_edge_vertices,
+            parent_edge_vertex_offsets,
+        ) = pack_parent_to_vertices(self._parent_edge_to_vertices)
+        columns = {
+            "names": pack_names(list(names)),
+            "vertex_triples": np.array(
+                [[names[name] for name in key] for key in vertex_keys], dtype=np.int64
+            ).reshape(-1, 3),
+            "vertex_points": vertex_points,
+            "vertex_point_offsets": vertex_point_offsets,
+            "edges": np.array(
+                [(vertex_index[u], vertex_index[v]) for u, v in self._edges],
+                dtype=np.int64,
+            ).reshape(-1, 2),
+            "edge_costs": np.array(list(self._edges.values()), dtype=np.float64),
+            "adjacency": adjacency,
+            "adjacency_offsets": adjacency_offsets,
+            "parent_vertices": parent_vertices,
+            "parent_vertex_vertices": parent_vertex_vertices,
+            "parent_vertex_vertex_offsets": parent_vertex_vertex_offsets,
+            "parent_edges": parent_edges,
+            "parent_edge_vertices": parent_edge_vertices,
+            "parent_edge_vertex_offsets": parent_edge_vertex_offsets,
+            # NaN for vertices without a cost to come
+            "g": np.array(
+                [self._g.get(key, np.nan) for key in vertex_keys], dtype=np.float64
+            ),
+        }
+        header = {
+            "graph_name": self._graph_name,
+            "source_name": self._source_name,
+            "target_name": self._target_name,
+            "metrics": self.metrics,
+        }
+        ColumnarGraphFile.write(path, _COLUMNAR_FILE_KIND, header, columns)
+
+    @classmethod
+    def _load_from_columnar_file(cls, path: str) -> "LowerBoundGraph":
+        graph_file = ColumnarGraphFile(path, _COLUMNAR_FILE_KIND)
+        header = graph_file.header
+        lbg = cls(header["graph_name"], header["source_name"], header["target_name"])
+        lbg.metrics = header["metrics"]
+        names = graph_file["names"].tolist()
+        vertex_keys = [
+            tuple(names[i] for i in triple)
+            for triple in graph_file["vertex_triples"].tolist()
+        ]
+        points = graph_file["vertex_points"]
+        point_offsets = graph_file["vertex_point_offsets"]
+        for i, key in enumerate(vertex_keys):
+            lbg._vertices[key] = LBGVertex(
+                key, np.array(unpack_ragged(points, point_offsets, i))
+            )
+        for (u, v), cost in zip(
+            graph_file["edges"].tolist(), graph_file["edge_costs"].tolist()
+        ):
+            lbg._edges[(vertex_keys[u], vertex_keys[v])] = cost
+        adjacency = graph_file["adjacency"].tolist()
+        adjacency_offsets = graph_file["adjacency_offsets"].tolist()
+        for i, key in enumerate(vertex_keys):
+            succs = unpack_ragged(adjacency, adjacency_offsets, i)
+            if len(succs) > 0:
+                lbg._adjacency_list[key] = [vertex_keys[j] for j in succs]
+        for parent_to_vertices, parents, values, offsets in (
+            (
+                lbg._parent_vertex_to_vertices,
+                "parent_vertices",
+                "parent_vertex_vertices",
+                "parent_vertex_vertex_offsets",
+            ),
+            (
+                lbg._parent_edge_to_vertices,
+                "parent_edges",
+                "parent_edge_vertices",
+                "parent_edge_vertex_offsets",
+            ),
+        ):
+            values = graph_file[values].tolist()
+            offsets = graph_file[offsets].tolist()
+            for i, parent in enumerate(graph_file[parents].tolist()):
+                parent_to_vertices[names[parent]] = [
+                    vertex_keys[j] for j in unpack_ragged(values, offsets, i)
+                ]
+        g = np.array(graph_file["g"])
+        lbg._g = {
+            key: cost
+            for key, cost in zip(vertex_keys, g.tolist())
+            if not np.isnan(cost)
+        }
+        # The saved vertex order and edge index pairs are those of the CSR
+        lbg._build_csr(
+            np.array(graph_file["edges"]), np.array(graph_file["edge_costs"])
+        )
+        if len(g) > 0 and not np.isnan(g).any():
+            lbg._g_array = g
+        return lbg
+
     @classmethod
     def load_from_file(cls, path: str) -> "LowerBoundGraph":
+        if ColumnarGraphFile.is_columnar_graph_file(path):
+            return cls._load_from_columnar_file(path)
         data = np.load(path, allow_pickle=True).item()
         lbg = cls(data["graph_name"], data["source_name"], data["target_name"])
         lbg._vertices = data["vertices"]
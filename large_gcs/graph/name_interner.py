@@ -0,0 +1,51 @@
+from typing import Dict, Hashable, Iterator, List, Optional
+
+
+class NameInterner:
+    """Assigns dense integer ids to names (vertex names, edge keys, contact
+    pair mode ids), in the order that they are first seen.
+
+    Ids are never reused or removed, so a name that is removed from a
+    graph and added again keeps its id. The canonical name object is kept,
+    so that equal names looked up through the interner are the same
+    object, which makes dict lookups with them compare by identity.
+    """
+
+    def __init__(self, names=()):
+        self._ids: Dict[Hashable, int] = {}
+        self._names: List[Hashable] = []
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: Hashable) -> int:
+        """Returns the id of name, assigning a new id if it was not seen
+        before."""
+        id = self._ids.get(name)
+        if id is None:
+            id = len(self._names)
+            self._ids[name] = id
+            self._names.append(name)
+        return id
+
+    def get_id(self, name: Hashable) -> Optional[int]:
+        """Returns the id of name, or None if it was never interned."""
+        return self._ids.get(name)
+
+    def name(self, id: int) -> Hashable:
+        return self._names[id]
+
+    def names(self, ids) -> List[Hashable]:
+        return [self._names[id] for id in ids]
+
+    def canonical(self, name: Hashable) -> Hashable:
+        """Returns the interned object equal to name."""
+        return self._names[self.intern(name)]
+
+    def __contains__(self, name: Hashable) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._names)
@@ -0,0 +1,265 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from pydrake.all import HPolyhedron, L1NormCost, LinearConstraint, LinearCost
+from pydrake.all import Point as DrakePoint
+from scipy.optimize import linprog
+
+from large_gcs.geometry.convex_set import ConvexSet
+
+if TYPE_CHECKING:
+    from large_gcs.graph.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+# (A_ub, b_ub, A_eq, b_eq) of a convex set, any of which may be None
+SetConstraints = Tuple[
+    Optional[np.ndarray],
+    Optional[np.ndarray],
+    Optional[np.ndarray],
+    Optional[np.ndarray],
+]
+
+
+@dataclass
+class PathLinearProgramResult:
+    is_success: bool
+    cost: float
+    # Wall time of the HiGHS solve in seconds
+    time: float
+    n_iterations: Optional[int]
+    vertex_path: List[str]
+    # Solution of each vertex in the vertex path, None if not successful
+    ambient_path: Optional[List[np.ndarray]]
+
+
+@dataclass
+class PathLinearProgram:
+    """min c^T z + const_cost s.t. A_ub z <= b_ub, A_eq z = b_eq, where z
+    are the variables of the vertices of vertex_path (in the columns
+    vertex_cols) followed by the epigraph variables of the L1 norm costs.
+    The constraint matrices are None if there are no such constraints."""
+
+    c: np.ndarray
+    const_cost: float
+    A_ub: Optional[sp.csr_matrix]
+    b_ub: Optional[np.ndarray]
+    A_eq: Optional[sp.csr_matrix]
+    b_eq: Optional[np.ndarray]
+    vertex_path: List[str]
+    vertex_cols: Dict[str, np.ndarray]
+
+    @property
+    def n_vars(self) -> int:
+        return len(self.c)
+
+
+class _SparseRows:
+    """Accumulates dense blocks of rows over a subset of the columns of a
+    sparse constraint matrix."""
+
+    def __init__(self):
+        self._rows: List[np.ndarray] = []
+        self._cols: List[np.ndarray] = []
+        self._vals: List[np.ndarray] = []
+        self._rhs: List[np.ndarray] = []
+        self.n_rows = 0
+
+    def add(self, M: np.ndarray, cols: np.ndarray, rhs: np.ndarray) -> None:
+        M = np.atleast_2d(M)
+        if M.shape[0] == 0:
+            return
+        r, c = np.nonzero(M)
+        self._rows.append(r + self.n_rows)
+        self._cols.append(cols[c])
+        self._vals.append(M[r, c])
+        self._rhs.append(np.asarray(rhs, dtype=float))
+        self.n_rows += M.shape[0]
+
+    def to_csr(
+        self, n_cols: int
+    ) -> Tuple[Optional[sp.csr_matrix], Optional[np.ndarray]]:
+        if self.n_rows == 0:
+            return None, None
+        M = sp.csr_matrix(
+            (
+                np.concatenate(self._vals),
+                (np.concatenate(self._rows), np.concatenate(self._cols)),
+            ),
+            shape=(self.n_rows, n_cols),
+        )
+        return M, np.concatenate(self._rhs)
+
+
+class PathLinearProgramSolver:
+    """Solves convex restrictions whose sets are polyhedral and whose costs
+    and constraints are linear or L1 norms as a single sparse linear program
+    with SciPy's HiGHS, without constructing a drake program.
+
+    This is the case for contact graphs with should_use_l1_norm_vertex_cost
+    and the l1 norm shortcut edge cost factories. The program has the
+    same variables, constraints and L1 epigraphs as the program that
+    GraphOfConvexSets builds for the convex restriction, so the optimal
+    costs match. Paths that are not supported (non polyhedral sets, L2 or
+    quadratic costs, or vertices that are visited more than once) return
+    None so that the caller can fall back to drake.
+    """
+
+    def __init__(self, graph: "Graph"):
+        self._graph = graph
+        # Convex set of each vertex and its constraints, None if not polyhedral
+        self._set_constraints: Dict[str, Tuple[ConvexSet, Optional[SetConstraints]]]
+        self._set_constraints = {}
+
+    def forget_vertex(self, vertex_name: str) -> None:
+        self._set_constraints.pop(vertex_name, None)
+
+    def solve(self, active_edge_keys: List[str]) -> Optional[PathLinearProgramResult]:
+        program = self.build_program(active_edge_keys)
+        if program is None:
+            return None
+
+        start_time = time.perf_counter()
+        res = linprog(
+            program.c,
+            A_ub=program.A_ub,
+            b_ub=program.b_ub,
+            A_eq=program.A_eq,
+            b_eq=program.b_eq,
+            bounds=(None, None),
+            method="highs",
+        )
+        solve_time = time.perf_counter() - start_time
+
+        vertex_path = program.vertex_path
+        is_success = res.status == 0
+        if is_success:
+            cost = res.fun + program.const_cost
+            ambient_path = [res.x[program.vertex_cols[v]] for v in vertex_path]
+        else:
+            # Same convention as drake: inf if infeasible, -inf if unbounded
+            cost = -np.inf if res.status == 3 else np.inf
+            ambient_path = None
+        return PathLinearProgramResult(
+            is_success, cost, solve_time, res.nit, vertex_path, ambient_path
+        )
+
+    def build_program(
+        self, active_edge_keys: List[str], include_costs: bool = True
+    ) -> Optional[PathLinearProgram]:
+        """The sparse linear program of the convex restriction, or only its
+        constraints (with a zero cost) if not include_costs. None if the
+        path is not supported."""
+        vertex_path = self._graph.path_vertex_names(active_edge_keys)
+        if vertex_path is None:
+            return None
+
+        # Column offsets of the variables of each vertex
+        offsets = np.cumsum(
+            [0] + [self._graph.vertices[v].convex_set.dim for v in vertex_path]
+        )
+        vertex_cols = {
+            v: np.arange(offsets[i], offsets[i + 1]) for i, v in enumerate(vertex_path)
+        }
+        n_cols = offsets[-1]
+        c_blocks = []
+        const_cost = 0.0
+        A_ub = _SparseRows()
+        A_eq = _SparseRows()
+
+        def add_costs_constraints(costs, constraints, cols):
+            nonlocal n_cols, const_cost
+            if not include_costs:
+                costs = None
+            for cost in costs or []:
+                if isinstance(cost, L1NormCost):
+                    A, b = cost.A(), cost.b()
+                    m = A.shape[0]
+                    t_cols = np.arange(n_cols, n_cols + m)
+                    n_cols += m
+                    c_blocks.append((t_cols, np.ones(m)))
+                    # -t <= Ax + b <= t
+                    all_cols = np.concatenate([cols, t_cols])
+                    A_ub.add(np.hstack([A, -np.eye(m)]), all_cols, -b)
+                    A_ub.add(np.hstack([-A, -np.eye(m)]), all_cols, b)
+                elif isinstance(cost, LinearCost):
+                    c_blocks.append((cols, cost.a()))
+                    const_cost += cost.b()
+                else:
+                    return False
+            for constraint in constraints or []:
+                if not isinstance(constraint, LinearConstraint):
+                    return False
+                A = constraint.GetDenseA()
+                lb, ub = constraint.lower_bound(), constraint.upper_bound()
+                is_eq = lb == ub
+                A_eq.add(A[is_eq], cols, ub[is_eq])
+                has_ub = ~is_eq & np.isfinite(ub)
+                A_ub.add(A[has_ub], cols, ub[has_ub])
+                has_lb = ~is_eq & np.isfinite(lb)
+                A_ub.add(-A[has_lb], cols, -lb[has_lb])
+            return True
+
+        for v_name in vertex_path:
+            set_constraints = self._get_set_constraints(v_name)
+            if set_constraints is None:
+                return None
+            A, b, C, d = set_constraints
+            cols = vertex_cols[v_name]
+            if A is not None:
+                A_ub.add(A, cols, b)
+            if C is not None:
+                A_eq.add(C, cols, d)
+            v = self._graph.vertices[v_name]
+            if not add_costs_constraints(v.costs, v.constraints, cols):
+                return None
+        for edge_key in active_edge_keys:
+            e = self._graph.edges[edge_key]
+            cols = np.concatenate([vertex_cols[e.u], vertex_cols[e.v]])
+            if not add_costs_constraints(e.costs, e.constraints, cols):
+                return None
+
+        c = np.zeros(n_cols)
+        for cols, a in c_blocks:
+            np.add.at(c, cols, a)
+        A_ub_mat, b_ub = A_ub.to_csr(n_cols)
+        A_eq_mat, b_eq = A_eq.to_csr(n_cols)
+        return PathLinearProgram(
+            c, const_cost, A_ub_mat, b_ub, A_eq_mat, b_eq, vertex_path, vertex_cols
+        )
+
+    def _get_set_constraints(self, vertex_name: str) -> Optional[SetConstraints]:
+        convex_set = self._graph.vertices[vertex_name].convex_set
+        # Recompile if the vertex was replaced without forget_vertex, e.g. if
+        # this solver is not the one of the graph
+        cached = self._set_constraints.get(vertex_name)
+        if cached is None or cached[0] is not convex_set:
+            cached = (convex_set, self._compile_set_constraints(convex_set))
+            self._set_constraints[vertex_name] = cached
+        return cached[1]
+
+    @staticmethod
+    def _compile_set_constraints(convex_set: ConvexSet) -> Optional[SetConstraints]:
+        s = convex_set.set
+        if isinstance(s, DrakePoint):
+            return None, None, np.eye(s.ambient_dimension()), s.x()
+        if not isinstance(s, HPolyhedron):
+            return None
+        # Use the separated equality constraints if the polyhedron stores them
+        # and they describe the same set as its half-space representation.
+        A = getattr(convex_set, "A", None)
+        b = getattr(convex_set, "b", None)
+        C = getattr(convex_set, "C", None)
+        d = getattr(convex_set, "d", None)
+        if isinstance(A, np.ndarray) and A.size == 0:
+            A, b = None, None
+        if isinstance(C, np.ndarray) and C.size > 0 and d is not None:
+            H = np.vstack(([] if A is None else [A]) + [C, -C])
+            h = np.concatenate(([] if b is None else [b]) + [d, -d])
+            if np.array_equal(H, s.A()) and np.array_equal(h, s.b()):
+                return A, b, C, d
+        return s.A(), s.b(), None, None
@@ -0,0 +1,172 @@
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+from pydrake.all import (
+    ChooseBestSolver,
+    GraphOfConvexSetsOptions,
+    L1NormCost,
+    L2NormCost,
+    MakeSolver,
+    MathematicalProgram,
+    MathematicalProgramResult,
+)
+
+from large_gcs.graph.convex_restriction_cache import CacheEvictionPolicy, EdgePathCache
+
+if TYPE_CHECKING:
+    from large_gcs.graph.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+
+class PathProgramBuilder:
+    """Builds the convex restriction of a graph along a path of edges by
+    extending the cached program of the path's prefix by one edge, instead
+    of assembling the whole program from scratch.
+
+    During search the path of a child node is the path of its parent plus
+    one edge, so the parent's program (which is cached when the parent
+    is visited) only needs to be cloned and extended by the new vertex
+    and edge. The programs use the same decision variables as the
+    vertices of the underlying GraphOfConvexSets, so the results can be
+    parsed in the same way as those of SolveConvexRestriction.
+    """
+
+    def __init__(
+        self,
+        graph: "Graph",
+        max_cached_prefixes: int = 1000,
+        eviction_policy: CacheEvictionPolicy = CacheEvictionPolicy.LRU,
+    ):
+        self._graph = graph
+        # Maps (edge path,) to the program of the convex restriction on that path.
+        # Cached programs are never modified, children extend a clone.
+        self._programs = EdgePathCache(max_cached_prefixes, eviction_policy)
+        self._solvers = {}
+
+    @property
+    def programs(self) -> EdgePathCache:
+        return self._programs
+
+    def build(self, active_edge_keys: List[str]) -> Optional[MathematicalProgram]:
+        """Returns the program of the convex restriction on the path, or None
+        if the edges do not form a path that visits each vertex at most
+        once (which the incremental construction does not support)."""
+        if self._graph.path_vertex_names(active_edge_keys) is None:
+            return None
+        keys = tuple(active_edge_keys)
+        prog = self._programs.get((keys,))
+        if prog is not None:
+            return prog
+
+        # Find the longest cached prefix
+        n_cached = len(keys) - 1
+        prefix_prog = None
+        while n_cached > 0:
+            if (keys[:n_cached],) in self._programs:
+                prefix_prog = self._programs.get((keys[:n_cached],))
+                break
+            n_cached -= 1
+
+        if prefix_prog is None:
+            prog = MathematicalProgram()
+            self._add_vertex(prog, self._graph.edges[keys[0]].u)
+        else:
+            prog = prefix_prog.Clone()
+        # Extend up to the parent's path, which is cached for the siblings
+        for i in range(n_cached, len(keys) - 1):
+            self._add_edge(prog, keys[i])
+        if n_cached < len(keys) - 1:
+            self._programs.put((keys[:-1],), prog)
+            prog = prog.Clone()
+        self._add_edge(prog, keys[-1])
+        self._programs.put((keys,), prog)
+        return prog
+
+    def solve(
+        self,
+        active_edge_keys: List[str],
+        options: GraphOfConvexSetsOptions,
+        initial_guess: Optional[Dict[str, np.ndarray]] = None,
+    ) -> Optional[MathematicalProgramResult]:
+        """Solves the convex restriction on the path, returns None if the
+        program could not be built incrementally.
+
+        The initial guess maps vertex names to their values, vertices in
+        the path that are not included are initialized to zero.
+        """
+        prog = self.build(active_edge_keys)
+        if prog is None:
+            return None
+        solver_id = (
+            options.solver.solver_id()
+            if options.solver is not None
+            else ChooseBestSolver(prog)
+        )
+        if solver_id not in self._solvers:
+            self._solvers[solver_id] = MakeSolver(solver_id)
+        x0 = None
+        if initial_guess:
+            # NaN leaves the slack variables of the costs without a guess
+            x0 = np.full(prog.num_vars(), np.nan)
+            for vertex_name in self._graph.path_vertex_names(active_edge_keys):
+                x = self._graph.vertices[vertex_name].gcs_vertex.x()
+                x0[prog.FindDecisionVariableIndices(x)] = initial_guess.get(
+                    vertex_name, np.zeros(len(x))
+                )
+        return self._solvers[solver_id].Solve(prog, x0, options.solver_options)
+
+    def _add_vertex(self, prog: MathematicalProgram, vertex_name: str) -> None:
+        v = self._graph.vertices[vertex_name]
+        x = v.gcs_vertex.x()
+        prog.AddDecisionVariables(x)
+        v.convex_set.set.AddPointInSetConstraints(prog, x)
+        if v.costs:
+            for cost in v.costs:
+                self._add_cost(prog, cost, x)
+        if v.constraints:
+            for constraint in v.constraints:
+                prog.AddConstraint(constraint, x)
+
+    def _add_edge(self, prog: MathematicalProgram, edge_key: str) -> None:
+        e = self._graph.edges[edge_key]
+        self._add_vertex(prog, e.v)
+        x = np.concatenate([e.gcs_edge.xu(), e.gcs_edge.xv()])
+        if e.costs:
+            for cost in e.costs:
+                self._add_cost(prog, cost, x)
+        if e.constraints:
+            for constraint in e.constraints:
+                prog.AddConstraint(constraint, x)
+
+    @staticmethod
+    def _add_cost(prog: MathematicalProgram, cost, x) -> None:
+        """Norm costs are added through their epigraph (as GraphOfConvexSets
+        does), so that the program remains an LP/SOCP."""
+        if isinstance(cost, L1NormCost):
+            A, b = cost.A(), cost.b()
+            t = prog.NewContinuousVariables(A.shape[0], "t")
+            prog.AddLinearCost(np.ones(A.shape[0]), t)
+            # -t <= Ax + b <= t
+            I = np.eye(A.shape[0])
+            xt = np.concatenate([x, t])
+            prog.AddLinearConstraint(
+                np.hstack([A, -I]), np.full(A.shape[0], -np.inf), -b, xt
+            )
+            prog.AddLinearConstraint(
+                np.hstack([-A, -I]), np.full(A.shape[0], -np.inf), b, xt
+            )
+        elif isinstance(cost, L2NormCost):
+            A, b = cost.GetDenseA(), cost.b()
+            t = prog.NewContinuousVariables(1, "t")
+            prog.AddLinearCost(np.ones(1), t)
+            # t >= |Ax + b|
+            A_cone = np.zeros((A.shape[0] + 1, A.shape[1] + 1))
+            A_cone[0, -1] = 1
+            A_cone[1:, :-1] = A
+            prog.AddLorentzConeConstraint(
+                A_cone, np.concatenate([[0], b]), np.concatenate([x, t])
+            )
+        else:
+            prog.AddCost(cost, x)
@@ -0,0 +1,124 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from pydrake.all import ClarabelSolver, MathematicalProgram, MosekSolver
+
+from large_gcs.graph.path_lp_solver import PathLinearProgram, PathLinearProgramSolver
+
+logger = logging.getLogger(__name__)
+
+# Maximum constraint violation of a projected sample, larger violations are
+# reported as failed projections
+FEASIBILITY_TOL = 1e-6
+
+
+class PathSampleProjector:
+    """Projects samples of the last vertex of a path onto the points of that
+    vertex that are reachable via the path, i.e. solves
+        min ||x_v - s||^2 s.t. (x_1, ..., x_v) feasible for the path
+    for each sample s.
+
+    The constraints of the path (vertex sets, vertex and edge
+    constraints, no costs) are compiled once into sparse matrices, see
+    PathLinearProgramSolver.build_program, and added to a single program.
+    The programs of all samples only differ in the coefficients of the
+    cost, so each sample is solved by updating them, instead of building
+    a convex restriction per sample. Stacking all samples into one block
+    diagonal QP is not faster, since the solve time of the interior point
+    solvers grows faster than linearly in the number of samples.
+
+    The QPs are solved with MOSEK if it is available and with Clarabel
+    otherwise. drake may otherwise choose a first order solver such as
+    OSQP, whose solutions can be outside of the sets by about its
+    tolerance of 1e-3, and a projected sample has to be feasible for the
+    path.
+    """
+
+    def __init__(self, program: PathLinearProgram, vertex_name: str):
+        self._program = program
+        self._vertex_cols = program.vertex_cols[vertex_name]
+
+    @classmethod
+    def from_path(
+        cls, path_lp_solver: PathLinearProgramSolver, active_edge_keys: List[str]
+    ) -> Optional["PathSampleProjector"]:
+        """None if the sets or constraints along the path are not
+        polyhedral/linear. path_lp_solver keeps the compiled constraints of
+        the sets, so reuse it across paths of the same graph."""
+        program = path_lp_solver.build_program(active_edge_keys, include_costs=False)
+        if program is None:
+            return None
+        return cls(program, program.vertex_path[-1])
+
+    def project(
+        self, samples: np.ndarray, should_minimize_distance: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the projected samples (one row per sample, nan rows for
+        samples that could not be projected or whose projection is not
+        feasible) and the solve time of each sample. If not
+        should_minimize_distance, any reachable point is returned for each
+        sample."""
+        samples = np.atleast_2d(samples)
+        n_samples = len(samples)
+        program = self._program
+        prog = MathematicalProgram()
+        z = prog.NewContinuousVariables(program.n_vars, "z")
+        if program.A_ub is not None:
+            prog.AddLinearConstraint(
+                program.A_ub.tocsc(),
+                np.full(len(program.b_ub), -np.inf),
+                program.b_ub,
+                z,
+            )
+        if program.A_eq is not None:
+            prog.AddLinearEqualityConstraint(program.A_eq.tocsc(), program.b_eq, z)
+        dim = len(self._vertex_cols)
+        cost = None
+        if should_minimize_distance:
+            cost = prog.AddQuadraticErrorCost(
+                np.eye(dim), np.zeros(dim), z[self._vertex_cols]
+            ).evaluator()
+
+        solver = MosekSolver()
+        if not (solver.available() and solver.enabled()):
+            solver = ClarabelSolver()
+        projections = np.full((n_samples, dim), np.nan)
+        solve_times = np.zeros(n_samples)
+        for i, sample in enumerate(samples):
+            if cost is not None:
+                # ||x - s||^2 = 1/2 x^T (2 I) x - 2 s^T x + s^T s
+                cost.UpdateCoefficients(2 * np.eye(dim), -2 * sample, sample @ sample)
+            start_time = time.perf_counter()
+            result = solver.Solve(prog)
+            solve_times[i] = time.perf_counter() - start_time
+            if not result.is_success():
+                logger.warning(
+                    f"Failed to project sample {i} onto path {program.vertex_path} "
+                    f"with {result.get_solver_id().name()}: "
+                    f"{result.get_solution_result()}"
+                )
+                continue
+            z_sol = result.GetSolution(z)
+            violation = self._max_violation(z_sol)
+            if violation > FEASIBILITY_TOL:
+                logger.warning(
+                    f"Projection of sample {i} onto path {program.vertex_path} "
+                    f"violates the constraints by {violation:.2e}"
+                )
+                continue
+            projections[i] = z_sol[self._vertex_cols]
+        return projections, solve_times
+
+    def _max_violation(self, z_sol: np.ndarray) -> float:
+        """Maximum constraint violation of a solution of the path variables."""
+        program = self._program
+        violation = 0.0
+        if program.A_ub is not None:
+            violation = max(violation, np.max(program.A_ub @ z_sol - program.b_ub))
+        if program.A_eq is not None:
+            violation = max(
+                violation, np.max(np.abs(program.A_eq @ z_sol - program.b_eq))
+            )
+        return violation
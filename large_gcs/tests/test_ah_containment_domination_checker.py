@@ -2,7 +2,8 @@ import logging
 
 import numpy as np
 import pytest
-from pydrake.all import HPolyhedron
+from pydrake.all import HPolyhedron, LinearConstraint, LinearCost
+from scipy.optimize import linprog
 
 from large_gcs.algorithms.gcs_astar_reachability import GcsAstarReachability
 from large_gcs.algorithms.search_algorithm import AlgMetrics, SearchNode
@@ -11,6 +12,7 @@ from large_gcs.domination_checkers.ah_containment_last_pos import (
     ReachesCheaperLastPosContainment,
     ReachesNewLastPosContainment,
 )
+from large_gcs.domination_checkers.containment_memo import path_key
 from large_gcs.domination_checkers.reaches_cheaper_containment import (
     ReachesCheaperContainment,
 )
@@ -19,6 +21,7 @@ from large_gcs.geometry.polyhedron import Polyhedron
 from large_gcs.graph.contact_cost_constraint_factory import (
     contact_shortcut_edge_l1_norm_cost_factory_over_obj_weighted,
 )
+from large_gcs.graph.graph import Edge, Graph, Vertex
 from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
 from large_gcs.graph_generators.contact_graph_generator import (
     ContactGraphGeneratorParams,
@@ -55,6 +58,86 @@ def test_reaches_new_containment_polyhedral_hor_vert_b_graph():
     )
 
 
+def test_reaches_new_containment_memo_polyhedral_hor_vert_b_graph():
+    G = create_polyhedral_hor_vert_b_graph()
+    domination_checker = ReachesNewContainment(
+        graph=G, containment_condition=-1, should_memoize_containment=True
+    )
+    metrics = AlgMetrics()
+    domination_checker.set_alg_metrics(metrics)
+    n_x = SearchNode.from_vertex_path(["s", "p1", "p2"])
+    n_y = SearchNode.from_vertex_path(["s", "p6", "p7", "p2"])
+    n_z = SearchNode.from_vertex_path(["s", "p8", "p9", "p2"])
+
+    assert domination_checker.is_dominated(candidate_node=n_x, alternate_nodes=[n_y])
+    assert domination_checker.is_dominated(candidate_node=n_z, alternate_nodes=[n_x])
+    # n_z ⊆ n_x ⊆ n_y
+    assert domination_checker.is_dominated(candidate_node=n_z, alternate_nodes=[n_y])
+    assert metrics.n_containment_memo_inferred == 1
+
+    assert not domination_checker.is_dominated(
+        candidate_node=n_y, alternate_nodes=[n_x]
+    )
+    assert not domination_checker.is_dominated(
+        candidate_node=n_y, alternate_nodes=[n_x]
+    )
+    assert metrics.n_containment_memo_hits == 1
+    # n_y ⊄ n_x and n_z ⊆ n_x, so n_y ⊄ n_z
+    assert not domination_checker.is_dominated(
+        candidate_node=n_y, alternate_nodes=[n_z]
+    )
+    assert metrics.n_containment_memo_inferred == 2
+
+
+def test_reaches_new_containment_memo_skips_unknown_results(monkeypatch):
+    G = create_polyhedral_hor_vert_b_graph()
+    domination_checker = ReachesNewContainment(
+        graph=G, containment_condition=-1, should_memoize_containment=True
+    )
+    metrics = AlgMetrics()
+    domination_checker.set_alg_metrics(metrics)
+    n_x = SearchNode.from_vertex_path(["s", "p1", "p2"])
+    n_y = SearchNode.from_vertex_path(["s", "p6", "p7", "p2"])
+
+    # The containment LP fails, which is neither domination nor recorded
+    monkeypatch.setattr(domination_checker, "_solve_containment_lp", lambda lp: None)
+    assert not domination_checker.is_dominated(
+        candidate_node=n_x, alternate_nodes=[n_y]
+    )
+    memo = domination_checker._containment_memos["p2"]
+    assert memo.get(path_key(n_x), path_key(n_y)) is None
+
+    monkeypatch.undo()
+    assert domination_checker.is_dominated(candidate_node=n_x, alternate_nodes=[n_y])
+    assert metrics.n_containment_memo_hits == 0
+    assert memo.get(path_key(n_x), path_key(n_y)) is True
+
+
+def test_reaches_new_containment_prefilter_polyhedral_hor_vert_b_graph():
+    G = create_polyhedral_hor_vert_b_graph()
+    domination_checker = ReachesNewContainment(
+        graph=G, containment_condition=-1, should_prefilter_containment=True
+    )
+    metrics = AlgMetrics()
+    domination_checker.set_alg_metrics(metrics)
+    n_x = SearchNode.from_vertex_path(["s", "p1", "p2"])
+    n_y = SearchNode.from_vertex_path(["s", "p6", "p7", "p2"])
+    n_z = SearchNode.from_vertex_path(["s", "p8", "p9", "p2"])
+
+    assert domination_checker.is_dominated(candidate_node=n_x, alternate_nodes=[n_y])
+    assert not domination_checker.is_dominated(
+        candidate_node=n_y, alternate_nodes=[n_x, n_z]
+    )
+    assert domination_checker.is_dominated(
+        candidate_node=n_z, alternate_nodes=[n_y, n_x]
+    )
+    # Only the checks of n_y, which is not contained in n_x or n_z, can be
+    # rejected
+    assert metrics.n_containment_prefilter_checks == 5
+    metrics.update_derived_metrics()
+    assert metrics.containment_prefilter_rejection_rate <= 2 / 5
+
+
 def test_reaches_cheaper_containment_polyhedral_hor_vert_b_graph():
     G = create_polyhedral_hor_vert_b_graph()
     domination_checker = ReachesCheaperContainment(graph=G, containment_condition=-1)
@@ -95,6 +178,98 @@ def test_reaches_cheaper_containment_simple_1d_graph():
     )
 
 
+def _support(H, h, T, t, direction):
+    """max direction^T (T x + t) s.t. H x <= h, inf if unbounded."""
+    res = linprog(
+        -(direction @ T),
+        A_ub=H,
+        b_ub=h,
+        bounds=[(None, None)] * H.shape[1],
+        method="highs",
+    )
+    if res.status == 3:
+        return np.inf
+    assert res.status == 0, res.message
+    return -res.fun + direction @ t
+
+
+def test_path_polytope_blocks_match_path_programs_polyhedral_hor_vert_b_graph():
+    G = create_polyhedral_hor_vert_b_graph()
+    rng = np.random.default_rng(0)
+    parent = SearchNode.from_vertex_path(["s", "p6", "p7"])
+    node = SearchNode.from_parent("p2", parent)
+    for domination_checker in [
+        ReachesNewContainment(graph=G, containment_condition=-1),
+        ReachesCheaperContainment(graph=G, containment_condition=-1),
+    ]:
+        domination_checker.set_alg_metrics(AlgMetrics())
+        parent.ah_path_blocks = None
+        node.ah_path_blocks = None
+        node.ah_polyhedron_fs = None
+        blocks = domination_checker.get_path_polytope_blocks(node, False)
+        # The blocks of the parent are cached and extended by one vertex
+        assert domination_checker.get_path_polytope_blocks(parent, False) is (
+            parent.ah_path_blocks[(False, domination_checker.include_cost_epigraph)]
+        )
+        assert blocks.last_x_dim == G.vertices["p2"].convex_set.dim
+
+        if domination_checker.include_cost_epigraph:
+            H, h = domination_checker.get_epigraph_matrices(node)
+        else:
+            prog = domination_checker.get_path_constraint_mathematical_program(node)
+            polyhedron = HPolyhedron(prog)
+            H, h = polyhedron.A(), polyhedron.b()
+        T = domination_checker.get_H_transformation(node, H.shape[1])
+        H_blocks, h_blocks = blocks.to_dense(domination_checker.include_cost_epigraph)
+        assert H_blocks.shape[1] == H.shape[1]
+        for _ in range(10):
+            direction = rng.normal(size=T.shape[0])
+            t = np.zeros(T.shape[0])
+            support = _support(H, h, T, t, direction)
+            support_blocks = _support(H_blocks, h_blocks, T, t, direction)
+            assert support == support_blocks or np.isclose(support, support_blocks)
+
+        domination_checker._maybe_create_path_AH_polytope(node)
+        metrics = domination_checker._alg_metrics
+        metrics.update_derived_metrics()
+        assert metrics.n_ah_polytopes_built == 1
+        assert metrics.ah_polytope_build_time_max > 0
+
+
+def test_nullspace_edge_block_to_point_adds_edge_cost_once():
+    G = Graph()
+    box = np.vstack([np.eye(2), -np.eye(2)])
+    G.add_vertex(Vertex(Polyhedron(box, np.array([1, 1, 0, 0]), False), costs=[]), "u")
+    G.add_vertex(
+        Vertex(Polyhedron(box, np.array([2, 0.5, -2, -0.5]), False), costs=[]), "v"
+    )
+    # Several constraints on an edge into a point
+    G.add_edge(
+        Edge(
+            "u",
+            "v",
+            costs=[LinearCost(np.array([1.0, 2.0, 3.0, 4.0]), 0.5)],
+            constraints=[
+                LinearConstraint(np.array([[1.0, 0, -1, 0]]), [-np.inf], [0]),
+                LinearConstraint(np.array([[0, 1.0, 0, -1]]), [-np.inf], [1]),
+            ],
+        )
+    )
+    domination_checker = ReachesCheaperContainment(
+        graph=G, containment_condition=-1, construct_path_from_nullspaces=True
+    )
+    block = domination_checker._create_nullspace_edge_block(
+        "u", Edge.key_from_uv("u", "v"), "v"
+    )
+    u_set = G.vertices["u"].convex_set.nullspace_set
+    assert block.n_x_parts == (u_set.dim, 0)
+    assert block.A.shape[0] == 2
+    z = np.array([0.3, 0.4])
+    x_u = u_set.x_0 + u_set.V @ z
+    expected_cost = np.array([1.0, 2.0]) @ x_u + np.array([3.0, 4.0]) @ [2, 0.5] + 0.5
+    assert np.isclose(block.c[: u_set.dim] @ z + block.c_0, expected_cost)
+
+
 def test_nullspace_polyhedron_and_transformation_from_HPoly_and_T_correct_shapes_cg_trichal4():
     graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
         "cg_trichal4"
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pypolycontain as pp
+from pydrake.all import ClpSolver, MathematicalProgram
+
+from large_gcs.geometry import ah_containment_lp
+from large_gcs.geometry.ah_containment_lp import (
+    are_contained_in,
+    is_contained_in,
+    may_be_contained_in,
+    prefilter_directions,
+    support_values,
+)
+
+
+def _random_AH_polytope(rng, n_constraints, scale):
+    H = rng.normal(size=(n_constraints, 3))
+    h = rng.uniform(0.5, 1.5, size=(n_constraints, 1)) * scale
+    return pp.objects.AH_polytope(
+        T=rng.normal(size=(2, 3)),
+        t=rng.normal(size=(2, 1)) * 0.2,
+        P=pp.objects.H_polytope(H, h),
+    )
+
+
+def test_containment_lp_matches_pypolycontain_subset():
+    rng = np.random.default_rng(1)
+    results = []
+    for _ in range(30):
+        X = _random_AH_polytope(rng, 8, scale=0.3)
+        Y = _random_AH_polytope(rng, rng.integers(4, 10), scale=3.0)
+        prog = MathematicalProgram()
+        pp.subset(prog, X, Y, -1)
+        expected = ClpSolver().Solve(prog).is_success()
+        assert is_contained_in(X, Y) == expected
+        assert is_contained_in(X, Y, solver="clp") == expected
+        results.append(expected)
+    assert any(results) and not all(results)
+
+
+def test_are_contained_in_stops_at_first():
+    rng = np.random.default_rng(2)
+    X = _random_AH_polytope(rng, 8, scale=0.3)
+    Ys = [_random_AH_polytope(rng, 8, scale=3.0) for _ in range(10)]
+    contained = are_contained_in(X, Ys)
+    assert np.array_equal(contained, [is_contained_in(X, Y) for Y in Ys])
+    first = are_contained_in(X, iter(Ys), stop_at_first=True)
+    assert len(first) == np.argmax(contained) + 1 and first[-1]
+
+
+def test_prefilter_only_rejects_non_containments():
+    rng = np.random.default_rng(3)
+    directions = prefilter_directions(2, 4)
+    X = _random_AH_polytope(rng, 8, scale=0.3)
+    Ys = [_random_AH_polytope(rng, 8, scale=3.0) for _ in range(30)]
+    may_contain = may_be_contained_in(
+        support_values(X, directions),
+        np.array([support_values(Y, directions) for Y in Ys]),
+    )
+    contained = are_contained_in(X, Ys)
+    assert np.all(may_contain[contained])
+    assert np.any(~may_contain)
+
+
+def test_prefilter_skips_failed_support_values(monkeypatch):
+    rng = np.random.default_rng(4)
+    directions = prefilter_directions(2, 4)
+    X = _random_AH_polytope(rng, 8, scale=0.3)
+    Ys = [_random_AH_polytope(rng, 8, scale=3.0) for _ in range(30)]
+    support_values_Ys = np.array([support_values(Y, directions) for Y in Ys])
+    contained = are_contained_in(X, Ys)
+
+    # Every support value LP of the candidate fails
+    monkeypatch.setattr(
+        ah_containment_lp,
+        "linprog",
+        lambda *args, **kwargs: SimpleNamespace(status=4, message="failed"),
+    )
+    support_values_X = support_values(X, directions)
+    assert np.all(np.isnan(support_values_X))
+    assert np.all(may_be_contained_in(support_values_X, support_values_Ys))
+    # Failures on the alternates' side are skipped as well
+    assert np.all(may_be_contained_in(support_values_Ys[0], support_values_X))
+
+    # A single failed direction only drops that direction
+    support_values_X = support_values_Ys[0].copy()
+    support_values_X[0] = np.nan
+    may_contain = may_be_contained_in(support_values_X, support_values_Ys)
+    assert may_contain[0]
+    assert np.all(may_contain[contained])
+
+
+def test_failed_containment_lp_is_unknown(monkeypatch):
+    rng = np.random.default_rng(5)
+    X = _random_AH_polytope(rng, 8, scale=0.3)
+    Y = _random_AH_polytope(rng, 8, scale=3.0)
+    monkeypatch.setattr(
+        ah_containment_lp,
+        "linprog",
+        lambda *args, **kwargs: SimpleNamespace(status=4, message="failed"),
+    )
+    assert is_contained_in(X, Y) is None
+    assert not are_contained_in(X, [Y])[0]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from large_gcs.graph.compiled_cost_constraint_registry import (
+    CompiledCostConstraintRegistry,
+)
+from large_gcs.graph.contact_cost_constraint_factory import (
+    edge_constraint_position_continuity,
+    vertex_cost_position_l1_norm,
+)
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+
+def _load_inc_graph():
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
+        "cg_simple_2"
+    )
+    return IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+    )
+
+
+def test_registry_shares_costs_by_layout():
+    cg = _load_inc_graph()
+    cg.generate_neighbors(cg.source_name)
+    for e in cg.outgoing_edges(cg.source_name):
+        cg.generate_neighbors(e.v)
+    contact_vertices = [
+        v
+        for name, v in cg.vertices.items()
+        if name not in (cg.source_name, cg.target_name)
+    ]
+    assert len(contact_vertices) > 1
+
+    registry = cg.compiled_costs_constraints
+    assert registry.n_hits > 0
+    layout = CompiledCostConstraintRegistry.layout_key
+    for v in contact_vertices[1:]:
+        u = contact_vertices[0]
+        if layout(v.convex_set.vars) == layout(u.convex_set.vars):
+            assert v.costs[0] is u.costs[0]
+        # Shared costs are the same as the ones created from the vertex's own variables
+        fresh = vertex_cost_position_l1_norm(v.convex_set.vars)
+        assert np.array_equal(v.costs[0].A(), fresh.A())
+
+
+def test_registry_edge_constraints_match_factory():
+    cg = _load_inc_graph()
+    cg.generate_neighbors(cg.source_name)
+    for e in cg.edges.values():
+        fresh = edge_constraint_position_continuity(
+            cg.vertices[e.u].convex_set.vars, cg.vertices[e.v].convex_set.vars
+        )
+        assert np.array_equal(e.constraints[0].GetDenseA(), fresh.GetDenseA())
+        assert np.array_equal(e.constraints[0].upper_bound(), fresh.upper_bound())
@@ -1,10 +1,16 @@
+from collections import deque
+
 import numpy as np
 
 from large_gcs.contact.contact_location import ContactLocationFace
 from large_gcs.contact.contact_pair_mode import NoContactPairMode
+from large_gcs.contact.contact_set import ContactSet
 from large_gcs.contact.rigid_body import MobilityType, RigidBody
 from large_gcs.geometry.polyhedron import Polyhedron
 from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.graph import Graph, LazyEdge, LazyVertex
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph.lower_bound_graph import LowerBoundGraph
 from large_gcs.graph_generators.contact_graph_generator import (
     ContactGraphGeneratorParams,
 )
@@ -49,3 +55,148 @@ def test_load_cg_simple_1_1():
             graph_file,
             should_use_l1_norm_vertex_cost=True,
         )
+
+
+def _bfs_edge_path(cg, source, target):
+    preds = {source: None}
+    queue = deque([source])
+    while target not in preds:
+        u = queue.popleft()
+        for e in cg.outgoing_edges(u):
+            if e.v not in preds:
+                preds[e.v] = e.key
+                queue.append(e.v)
+    path = []
+    v = target
+    while preds[v] is not None:
+        path.append(preds[v])
+        v = cg.edges[preds[v]].u
+    return path[::-1]
+
+
+def test_columnar_file_is_loaded_lazily(tmp_path):
+    graph_file = ContactGraphGeneratorParams.graph_file_path_from_name("cg_simple_2")
+    cg = ContactGraph.load_from_file(graph_file, should_use_l1_norm_vertex_cost=True)
+    cg.save_to_file(str(tmp_path / "cg_simple_2"))
+    lazy_cg = ContactGraph.load_from_file(
+        str(tmp_path / "cg_simple_2"), should_use_l1_norm_vertex_cost=True
+    )
+
+    assert list(lazy_cg.vertices) == list(cg.vertices)
+    assert list(lazy_cg.edges) == list(cg.edges)
+    lazy_vertices = [v for v in lazy_cg.vertices.values() if isinstance(v, LazyVertex)]
+    assert len(lazy_vertices) == cg.n_vertices - 2
+    assert not any(v.is_created or v.is_in_gcs for v in lazy_vertices)
+
+    path = _bfs_edge_path(cg, cg.source_name, cg.target_name)
+    sol = cg.solve_convex_restriction(path)
+    lazy_sol = lazy_cg.solve_convex_restriction(path)
+    assert np.isclose(sol.cost, lazy_sol.cost)
+    assert lazy_sol.vertex_path == sol.vertex_path
+    # Only the vertices on the path were added to the gcs
+    assert sum(v.is_in_gcs for v in lazy_vertices) == len(path) - 1
+
+    for name, v in cg.vertices.items():
+        if not isinstance(v.convex_set, ContactSet):
+            continue
+        lazy_set = lazy_cg.vertices[name].convex_set
+        assert lazy_set.id == v.convex_set.id
+        for attr in ["A", "b", "C", "d"]:
+            x = getattr(v.convex_set, attr)
+            y = getattr(lazy_set, attr)
+            assert (x is None and y is None) or np.array_equal(x, y), attr
+        assert np.array_equal(lazy_set.base_set.A(), v.convex_set.base_set.A())
+        assert np.array_equal(lazy_set.base_set.b(), v.convex_set.base_set.b())
+
+
+def test_subgraph_from_columnar_file(tmp_path):
+    graph_file = ContactGraphGeneratorParams.graph_file_path_from_name("cg_simple_2")
+    cg = ContactGraph.load_from_file(graph_file, should_use_l1_norm_vertex_cost=True)
+    cg.save_to_file(str(tmp_path / "cg_simple_2"))
+    lazy_cg = ContactGraph.load_from_file(
+        str(tmp_path / "cg_simple_2"), should_use_l1_norm_vertex_cost=True
+    )
+
+    # Copy the vertices and edges of a path into a new graph, like the
+    # subgraphs built by the search algorithms and cost estimators
+    path = _bfs_edge_path(cg, cg.source_name, cg.target_name)
+    subgraph = Graph()
+    for i, edge_key in enumerate(path):
+        e = lazy_cg.edges[edge_key]
+        if i == 0:
+            subgraph.add_vertex(lazy_cg.vertices[e.u], e.u)
+        subgraph.add_vertex(lazy_cg.vertices[e.v], e.v)
+        subgraph.add_edge(e)
+    subgraph.set_source(cg.source_name)
+    subgraph.set_target(cg.target_name)
+
+    assert not any(isinstance(v, LazyVertex) for v in subgraph.vertices.values())
+    assert not any(isinstance(e, LazyEdge) for e in subgraph.edges.values())
+    sol = cg.solve_convex_restriction(path)
+    sub_sol = subgraph.solve_convex_restriction(path)
+    assert sub_sol.is_success
+    assert np.isclose(sol.cost, sub_sol.cost)
+    # The lazily loaded graph itself was not added to
+    assert lazy_cg.n_vertices == cg.n_vertices
+    assert not any(
+        v.is_in_gcs for v in lazy_cg.vertices.values() if isinstance(v, LazyVertex)
+    )
+
+
+def test_columnar_file_vertex_exclusion(tmp_path):
+    graph_file = ContactGraphGeneratorParams.graph_file_path_from_name("cg_simple_2")
+    cg = ContactGraph.load_from_file(graph_file, should_use_l1_norm_vertex_cost=True)
+    cg.save_to_file(str(tmp_path / "cg_simple_2"))
+    exclusion = ["IC|obj0_f0"]
+    excluded_cg = ContactGraph.load_from_file(
+        graph_file, vertex_exclusion=exclusion, should_use_l1_norm_vertex_cost=True
+    )
+    lazy_cg = ContactGraph.load_from_file(
+        str(tmp_path / "cg_simple_2"),
+        vertex_exclusion=exclusion,
+        should_use_l1_norm_vertex_cost=True,
+    )
+    assert excluded_cg.n_vertices < cg.n_vertices
+    assert list(lazy_cg.vertices) == list(excluded_cg.vertices)
+    assert list(lazy_cg.edges) == list(excluded_cg.edges)
+
+
+def test_inc_columnar_file_round_trip(tmp_path):
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name("cg_maze_b1")
+    kwargs = dict(
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        adjacency_cache_path=None,
+    )
+    cg = IncrementalContactGraph.load_from_file(graph_file, **kwargs)
+    cg.save_only_inc_to_file(str(tmp_path / "cg_maze_b1_inc"))
+    loaded_cg = IncrementalContactGraph.load_from_file(
+        str(tmp_path / "cg_maze_b1_inc"), **kwargs
+    )
+    assert loaded_cg._adjacency_cache_key() == cg._adjacency_cache_key()
+    assert list(loaded_cg.edges) == list(cg.edges)
+
+
+def test_lbg_columnar_file_round_trip(tmp_path):
+    lbg = LowerBoundGraph.load_from_file(
+        LowerBoundGraph.lbg_file_path_from_name("cg_simple_1")
+    )
+    lbg.run_dijkstra(lbg._source_name)
+    lbg.save_to_file(str(tmp_path / "cg_simple_1_lbg"))
+    loaded_lbg = LowerBoundGraph.load_from_file(str(tmp_path / "cg_simple_1_lbg"))
+
+    assert list(loaded_lbg._vertices) == list(lbg._vertices)
+    for key, vertex in lbg._vertices.items():
+        assert np.array_equal(loaded_lbg._vertices[key].point, vertex.point)
+    assert list(loaded_lbg._edges.items()) == list(lbg._edges.items())
+    assert dict(loaded_lbg._adjacency_list) == {
+        key: succs for key, succs in lbg._adjacency_list.items() if succs
+    }
+    assert dict(loaded_lbg._parent_vertex_to_vertices) == dict(
+        lbg._parent_vertex_to_vertices
+    )
+    assert dict(loaded_lbg._parent_edge_to_vertices) == dict(
+        lbg._parent_edge_to_vertices
+    )
+    assert loaded_lbg._g == lbg._g
+    assert loaded_lbg.metrics == lbg.metrics
@@ -0,0 +1,42 @@
+import numpy as np
+
+from large_gcs.contact.contact_pair_mode import InContactPairMode
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+
+def test_template_sets_match_formula_sets():
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
+        "cg_simple_2"
+    )
+    cg = IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=True,
+        should_add_const_edge_cost=True,
+        should_add_gcs=False,
+    )
+    u = cg.successors(cg.source_name)[0]
+    cg.generate_neighbors(u)
+    vertex_names = [v for v in cg.successors(u) if v != cg.target_name] + [u]
+
+    n_in_contact = 0
+    for v in vertex_names:
+        mode_ids = cg._mode_interner.names(cg._mode_ids_from_vertex_name(v))
+        n_in_contact += any(
+            isinstance(cg._contact_pair_modes[id], InContactPairMode) for id in mode_ids
+        )
+        template_set = cg._create_contact_set_from_contact_pair_mode_ids(mode_ids)
+        formula_set = cg._create_contact_set_from_constraint_formulas(mode_ids)
+
+        assert all(
+            x.EqualTo(y) for x, y in zip(template_set.vars.all, formula_set.vars.all)
+        )
+        for attr in ["A", "b", "C", "d", "H", "h"]:
+            assert np.array_equal(
+                getattr(template_set, attr), getattr(formula_set, attr)
+            ), attr
+        assert np.array_equal(template_set.base_set.A(), formula_set.base_set.A())
+        assert np.array_equal(template_set.base_set.b(), formula_set.base_set.b())
+    assert n_in_contact > 0
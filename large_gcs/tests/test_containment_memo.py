@@ -0,0 +1,36 @@
+import pytest
+
+from large_gcs.domination_checkers.containment_memo import ContainmentMemo
+
+
+def test_containment_memo_get_only_returns_recorded_pairs():
+    memo = ContainmentMemo()
+    memo.add("a", "b", True)
+    memo.add("b", "c", False)
+    assert memo.get("a", "b") is True
+    assert memo.get("b", "c") is False
+    assert memo.get("b", "a") is None
+    assert memo.get("a", "c") is None
+
+
+def test_containment_memo_infers_by_transitivity():
+    memo = ContainmentMemo()
+    # a ⊆ b ⊆ c, d ⊄ c
+    memo.add("a", "b", True)
+    memo.add("b", "c", True)
+    memo.add("d", "c", False)
+    assert memo.infer("a", "c") is True
+    # d ⊆ a or d ⊆ b would give d ⊆ c
+    assert memo.infer("d", "a") is False
+    assert memo.infer("d", "b") is False
+    assert memo.infer("c", "a") is None
+    assert memo.infer("a", "d") is None
+    assert memo.n_contained_in("c") == 1
+    assert memo.n_contained_in("a") == 0
+
+
+def test_containment_memo_rejects_unknown_results():
+    memo = ContainmentMemo()
+    with pytest.raises(ValueError, match="unknown"):
+        memo.add("a", "b", None)
+    assert memo.get("a", "b") is None
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from large_gcs.algorithms.search_algorithm import AlgMetrics
+from large_gcs.cost_estimators.shortcut_edge_ce import ShortcutEdgeCE
+from large_gcs.graph.contact_cost_constraint_factory import (
+    contact_shortcut_edge_l1_norm_cost_factory_over_obj_weighted,
+)
+from large_gcs.graph.convex_restriction_solve_service import (
+    ConvexRestrictionSolveService,
+)
+from large_gcs.graph.graph import Edge
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+GRAPH_KWARGS = dict(
+    should_incl_simul_mode_switches=False,
+    should_add_const_edge_cost=True,
+    should_add_gcs=True,
+    should_use_l1_norm_vertex_cost=True,
+)
+
+
+def _solve_service(graph_file, n_workers=2):
+    return ConvexRestrictionSolveService(
+        graph_file,
+        graph_kwargs=GRAPH_KWARGS,
+        n_workers=n_workers,
+        shortcut_edge_cost_factory=contact_shortcut_edge_l1_norm_cost_factory_over_obj_weighted,
+        add_const_cost=True,
+    )
+
+
+def _vertex_path_to_target(cg: IncrementalContactGraph):
+    """Breadth first search that generates the neighbors of each vertex it
+    expands."""
+    parents = {cg.source_name: None}
+    frontier = [cg.source_name]
+    while len(frontier) > 0:
+        u = frontier.pop(0)
+        cg.generate_neighbors(u)
+        for v in cg.successors(u):
+            if v in parents:
+                continue
+            parents[v] = u
+            if v == cg.target_name:
+                vertex_path = [v]
+                while parents[vertex_path[-1]] is not None:
+                    vertex_path.append(parents[vertex_path[-1]])
+                return vertex_path[::-1]
+            frontier.append(v)
+    raise RuntimeError("Target not reachable")
+
+
+def test_worker_that_fails_to_load_raises():
+    with ConvexRestrictionSolveService(
+        "does_not_exist.npy", n_workers=1
+    ) as solve_service:
+        with pytest.raises(RuntimeError, match="failed to load"):
+            solve_service.solve([('("source", "target")', [])])
+
+
+def test_replicas_match_in_process_solves():
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
+        "cg_simple_2"
+    )
+    cg = IncrementalContactGraph.load_from_file(graph_file, **GRAPH_KWARGS)
+    cost_estimator = ShortcutEdgeCE(
+        cg,
+        shortcut_edge_cost_factory=contact_shortcut_edge_l1_norm_cost_factory_over_obj_weighted,
+        add_const_cost=True,
+    )
+    cost_estimator.set_alg_metrics(AlgMetrics())
+    with _solve_service(graph_file) as solve_service:
+        # The neighbors generated below are replayed in the replicas
+        solve_service.attach(cg)
+        vertex_path = _vertex_path_to_target(cg)
+        u = vertex_path[-2]
+        active_edge_keys = [
+            Edge.key_from_uv(a, b) for a, b in zip(vertex_path[:-2], vertex_path[1:-1])
+        ]
+        # Shortcut edge solves to the other neighbors, and the full solve
+        # to the target
+        edge_keys = [e.key for e in cg.outgoing_edges(u)]
+        assert Edge.key_from_uv(u, cg.target_name) in edge_keys
+        sols = solve_service.solve([(key, active_edge_keys) for key in edge_keys])
+
+    for edge_key, sol in zip(edge_keys, sols):
+        expected = cost_estimator.solve_on_graph(
+            cg, cg.edges[edge_key], active_edge_keys, solve_convex_restriction=True
+        )
+        assert sol.is_success == expected.is_success
+        if not expected.is_success:
+            continue
+        assert np.isclose(sol.cost, expected.cost, rtol=1e-6)
+        if cg.edges[edge_key].v == cg.target_name:
+            assert sol.vertex_path == expected.vertex_path == vertex_path
+            for x, expected_x in zip(sol.ambient_path, expected.ambient_path):
+                assert np.allclose(x, expected_x, atol=1e-6)
+
+
+def test_close_stops_workers_and_can_be_repeated():
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
+        "cg_simple_2"
+    )
+    solve_service = _solve_service(graph_file).start()
+    workers = list(solve_service._workers)
+    assert all(worker.is_alive() for worker in workers)
+
+    solve_service.close()
+    assert not any(worker.is_alive() for worker in workers)
+    assert all(worker.exitcode == 0 for worker in workers)
+    solve_service.close()
+    with pytest.raises(AssertionError, match="must be started"):
+        solve_service.solve([('("source", "target")', [])])
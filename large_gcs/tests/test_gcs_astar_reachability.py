@@ -1,6 +1,10 @@
+import pickle
+
 import numpy as np
+import pytest
 
 from large_gcs.algorithms.gcs_astar_reachability import GcsAstarReachability
+from large_gcs.algorithms.search_algorithm import AlgMetrics
 from large_gcs.cost_estimators.shortcut_edge_ce import ShortcutEdgeCE
 from large_gcs.domination_checkers.reaches_new_sampling import ReachesNewSampling
 from large_gcs.graph.cost_constraint_factory import shortcut_edge_cost_factory
@@ -22,3 +26,93 @@ def test_gcs_astar_reachability_polyhedra_hor_vert():
     assert np.allclose(sol.ambient_path, ambient_path)
     assert sol.vertex_path == vertex_path
     assert np.isclose(sol.cost, 10.8, atol=tol)
+
+
+def test_gcs_astar_reachability_batched_neighbors_polyhedra_hor_vert():
+    g = create_polyhedral_hor_vert_graph()
+    cost_estimator_se = ShortcutEdgeCE(g, shortcut_edge_cost_factory)
+    domination_checker = ReachesNewSampling(graph=g, num_samples_per_vertex=5)
+    alg = GcsAstarReachability(
+        g,
+        cost_estimator_se,
+        domination_checker=domination_checker,
+        should_batch_neighbors=True,
+    )
+    sol = alg.run()
+    ambient_path = np.array([[0.5, 0.5], [0.5, 3.9], [4.5, 3.9], [4.5, 0.5]])
+    vertex_path = ["s", "p1", "p2", "t"]
+    assert np.allclose(sol.ambient_path, ambient_path)
+    assert sol.vertex_path == vertex_path
+    assert np.isclose(sol.cost, 10.8, atol=tol)
+
+
+def test_cached_solves_are_left_out_of_warm_start_metrics():
+    metrics = AlgMetrics()
+    metrics.update_after_gcs_solve(1.0, 10, is_warm_started=False)
+    metrics.update_after_gcs_solve(0.5, 4, is_warm_started=True)
+    metrics.update_after_gcs_solve(0.0, is_cached=True)
+    metrics.update_derived_metrics()
+    assert metrics.n_gcs_solves == 2
+    assert metrics.n_gcs_solves_cached == 1
+    assert metrics.gcs_solve_time_cold_mean == 1.0
+    assert metrics.gcs_solve_time_warm_mean == 0.5
+    assert np.isclose(metrics.gcs_solve_time_saved_est, 0.5)
+
+
+def test_solve_metrics_are_running_statistics():
+    rng = np.random.default_rng(0)
+    solve_times = rng.uniform(0.1, 1.0, 1000)
+    is_warm = rng.uniform(size=1000) < 0.3
+    iterations = rng.integers(1, 50, 1000)
+    metrics = AlgMetrics()
+    for solve_time, warm, n_iterations in zip(solve_times, is_warm, iterations):
+        metrics.update_after_gcs_solve(solve_time, n_iterations, is_warm_started=warm)
+    metrics.update_derived_metrics()
+    assert np.isclose(metrics.gcs_solve_time_iter_mean, np.mean(solve_times))
+    assert np.isclose(metrics.gcs_solve_time_iter_std, np.std(solve_times))
+    assert np.isclose(metrics.gcs_solve_time_last_10_mean, np.mean(solve_times[-10:]))
+    assert np.isclose(metrics.gcs_solve_time_warm_mean, np.mean(solve_times[is_warm]))
+    assert np.isclose(metrics.gcs_solve_time_cold_mean, np.mean(solve_times[~is_warm]))
+    assert np.isclose(
+        metrics.gcs_solve_iterations_warm_mean, np.mean(iterations[is_warm])
+    )
+    # Nothing is kept per solve
+    assert len(pickle.dumps(metrics)) < 10000
+
+
+def test_solve_metrics_load_from_per_solve_lists():
+    solve_times = np.array([1.0, 2.0, 4.0])
+    metrics = AlgMetrics()
+    state = metrics.__dict__.copy()
+    for key in list(state):
+        if key.startswith("_gcs_solve") or key.startswith("_n_gcs_solves"):
+            del state[key]
+    state.update(
+        n_gcs_solves=3,
+        gcs_solve_time_total=np.sum(solve_times),
+        _gcs_solve_times=solve_times,
+        _gcs_solve_iterations=[np.nan] * 3,
+        _gcs_solve_is_warm_started=[False] * 3,
+    )
+    metrics = AlgMetrics.__new__(AlgMetrics)
+    metrics.__setstate__(state)
+    metrics.update_after_gcs_solve(3.0, is_warm_started=True)
+    metrics.update_derived_metrics()
+    assert np.isclose(metrics.gcs_solve_time_iter_mean, 2.5)
+    assert np.isclose(metrics.gcs_solve_time_iter_std, np.std([1.0, 2.0, 4.0, 3.0]))
+    assert np.isclose(metrics.gcs_solve_time_cold_mean, np.mean(solve_times))
+    assert metrics.gcs_solve_time_warm_mean == 3.0
+
+
+def test_batched_neighbors_rejects_unsupported_backends():
+    g = create_polyhedral_hor_vert_graph()
+    g.enable_convex_restriction_cache()
+    cost_estimator_se = ShortcutEdgeCE(g, shortcut_edge_cost_factory)
+    domination_checker = ReachesNewSampling(graph=g, num_samples_per_vertex=5)
+    with pytest.raises(ValueError, match="convex restriction cache"):
+        GcsAstarReachability(
+            g,
+            cost_estimator_se,
+            domination_checker=domination_checker,
+            should_batch_neighbors=True,
+        )
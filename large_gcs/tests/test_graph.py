@@ -0,0 +1,414 @@
+import numpy as np
+from pydrake.all import L2NormCost, PerspectiveQuadraticCost, SolverOptions
+
+from large_gcs.geometry.point import Point
+from large_gcs.geometry.polyhedron import Polyhedron
+from large_gcs.graph.convex_restriction_cache import (
+    CacheEvictionPolicy,
+    ConvexRestrictionCache,
+    costs_constraints_fingerprint,
+)
+from large_gcs.graph.cost_constraint_factory import create_l1norm_edge_cost
+from large_gcs.graph.graph import (
+    CompactShortestPathSolution,
+    Edge,
+    ShortestPathSolution,
+    Vertex,
+    get_solver_iterations,
+)
+from large_gcs.graph.path_lp_solver import PathLinearProgramSolver
+from large_gcs.graph.path_program_builder import PathProgramBuilder
+from large_gcs.graph_generators.hor_vert_gcs import create_simplest_hor_vert_graph
+
+
+def _scan_outgoing_edge_keys(g, vertex_name):
+    return [key for key, e in g.edges.items() if e.u == vertex_name]
+
+
+def _scan_incoming_edge_keys(g, vertex_name):
+    return [key for key, e in g.edges.items() if e.v == vertex_name]
+
+
+def test_adjacency_index_matches_edges():
+    g = create_simplest_hor_vert_graph()
+    for v in g.vertex_names:
+        assert [e.key for e in g.outgoing_edges(v)] == _scan_outgoing_edge_keys(g, v)
+        assert [e.key for e in g.incoming_edges(v)] == _scan_incoming_edge_keys(g, v)
+        assert {e.key for e in g.incident_edges(v)} == set(
+            _scan_outgoing_edge_keys(g, v) + _scan_incoming_edge_keys(g, v)
+        )
+
+
+def test_adjacency_index_after_add_remove_edge():
+    g = create_simplest_hor_vert_graph()
+    shortcut = g.add_edge(Edge("p0", "t", key_suffix="shortcut"))
+    assert shortcut.key in [e.key for e in g.outgoing_edges("p0")]
+    assert shortcut.key in [e.key for e in g.incoming_edges("t")]
+
+    g.remove_edge(shortcut.key)
+    assert shortcut.key not in [e.key for e in g.outgoing_edges("p0")]
+    assert shortcut.key not in [e.key for e in g.incoming_edges("t")]
+    assert [e.key for e in g.outgoing_edges("p0")] == _scan_outgoing_edge_keys(g, "p0")
+
+
+def test_adjacency_index_after_remove_vertex():
+    g = create_simplest_hor_vert_graph()
+    g.remove_vertex("p2")
+    for v in g.vertex_names:
+        assert all(e.v != "p2" for e in g.outgoing_edges(v))
+        assert [e.key for e in g.outgoing_edges(v)] == _scan_outgoing_edge_keys(g, v)
+        assert [e.key for e in g.incoming_edges(v)] == _scan_incoming_edge_keys(g, v)
+
+
+def test_vertex_and_edge_ids_are_kept_after_removal():
+    g = create_simplest_hor_vert_graph()
+    p2_id = g.vertex_id("p2")
+    edge_ids = {e.key: g.edge_id(e.key) for e in g.incident_edges("p2")}
+    assert g.vertex_name_from_id(p2_id) == "p2"
+    assert all(g.edge_from_id(id).key == key for key, id in edge_ids.items())
+
+    p2 = g.vertices["p2"]
+    g.remove_vertex("p2")
+    assert all(g.edge_from_id(id) is None for id in edge_ids.values())
+    assert g.vertex_id("p2") == p2_id
+
+    g.add_vertex(p2, "p2")
+    e = g.add_edge(Edge("p2", "t"))
+    assert g.vertex_id("p2") == p2_id
+    assert g.edge_id(e.key) == edge_ids[e.key]
+    assert g.outgoing_edge_ids(p2_id) == [edge_ids[e.key]]
+    assert g.vertex_id("not_a_vertex") is None
+
+
+def test_remove_vertex_only_removes_incident_edges():
+    g = create_simplest_hor_vert_graph()
+    # Vertex whose name contains the name of another vertex
+    g.add_vertex(Vertex(Point((3, 3))), "p1_sample_0")
+    sample_edge = g.add_edge(Edge("p2", "p1_sample_0"))
+    n_edges_incident_to_p1 = len(g.incident_edges("p1"))
+    n_edges = g.n_edges
+
+    g.remove_vertex("p1")
+    assert sample_edge.key in g.edges
+    assert g.n_edges == n_edges - n_edges_incident_to_p1
+    assert "p1" not in g.successors("s")
+    assert all("p1" not in (e.u, e.v) for e in g.edges.values())
+
+
+def _cached_sol(cost):
+    return ShortestPathSolution(
+        is_success=True, cost=cost, time=1.0, vertex_path=[], ambient_path=[]
+    )
+
+
+def test_conv_res_cache_hit_and_miss():
+    g = create_simplest_hor_vert_graph()
+    g.enable_convex_restriction_cache(max_size=10)
+    cache = g.convex_restriction_cache
+    path = [
+        Edge.key_from_uv("s", "p0"),
+        Edge.key_from_uv("p0", "p2"),
+        Edge.key_from_uv("p2", "t"),
+    ]
+    cached_sol = _cached_sol(3.0)
+    cached_sol.n_iterations = 7
+    cached_sol.is_warm_started = True
+    cache.put(cache.make_key(path, skip_post_solve=True), cached_sol)
+
+    sol = g.solve_convex_restriction(path, skip_post_solve=True)
+    assert sol.cost == 3.0
+    # Hits are reported as cached, without the statistics of the original solve
+    assert sol.is_cached
+    assert sol.time == 0.0
+    assert sol.n_iterations is None and not sol.is_warm_started
+    assert not cached_sol.is_cached
+    assert cache.n_hits == 1
+    # Different solve settings are cached separately
+    assert cache.get(cache.make_key(path, skip_post_solve=False)) is None
+    assert cache.n_misses == 1
+
+
+def test_conv_res_cache_shortcut_edge_readded_with_same_costs():
+    g = create_simplest_hor_vert_graph()
+    g.enable_convex_restriction_cache()
+    cache = g.convex_restriction_cache
+    shortcut = g.add_edge(Edge("p0", "t", costs=[], key_suffix="shortcut"))
+    key = cache.make_key([Edge.key_from_uv("s", "p0"), shortcut.key], True)
+    cache.put(key, _cached_sol(1.0))
+
+    g.remove_edge(shortcut.key)
+    g.add_edge(Edge("p0", "t", costs=[], key_suffix="shortcut"))
+    assert cache.get(key) is not None
+
+
+def test_conv_res_cache_invalidated_on_changed_costs():
+    g = create_simplest_hor_vert_graph()
+    g.enable_convex_restriction_cache()
+    cache = g.convex_restriction_cache
+    shortcut = g.add_edge(Edge("p0", "t", costs=[], key_suffix="shortcut"))
+    key = cache.make_key([Edge.key_from_uv("s", "p0"), shortcut.key], True)
+    cache.put(key, _cached_sol(1.0))
+
+    g.remove_edge(shortcut.key)
+    cost = L2NormCost(A=np.hstack([np.eye(2), -np.eye(2)]), b=np.zeros(2))
+    g.add_edge(Edge("p0", "t", costs=[cost], key_suffix="shortcut"))
+    assert cache.get(key) is None
+    assert len(cache) == 0
+
+
+def test_fingerprint_of_unknown_evaluator_only_matches_itself():
+    cost = PerspectiveQuadraticCost(A=np.eye(3), b=np.zeros(3))
+    fingerprint = costs_constraints_fingerprint([cost], [])
+    assert costs_constraints_fingerprint([cost], []) == fingerprint
+    same_data_cost = PerspectiveQuadraticCost(A=np.eye(3), b=np.zeros(3))
+    assert costs_constraints_fingerprint([same_data_cost], []) != fingerprint
+
+
+def test_conv_res_cache_invalidated_on_remove_vertex():
+    g = create_simplest_hor_vert_graph()
+    g.enable_convex_restriction_cache()
+    cache = g.convex_restriction_cache
+    key = cache.make_key(
+        [Edge.key_from_uv("s", "p0"), Edge.key_from_uv("p0", "p2")], True
+    )
+    cache.put(key, _cached_sol(1.0))
+
+    g.remove_vertex("p0")
+    assert cache.get(key) is None
+
+
+def test_conv_res_cache_invalidated_on_remove_vertex_after_remove_edge():
+    g = create_simplest_hor_vert_graph()
+    g.enable_convex_restriction_cache()
+    cache = g.convex_restriction_cache
+    g.add_vertex(Vertex(Point((0, 1))), "sample")
+    edge = g.add_edge(Edge("s", "sample"))
+    key = cache.make_key([edge.key], True)
+    cache.put(key, _cached_sol(1.0))
+
+    # The edge is removed before the vertex, then both are re-added with a new set
+    g.remove_edge(edge.key)
+    g.remove_vertex("sample")
+    g.add_vertex(Vertex(Point((0, 2))), "sample")
+    g.add_edge(Edge("s", "sample"))
+    assert cache.get(key) is None
+
+
+def test_conv_res_cache_eviction():
+    lru = ConvexRestrictionCache(max_size=2, eviction_policy=CacheEvictionPolicy.LRU)
+    fifo = ConvexRestrictionCache(max_size=2, eviction_policy=CacheEvictionPolicy.FIFO)
+    for cache in [lru, fifo]:
+        for i in range(2):
+            cache.put(cache.make_key([str(i)], True), _cached_sol(i))
+        # Use the oldest entry before inserting a new one
+        cache.get(cache.make_key(["0"], True))
+        cache.put(cache.make_key(["2"], True), _cached_sol(2))
+        assert len(cache) == 2
+        assert cache.n_evictions == 1
+
+    assert lru.get(lru.make_key(["0"], True)) is not None
+    assert lru.get(lru.make_key(["1"], True)) is None
+    assert fifo.get(fifo.make_key(["0"], True)) is None
+    assert fifo.get(fifo.make_key(["1"], True)) is not None
+
+
+def _solve_gcs_convex_restriction(g, edge_keys):
+    return g._gcs.SolveConvexRestriction(
+        [g.edges[key].gcs_edge for key in edge_keys], g._gcs_options_wo_relaxation
+    )
+
+
+def test_path_program_builder_matches_gcs_convex_restriction():
+    g = create_simplest_hor_vert_graph()
+    builder = PathProgramBuilder(g)
+    path = [
+        Edge.key_from_uv("s", "p0"),
+        Edge.key_from_uv("p0", "p2"),
+        Edge.key_from_uv("p2", "t"),
+    ]
+    for k in range(1, len(path) + 1):
+        result = builder.solve(path[:k], g._gcs_options_wo_relaxation)
+        gcs_result = _solve_gcs_convex_restriction(g, path[:k])
+        assert result.is_success() == gcs_result.is_success()
+        if gcs_result.is_success():
+            assert np.isclose(result.get_optimal_cost(), gcs_result.get_optimal_cost())
+            x = g.vertices[g.edges[path[k - 1]].v].gcs_vertex.x()
+            assert np.allclose(
+                result.GetSolution(x), gcs_result.GetSolution(x), atol=1e-6
+            )
+
+
+def test_path_program_builder_extends_parent_program():
+    g = create_simplest_hor_vert_graph()
+    builder = PathProgramBuilder(g)
+    parent = [Edge.key_from_uv("s", "p0"), Edge.key_from_uv("p0", "p2")]
+    builder.build(parent)
+    # The parent's prefix is also cached for its siblings
+    assert len(builder.programs) == 2
+    n_misses = builder.programs.n_misses
+
+    builder.build(parent + [Edge.key_from_uv("p2", "t")])
+    # Only the child's program was missing, the parent's was extended
+    assert builder.programs.n_misses == n_misses + 1
+    assert builder.programs.n_hits == 1
+    assert len(builder.programs) == 3
+
+
+def test_path_program_builder_rejects_repeated_vertices():
+    g = create_simplest_hor_vert_graph()
+    g.add_edge(Edge("p2", "s"))
+    builder = PathProgramBuilder(g)
+    path = [
+        Edge.key_from_uv("s", "p0"),
+        Edge.key_from_uv("p0", "p2"),
+        Edge.key_from_uv("p2", "s"),
+    ]
+    assert builder.build(path) is None
+
+
+def test_path_vertex_names():
+    g = create_simplest_hor_vert_graph()
+    g.add_edge(Edge("p2", "s"))
+    s_p0, p0_p2, p2_s = (
+        Edge.key_from_uv("s", "p0"),
+        Edge.key_from_uv("p0", "p2"),
+        Edge.key_from_uv("p2", "s"),
+    )
+    assert g.path_vertex_names([s_p0, p0_p2]) == ["s", "p0", "p2"]
+    assert g.path_vertex_names([]) is None
+    assert g.path_vertex_names([p0_p2, s_p0]) is None
+    assert g.path_vertex_names([s_p0, p0_p2, p2_s]) is None
+
+
+def test_path_program_builder_warm_start_from_parent():
+    g = create_simplest_hor_vert_graph()
+    builder = PathProgramBuilder(g)
+    parent = [Edge.key_from_uv("s", "p0")]
+    child = parent + [Edge.key_from_uv("p0", "p2")]
+    parent_result = builder.solve(parent, g._gcs_options_wo_relaxation)
+    initial_guess = {
+        v: parent_result.GetSolution(g.vertices[v].gcs_vertex.x())
+        for v in g.path_vertex_names(parent)
+    }
+
+    cold_result = builder.solve(child, g._gcs_options_wo_relaxation)
+    warm_result = builder.solve(child, g._gcs_options_wo_relaxation, initial_guess)
+    assert warm_result.is_success()
+    assert np.isclose(warm_result.get_optimal_cost(), cold_result.get_optimal_cost())
+    assert get_solver_iterations(warm_result) is not None
+
+
+def test_only_guesses_for_path_vertices_warm_start():
+    g = create_simplest_hor_vert_graph()
+    g.enable_incremental_path_programs()
+    path = [Edge.key_from_uv("s", "p0"), Edge.key_from_uv("p0", "p2")]
+    for initial_guess, is_warm_started in [
+        (None, False),
+        # e.g. a compact parent solution without vertex values
+        ({}, False),
+        ({"t": g.vertices["t"].convex_set.center}, False),
+        ({"s": g.vertices["s"].convex_set.center}, True),
+    ]:
+        sol = g.solve_convex_restriction(
+            path, skip_post_solve=True, initial_guess=initial_guess
+        )
+        assert sol.is_success
+        assert sol.is_warm_started == is_warm_started
+
+
+def _create_l1_hor_vert_graph():
+    g = create_simplest_hor_vert_graph()
+    for edge_key, e in list(g.edges.items()):
+        g.remove_edge(edge_key)
+        g.add_edge(
+            Edge(
+                e.u, e.v, costs=[create_l1norm_edge_cost(2)], constraints=e.constraints
+            )
+        )
+    return g
+
+
+def test_path_lp_solver_matches_gcs_convex_restriction():
+    g = _create_l1_hor_vert_graph()
+    path = [
+        Edge.key_from_uv("s", "p0"),
+        Edge.key_from_uv("p0", "p2"),
+        Edge.key_from_uv("p2", "t"),
+    ]
+    g.enable_path_lp_solver(should_cross_check=True)
+    for k in range(1, len(path) + 1):
+        sol = g.solve_convex_restriction(path[:k])
+        gcs_result = _solve_gcs_convex_restriction(g, path[:k])
+        assert sol.is_success == gcs_result.is_success()
+        assert np.isclose(sol.cost, gcs_result.get_optimal_cost())
+        assert sol.n_iterations is not None
+    assert g.n_path_lp_cross_check_mismatches == 0
+
+    sol = g.solve_convex_restriction(path[:2], skip_post_solve=True)
+    assert sol.vertex_path == ["s", "p0", "p2"]
+    assert np.allclose(sol.ambient_path[0], g.vertices["s"].convex_set.center)
+
+
+def test_path_lp_solver_cross_check_uses_solver_options(monkeypatch):
+    g = _create_l1_hor_vert_graph()
+    g.enable_path_lp_solver(should_cross_check=True)
+    solver_options = SolverOptions()
+    used_solver_options = []
+    monkeypatch.setattr(
+        g,
+        "_cross_check_path_lp_result",
+        lambda active_edges, sol: used_solver_options.append(
+            g._gcs_options_wo_relaxation.solver_options
+        ),
+    )
+    g.solve_convex_restriction(
+        [Edge.key_from_uv("s", "p0")], solver_options=solver_options
+    )
+    assert used_solver_options == [solver_options]
+    assert g._gcs_options_wo_relaxation.solver_options is not solver_options
+
+
+def test_path_lp_solver_compiles_separated_constraints_only_if_same_set():
+    A, b = np.array([[1.0, 0.0], [-1.0, 0.0]]), np.array([1.0, 1.0])
+    C, d = np.array([[0.0, 1.0]]), np.array([0.5])
+    polyhedron = Polyhedron.from_separated_constraints(A, b, C, d)
+    A_ub, b_ub, A_eq, b_eq = PathLinearProgramSolver._compile_set_constraints(
+        polyhedron
+    )
+    assert np.array_equal(A_ub, A) and np.array_equal(b_ub, b)
+    assert np.array_equal(A_eq, C) and np.array_equal(b_eq, d)
+
+    # Same number of rows, but a different set than the half-space representation
+    polyhedron._d = np.array([0.25])
+    A_ub, b_ub, A_eq, b_eq = PathLinearProgramSolver._compile_set_constraints(
+        polyhedron
+    )
+    assert np.array_equal(A_ub, polyhedron.set.A())
+    assert np.array_equal(b_ub, polyhedron.set.b())
+    assert A_eq is None and b_eq is None
+
+
+def test_path_lp_solver_falls_back_on_l2_costs():
+    g = create_simplest_hor_vert_graph()
+    g.enable_path_lp_solver()
+    path = [Edge.key_from_uv("s", "p0")]
+    assert g.path_lp_solver.solve(path) is None
+
+
+def test_compact_solution_keeps_last_vertex():
+    ambient_path = [np.zeros(4), np.ones(4), np.full(4, 2.0)]
+    sol = ShortestPathSolution(
+        is_success=True,
+        cost=3.0,
+        time=0.1,
+        vertex_path=["s", "p0", "t"],
+        ambient_path=ambient_path,
+    )
+    compact = CompactShortestPathSolution.from_solution(sol, "p0")
+    assert compact.cost == sol.cost and compact.is_success
+    assert list(compact.vertex_solutions) == ["p0"]
+    assert np.array_equal(compact.vertex_values, ambient_path[1])
+    # The buffer is a copy, not a view into the full solution
+    assert compact.vertex_values.base is None
+    assert compact.result is None
+    assert compact.nbytes < sol.nbytes
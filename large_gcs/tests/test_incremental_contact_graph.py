@@ -0,0 +1,99 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+
+def _load_inc_graph(graph_name: str = "cg_simple_2"):
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(graph_name)
+    return IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+    )
+
+
+def test_generated_neighbors_intersect():
+    cg = _load_inc_graph()
+    u = cg.successors(cg.source_name)[0]
+    cg.generate_neighbors(u)
+    u_base_set = cg.vertices[u].convex_set.base_set
+    for v in cg.successors(u):
+        assert u_base_set.IntersectsWith(cg.vertices[v].convex_set.base_set)
+
+
+def test_generate_neighbors_twice_does_not_duplicate_edges():
+    cg = _load_inc_graph()
+    u = cg.successors(cg.source_name)[0]
+    cg.generate_neighbors(u)
+    edge_keys = [e.key for e in cg.outgoing_edges(u)]
+    n_gcs_edges = len(cg._gcs.Edges())
+
+    cg.generate_neighbors(u)
+    assert [e.key for e in cg.outgoing_edges(u)] == edge_keys
+    assert len(cg._gcs.Edges()) == n_gcs_edges
+
+
+def test_mode_set_intersections_are_shared_between_vertices():
+    cg = _load_inc_graph()
+    u = cg.successors(cg.source_name)[0]
+    cg.generate_neighbors(u)
+    n_misses = cg.n_mode_set_intersection_misses
+    # The edge back to u has the same set of modes as the edge from u
+    v = next(v for v in cg.successors(u) if v != cg.target_name)
+    cg.generate_neighbors(v)
+    assert cg.n_mode_set_intersection_hits > 0
+    assert u in cg.successors(v)
+    assert cg.n_mode_set_intersection_misses > n_misses
+
+
+def test_contact_pair_mode_adjacency_is_loaded_from_cache(tmp_path):
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
+        "cg_simple_2"
+    )
+    cache_path = str(tmp_path / "cg_simple_2_inc_adj_cache.npy")
+
+    def load():
+        return IncrementalContactGraph.load_from_file(
+            graph_file,
+            should_incl_simul_mode_switches=False,
+            should_add_const_edge_cost=True,
+            adjacency_cache_path=cache_path,
+        )
+
+    cg = load()
+    assert os.path.exists(cache_path)
+    with patch.object(
+        IncrementalContactGraph, "_compute_contact_pair_mode_adjacency"
+    ) as compute:
+        cached_cg = load()
+    compute.assert_not_called()
+    assert cached_cg._adj_modes == cg._adj_modes
+    assert (
+        cached_cg._modes_w_possible_edge_to_target
+        == cg._modes_w_possible_edge_to_target
+    )
+    assert cached_cg.successors(cached_cg.source_name) == cg.successors(cg.source_name)
+
+
+def test_stale_adjacency_cache_is_recomputed(tmp_path):
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(
+        "cg_simple_2"
+    )
+    cache_path = str(tmp_path / "cg_simple_2_inc_adj_cache.npy")
+    np.save(cache_path, {"key": "stale"})
+    cg = IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        adjacency_cache_path=cache_path,
+    )
+    data = np.load(cache_path, allow_pickle=True).item()
+    assert data["key"] == cg._adjacency_cache_key()
+    assert data["adj_modes"] == dict(cg._adj_modes)
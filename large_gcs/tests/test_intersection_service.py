@@ -0,0 +1,92 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+from pydrake.all import HPolyhedron
+
+from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.intersection_service import IntersectionService
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+
+def _random_boxes(n_boxes: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    lower = rng.uniform(-1, 1, size=(n_boxes, 2))
+    upper = lower + rng.uniform(0.1, 0.6, size=(n_boxes, 2))
+    return [HPolyhedron.MakeBox(lb, ub) for lb, ub in zip(lower, upper)]
+
+
+def test_workers_match_direct_intersection_checks():
+    boxes = _random_boxes(30)
+    pairs = np.array(list(combinations(range(len(boxes)), 2)))
+    expected = np.array([boxes[u].IntersectsWith(boxes[v]) for u, v in pairs])
+    assert expected.any() and not expected.all()
+
+    for n_workers in [0, 2]:
+        with IntersectionService(n_workers=n_workers, chunk_size=50) as service:
+            ids = service.add_sets(boxes[:10])
+            # Sets added later get new ids, and removed sets free theirs
+            ids = np.concatenate([ids, service.add_sets(boxes[10:])])
+            assert len(np.unique(ids)) == len(boxes)
+            service.remove_sets(ids[:5])
+            remaining_pairs = pairs[(pairs >= 5).all(axis=1)]
+            assert np.array_equal(
+                service.intersects(ids[remaining_pairs]),
+                expected[(pairs >= 5).all(axis=1)],
+            )
+            assert len(service.intersects(np.zeros((0, 2)))) == 0
+
+
+def test_dead_worker_raises():
+    boxes = _random_boxes(10)
+    pairs = np.array(list(combinations(range(len(boxes)), 2)))
+    with IntersectionService(n_workers=1) as service:
+        ids = service.add_sets(boxes)
+        worker = service._workers[0]
+        worker.kill()
+        worker.join()
+        with pytest.raises(RuntimeError, match="exited"):
+            service.intersects(ids[pairs])
+
+
+def test_contact_graph_uses_given_service():
+    graph_file = ContactGraphGeneratorParams.graph_file_path_from_name("cg_simple_2")
+    cg = ContactGraph.load_from_file(graph_file, should_use_l1_norm_vertex_cost=True)
+    n_objs = len(cg.objects)
+    target_pos_objs = target_pos_robs = None
+    if cg.target_pos is not None:
+        target_pos_objs = cg.target_pos[:n_objs]
+        target_pos_robs = cg.target_pos[n_objs:]
+
+    service = IntersectionService(n_workers=0)
+    n_checked = []
+    intersects = service.intersects
+
+    def counting_intersects(pairs, **kwargs):
+        n_checked.append(len(pairs))
+        return intersects(pairs, **kwargs)
+
+    service.intersects = counting_intersects
+    with service:
+        generated_cg = ContactGraph(
+            static_obstacles=cg.obstacles,
+            unactuated_objects=cg.objects,
+            actuated_robots=cg.robots,
+            source_pos_objs=cg.source_pos[:n_objs],
+            source_pos_robs=cg.source_pos[n_objs:],
+            target_pos_objs=target_pos_objs,
+            target_pos_robs=target_pos_robs,
+            target_region_params=cg.target_region_params,
+            workspace=cg.workspace,
+            vertex_exclusion=cg.vertex_exclusion,
+            vertex_inclusion=cg.vertex_inclusion,
+            should_use_l1_norm_vertex_cost=True,
+            intersection_service=service,
+        )
+        n = generated_cg.n_vertices
+        assert n_checked == [n * (n - 1) // 2]
+        # The graph does not close a service that it did not start
+        assert len(service.intersects(np.zeros((0, 2)))) == 0
+    assert set(generated_cg.edges) == set(cg.edges)
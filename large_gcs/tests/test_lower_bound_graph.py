@@ -1,6 +1,7 @@
 import logging
 
 from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.intersection_service import IntersectionService
 from large_gcs.graph.lower_bound_graph import LowerBoundGraph
 from large_gcs.graph_generators.contact_graph_generator import (
     ContactGraphGenerator,
@@ -26,3 +27,70 @@ def test_lbg_vertices_w_target_parent_are_0_cost():
     lbg.run_dijkstra()
     for vertex in lbg._parent_vertex_to_vertices[lbg._target_name]:
         assert lbg._g[vertex.key] == 0
+
+
+def _reference_dijkstra(lbg: LowerBoundGraph, parent_vertex_start: str):
+    import heapq
+
+    g = {vertex: float("inf") for vertex in lbg._vertices}
+    Q = []
+    for source in lbg._parent_vertex_to_vertices[parent_vertex_start]:
+        g[source] = 0
+        heapq.heappush(Q, (0, source))
+    expanded = set()
+    while len(Q) > 0:
+        _, vertex_key = heapq.heappop(Q)
+        if vertex_key in expanded:
+            continue
+        expanded.add(vertex_key)
+        for u, v in lbg._edges:
+            if u == vertex_key and g[v] > g[u] + lbg._edges[(u, v)]:
+                g[v] = g[u] + lbg._edges[(u, v)]
+                heapq.heappush(Q, (g[v], v))
+    return g
+
+
+def test_csr_dijkstra_matches_reference():
+    lbg = LowerBoundGraph.load_from_name("cg_simple_1")
+    start = next(iter(lbg._parent_vertex_to_vertices))
+    lbg.run_dijkstra(start)
+    expected = _reference_dijkstra(lbg, start)
+    assert lbg._g.keys() == expected.keys()
+    for key, cost in expected.items():
+        assert np.isclose(lbg._g[key], cost) or lbg._g[key] == cost == np.inf
+
+    parents = list(lbg._parent_vertex_to_vertices)
+    costs_to_go = lbg.get_costs_to_go(parents)
+    for parent, cost_to_go in zip(parents, costs_to_go):
+        lb = expected[lbg._parent_vertex_to_vertices[parent][0]]
+        assert lbg.get_cost_to_go(parent) == cost_to_go
+        assert np.isclose(cost_to_go, lb) or cost_to_go == lb == np.inf
+
+    # Adding an edge invalidates the CSR so the next run sees it
+    u, v = lbg._parent_vertex_to_vertices[start][0], list(lbg._vertices)[-1]
+    lbg.add_edge(u, v, 0)
+    lbg.run_dijkstra(start)
+    assert lbg._g[v] == 0
+
+
+def test_update_lbg_releases_sets_of_removed_vertices():
+    graph_file = ContactGraphGeneratorParams.graph_file_path_from_name("cg_simple_1")
+    cg = ContactGraph.load_from_file(graph_file, should_use_l1_norm_vertex_cost=True)
+    lbg = LowerBoundGraph.load_from_name("cg_simple_1")
+    lbg._graph = cg
+    service = IntersectionService(n_workers=0)
+    lbg.set_intersection_service(service)
+    source = cg.vertices[cg.source_name]
+    target = cg.vertices[cg.target_name]
+    cg.remove_vertex(cg.source_name)
+    cg.remove_vertex(cg.target_name)
+
+    lbg.update_lbg("source", source)
+    # Only the sets of the vertices of the graph stay in the service
+    assert len(service._sets) == cg.n_vertices
+    removed = cg.vertex_names[0]
+    cg.remove_vertex(removed)
+    lbg.update_lbg("target", target)
+    assert len(service._sets) == cg.n_vertices
+    assert removed not in lbg._intersection_set_ids
+    service.close()
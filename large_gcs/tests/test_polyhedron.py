@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pytest
@@ -234,7 +235,31 @@ def test_should_not_create_nullspace_polyhedron_if_infeasible_1():
     # fmt: on
     P = Polyhedron(H=A, h=b)
     P.create_nullspace_set()
-    assert not hasattr(P, "_nullspace_set")
+    assert P.nullspace_set is None
+
+
+def test_vertices_center_and_nullspace_set_are_computed_on_first_use():
+    H = np.array([[1.5, 1], [-1, 0], [0, -1]])
+    h = np.array([4, 0, 0])
+    P = Polyhedron(H, h)
+    assert P._vertices is None and P._center is None
+    assert not P._is_nullspace_set_created
+
+    vertices = P.vertices
+    assert np.allclose(
+        sorted(vertices.tolist()), [[0, 0], [0, 4], [8 / 3, 0]], atol=1e-6
+    )
+    # H and h are reordered so that row i is the face between vertices i, i + 1
+    for i in range(len(vertices)):
+        for vertex in [vertices[i], vertices[(i + 1) % len(vertices)]]:
+            assert np.isclose(P.H[i] @ vertex, P.h[i])
+    assert P.set.PointInSet(P.center)
+
+    with ProcessPoolExecutor(1) as executor:
+        P.precompute_nullspace_set(executor)
+        nullspace_set = P.nullspace_set
+    assert P._is_nullspace_set_created
+    assert nullspace_set.dim == 2
 
 
 @pytest.mark.skip(reason="We no longer implement this behavior here.")
@@ -1,3 +1,5 @@
+import numpy as np
+
 from large_gcs.algorithms.search_algorithm import AlgMetrics, SearchNode
 from large_gcs.domination_checkers.reaches_cheaper_sampling import (
     ReachesCheaperSampling,
@@ -9,6 +11,8 @@ from large_gcs.domination_checkers.reaches_new_sampling import ReachesNewSamplin
 from large_gcs.domination_checkers.reaches_new_sampling_pairwise import (
     ReachesNewSamplingPairwise,
 )
+from large_gcs.domination_checkers.sampling_domination_checker import SetSamples
+from large_gcs.graph.path_lp_solver import PathLinearProgramSolver
 from large_gcs.graph_generators.hor_vert_gcs import create_polyhedral_hor_vert_b_graph
 
 NUM_SAMPLES_PER_VERTEX = 200
@@ -96,6 +100,105 @@ def test_reaches_new_sampling_polyhedral_hor_vert_b_graph():
     )
 
 
+def test_reaches_new_sampling_batched_projection_polyhedral_hor_vert_b_graph():
+    G = create_polyhedral_hor_vert_b_graph()
+    domination_checker = ReachesNewSampling(
+        graph=G,
+        num_samples_per_vertex=NUM_SAMPLES_PER_VERTEX,
+        should_batch_sample_projection=True,
+    )
+    domination_checker.set_alg_metrics(AlgMetrics())
+    n_x = SearchNode.from_vertex_path(["s", "p1", "p2"])
+    n_y = SearchNode.from_vertex_path(["s", "p6", "p7", "p2"])
+    n_z = SearchNode.from_vertex_path(["s", "p8", "p9", "p2"])
+
+    assert domination_checker.is_dominated(candidate_node=n_x, alternate_nodes=[n_y])
+    assert not domination_checker.is_dominated(
+        candidate_node=n_y, alternate_nodes=[n_x]
+    )
+    assert domination_checker.is_dominated(candidate_node=n_z, alternate_nodes=[n_x])
+
+
+def test_batched_projection_skips_failed_samples(monkeypatch):
+    G = create_polyhedral_hor_vert_b_graph()
+    domination_checker = ReachesNewSampling(
+        graph=G,
+        num_samples_per_vertex=NUM_SAMPLES_PER_VERTEX,
+        should_batch_sample_projection=True,
+    )
+    domination_checker.set_alg_metrics(AlgMetrics())
+    project_samples_qp = SetSamples.project_samples_qp
+
+    def project_samples_qp_first_fails(self, *args):
+        results = project_samples_qp(self, *args)
+        # As if the projection of the first sample was infeasible
+        results[0] = np.nan
+        return results
+
+    monkeypatch.setattr(
+        SetSamples, "project_samples_qp", project_samples_qp_first_fails
+    )
+    n_x = SearchNode.from_vertex_path(["s", "p1", "p2"])
+    n_y = SearchNode.from_vertex_path(["s", "p6", "p7", "p2"])
+
+    assert domination_checker.is_dominated(candidate_node=n_x, alternate_nodes=[n_y])
+    assert not domination_checker.is_dominated(
+        candidate_node=n_y, alternate_nodes=[n_x]
+    )
+    assert "p2_sample_0" not in G.vertices
+
+
+def test_project_samples_qp_matches_project_single_gcs_polyhedral_hor_vert_b_graph():
+    G = create_polyhedral_hor_vert_b_graph()
+    node = SearchNode.from_vertex_path(["s", "p6", "p7", "p2"])
+    set_samples = SetSamples.from_vertex("p2", G.vertices["p2"], 20)
+    alg_metrics = AlgMetrics()
+
+    proj_samples = set_samples.project_samples_qp(G, node, alg_metrics)
+    assert proj_samples.shape == set_samples.samples.shape
+    assert alg_metrics.n_gcs_solves == len(set_samples.samples)
+
+    set_samples.init_graph_for_projection(G, node, alg_metrics)
+    for sample, proj_sample in zip(set_samples.samples, proj_samples):
+        expected = set_samples.project_single_gcs(G, node, sample)
+        assert np.allclose(proj_sample, expected, atol=1e-2)
+        assert G.vertices["p2"].convex_set.set.PointInSet(proj_sample, 1e-6)
+
+
+def test_project_samples_qp_matches_project_single_gcs_on_several_paths():
+    G = create_polyhedral_hor_vert_b_graph()
+    path_lp_solver = PathLinearProgramSolver(G)
+    set_samples = SetSamples.from_vertex("p2", G.vertices["p2"], 50)
+    for vertex_path in [["s", "p1", "p2"], ["s", "p8", "p9", "p2"]]:
+        node = SearchNode.from_vertex_path(vertex_path)
+        alg_metrics = AlgMetrics()
+        proj_samples = set_samples.project_samples_qp(
+            G, node, alg_metrics, path_lp_solver
+        )
+        set_samples.init_graph_for_projection(G, node, alg_metrics)
+        expected = np.array(
+            [
+                set_samples.project_single_gcs(G, node, sample)
+                for sample in set_samples.samples
+            ]
+        )
+        assert np.allclose(proj_samples, expected, atol=1e-4)
+
+
+def test_project_samples_qp_single_sample_polyhedral_hor_vert_b_graph():
+    G = create_polyhedral_hor_vert_b_graph()
+    path_lp_solver = PathLinearProgramSolver(G)
+    set_samples = SetSamples.from_vertex("p2", G.vertices["p2"], 1)
+    for vertex_path in [["s", "p1", "p2"], ["s", "p6", "p7", "p2"]]:
+        node = SearchNode.from_vertex_path(vertex_path)
+        # Any reachable point, as with project_single_gcs
+        proj_samples = set_samples.project_samples_qp(
+            G, node, AlgMetrics(), path_lp_solver
+        )
+        assert proj_samples.shape == (1, G.vertices["p2"].convex_set.dim)
+        assert G.vertices["p2"].convex_set.set.PointInSet(proj_samples[0], 1e-6)
+
+
 def test_reaches_cheaper_sampling_polyhedral_hor_vert_b_graph():
     G = create_polyhedral_hor_vert_b_graph()
     domination_checker = ReachesCheaperSampling(
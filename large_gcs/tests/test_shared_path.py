@@ -0,0 +1,99 @@
+import pickle
+
+import numpy as np
+
+from large_gcs.algorithms.search_algorithm import SearchNode
+from large_gcs.utils.shared_path import SharedPath
+
+
+def test_shared_path_behaves_like_list():
+    items = ["s", "p0", "p1", "t"]
+    path = SharedPath(items)
+    assert len(path) == 4
+    assert path == items
+    assert list(path) == items
+    assert path[0] == "s" and path[-1] == "t" and path[-2] == "p1"
+    assert path[1:] == items[1:]
+    assert path.index("p1") == 2
+    assert "p0" in path and "p2" not in path
+    assert path + ["x"] == items + ["x"]
+    assert np.array_equal(np.array(path), np.array(items))
+    assert repr(path) == repr(items)
+    assert path.prefix == items[:-1]
+
+    copy = path.copy()
+    copy.append("x")
+    assert path == items
+
+
+def test_search_node_paths_share_prefix_with_parent():
+    root = SearchNode(priority=0, vertex_name="s", edge_path=[], vertex_path=["s"])
+    child = SearchNode.from_parent("p0", root)
+    grandchild = SearchNode.from_parent("p1", child)
+    sibling = SearchNode.from_parent("p2", child)
+
+    assert grandchild.vertex_path == ["s", "p0", "p1"]
+    assert grandchild.edge_path == ['("s", "p0")', '("p0", "p1")']
+    assert sibling.vertex_path == ["s", "p0", "p2"]
+    assert grandchild.vertex_path.prefix is child.vertex_path
+    assert sibling.edge_path.prefix is child.edge_path
+
+    nodes = pickle.loads(pickle.dumps([grandchild, sibling]))
+    assert nodes[0].vertex_path == grandchild.vertex_path
+    assert nodes[1].edge_path == sibling.edge_path
+
+
+def test_shared_path_pickles_deep_paths():
+    items = [f"v{i}" for i in range(5000)]
+    path = pickle.loads(pickle.dumps(SharedPath(items)))
+    assert path == items
+    assert "v4999" in path and "u0" not in path
+    assert path.extended("x")[-2:] == ["v4999", "x"]
+
+    # Paths that extend the same long prefix share its anchor after unpickling
+    prefix = SharedPath(items[:200])
+    a, b = pickle.loads(pickle.dumps([prefix.extended("a"), prefix.extended("b")]))
+    for _ in range(9):
+        a, b = a.prefix, b.prefix
+    assert a is b and a == items[:192]
+
+
+def test_search_node_from_legacy_checkpoint():
+    node = SearchNode.from_vertex_path(["s", "p0", "p1"])
+    # Checkpoints from before SharedPath store the paths as lists
+    node.edge_path = node.edge_path.to_list()
+    node.vertex_path = node.vertex_path.to_list()
+    node = pickle.loads(pickle.dumps(node))
+    assert isinstance(node.edge_path, SharedPath)
+    assert isinstance(node.vertex_path, SharedPath)
+    child = SearchNode.from_parent("t", node)
+    assert child.vertex_path == ["s", "p0", "p1", "t"]
+    assert child.edge_path[-1] == '("p1", "t")'
+    assert child.edge_path_visits("p0")
+
+
+def test_shared_path_membership_is_exact():
+    items = [f"v{i}" for i in range(300)]
+    path = SharedPath(items)
+    assert all(item in path for item in items)
+    assert not any(f"u{i}" in path for i in range(300))
+    # The bloom filter is rebuilt after unpickling
+    path = pickle.loads(pickle.dumps(path))
+    assert all(item in path for item in items)
+    assert "u0" not in path
+
+
+def test_shared_path_bloom_filter_grows_with_path():
+    for n_items in [10, 100, 1000]:
+        path = SharedPath(f"v{i}" for i in range(n_items))
+        n_false_positives = sum(path._may_contain(f"u{i}") for i in range(1000))
+        assert n_false_positives < 100
+        assert all(path._may_contain(f"v{i}") for i in range(n_items))
+
+
+def test_edge_path_visits():
+    root = SearchNode(priority=0, vertex_name="s", edge_path=[], vertex_path=["s"])
+    child = SearchNode.from_parent("p0", root)
+    assert not root.edge_path_visits("s")
+    assert child.edge_path_visits("s") and child.edge_path_visits("p0")
+    assert not child.edge_path_visits("p1")
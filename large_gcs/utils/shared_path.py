@@ -0,0 +1,200 @@
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+# Minimum number of bits in the bloom filter of a SharedPath
+_MIN_BLOOM_SIZE = 128
+# Minimum number of bits per item, which keeps the false positive rate of
+# the two bit filter below 5%
+_BLOOM_BITS_PER_ITEM = 8
+
+
+def _bloom_size(length: int) -> int:
+    """Number of bits in the bloom filter of a path of the given length, a
+    power of two so that it only changes when the length doubles."""
+    return max(_MIN_BLOOM_SIZE, 1 << (_BLOOM_BITS_PER_ITEM * length - 1).bit_length())
+
+
+def _bloom_bits(item, size: int) -> int:
+    # Two bits from independent parts of the hash
+    h = hash(item)
+    return (1 << (h % size)) | (1 << ((h // size) % size))
+
+
+def _bloom(items: Iterable, size: int) -> int:
+    bloom = 0
+    for item in items:
+        bloom |= _bloom_bits(item, size)
+    return bloom
+
+
+# Base of the lengths of the prefixes that are pickled as separate objects
+_PICKLE_ANCHOR_BASE = 64
+
+
+def _pickle_anchor_len(length: int) -> int:
+    """Length of the prefix that a path of the given length is pickled
+    relative to: the length with its lowest non-zero digit in base
+    _PICKLE_ANCHOR_BASE set to zero. Following the anchors of a path
+    takes at most log_64(length) + 1 steps. length must be positive."""
+    step = 1
+    while (length // step) % _PICKLE_ANCHOR_BASE == 0:
+        step *= _PICKLE_ANCHOR_BASE
+    return length - (length // step) % _PICKLE_ANCHOR_BASE * step
+
+
+class SharedPath(Sequence):
+    """Immutable path of vertex names or edge keys that shares its prefix
+    with the path it extends.
+
+    Each SharedPath is a single link holding the last item and a pointer
+    to the prefix path, so extending a path by one item (e.g. creating the
+    child of a search node) takes O(1) time and memory instead of copying
+    the whole path. A list is only materialized when the path is iterated,
+    sliced, copied or concatenated. Indexing from the end, len and
+    membership tests do not materialize a list.
+
+    Each link also keeps a bloom filter of the items in the path, so that
+    membership tests of items that are not in the path (the common case
+    when checking for cycles) are O(1). Items that pass the filter are
+    checked exactly by walking the path from the end. The filter grows
+    with the path so that it does not fill up on long paths; it is
+    rebuilt from the items when its size doubles, which is amortized
+    O(1) per item along a path.
+    """
+
+    __slots__ = ("_prefix", "_last", "_len", "_bloom")
+
+    def __init__(self, items: Iterable = ()):
+        self._prefix: Optional[SharedPath] = None
+        self._last = None
+        self._len = 0
+        self._bloom = 0
+        items = list(items)
+        if len(items) > 0:
+            self._link(SharedPath()._extended_by(items[:-1]), items[-1])
+
+    def extended(self, item) -> "SharedPath":
+        """Returns the path with item appended, sharing this path as its
+        prefix."""
+        path = SharedPath.__new__(SharedPath)
+        path._link(self, item)
+        return path
+
+    def _extended_by(self, items: Iterable) -> "SharedPath":
+        path = self
+        for item in items:
+            path = path.extended(item)
+        return path
+
+    def _link(self, prefix: "SharedPath", item) -> None:
+        self._prefix = prefix
+        self._last = item
+        self._len = prefix._len + 1
+        size = _bloom_size(self._len)
+        if size == _bloom_size(prefix._len):
+            self._bloom = prefix._bloom | _bloom_bits(item, size)
+        else:
+            self._bloom = _bloom(reversed(self), size)
+
+    @property
+    def prefix(self) -> "SharedPath":
+        """The path without its last item, equivalent to path[:-1] but
+        without materializing a list."""
+        assert self._len > 0, "Empty path has no prefix"
+        return self._prefix
+
+    def to_list(self) -> List:
+        items = list(reversed(self))
+        items.reverse()
+        return items
+
+    def copy(self) -> List:
+        """Returns a mutable list of the items, like list.copy."""
+        return self.to_list()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __reversed__(self) -> Iterator:
+        path = self
+        while path._len > 0:
+            yield path._last
+            path = path._prefix
+
+    def __iter__(self) -> Iterator:
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("SharedPath index out of range")
+        path = self
+        for _ in range(self._len - 1 - index):
+            path = path._prefix
+        return path._last
+
+    def __contains__(self, item) -> bool:
+        if not self._may_contain(item):
+            return False
+        return any(x == item for x in reversed(self))
+
+    def _may_contain(self, item) -> bool:
+        """False if item is definitely not in the path."""
+        bits = _bloom_bits(item, _bloom_size(self._len))
+        return self._bloom & bits == bits
+
+    def index(self, item, *args) -> int:
+        return self.to_list().index(item, *args)
+
+    def __add__(self, other) -> List:
+        return self.to_list() + list(other)
+
+    def __radd__(self, other) -> List:
+        return list(other) + self.to_list()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SharedPath):
+            return self is other or (
+                self._len == other._len and self.to_list() == other.to_list()
+            )
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __getstate__(self):
+        # Pickling each link as its prefix and last item would recurse once
+        # per item. Instead the items after an anchor prefix (see
+        # _pickle_anchor_len) are pickled as a list, so the recursion depth
+        # is logarithmic in the length, and paths that share the anchor
+        # still share it after unpickling. String hashes differ between
+        # processes, so the bloom filter is recomputed when unpickling.
+        if self._len == 0:
+            return None, []
+        anchor_len = _pickle_anchor_len(self._len)
+        items = []
+        anchor = self
+        while anchor._len > anchor_len:
+            items.append(anchor._last)
+            anchor = anchor._prefix
+        items.reverse()
+        return anchor, items
+
+    def __setstate__(self, state):
+        self._prefix, self._last, self._len, self._bloom = None, None, 0, 0
+        anchor, items = state
+        if len(items) > 0:
+            self._link(anchor._extended_by(items[:-1]), items[-1])
+
+    # Mutable lists are not hashable either
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_list())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.to_list(), dtype=dtype)
@@ -0,0 +1,108 @@
+"""Benchmark for the containment LPs of path AH-polytopes.
+
+Builds the AH-polytopes of the prefixes of a walk through an incremental
+contact graph and checks the containment of each of them in itself, which
+holds, so the LPs are solved to feasibility. For each prefix it measures
+the time to build the LP with pypolycontain.subset and solve it with Clp,
+and the time to build the sparse ContainmentLP and solve it with each of
+the given backends.
+"""
+
+import argparse
+import logging
+import time
+
+import pypolycontain as pp
+from pydrake.all import ClpSolver, HPolyhedron, MathematicalProgram
+
+from large_gcs.algorithms.search_algorithm import AlgMetrics, SearchNode
+from large_gcs.domination_checkers.reaches_new_containment import ReachesNewContainment
+from large_gcs.geometry.ah_containment_lp import ContainmentLP
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def walk(
+    cg: IncrementalContactGraph,
+    domination_checker: ReachesNewContainment,
+    n_vertices: int,
+) -> SearchNode:
+    """Follows the first unvisited neighbor from the source that keeps the
+    path polytope nonempty."""
+    node = SearchNode.from_vertex_path([cg.source_name])
+    while len(node.vertex_path) < n_vertices:
+        cg.generate_neighbors(node.vertex_name)
+        for e in cg.outgoing_edges(node.vertex_name):
+            if e.v in node.vertex_path or e.v == cg.target_name:
+                continue
+            child = SearchNode.from_parent(e.v, node)
+            blocks = domination_checker.get_path_polytope_blocks(child, False)
+            if not HPolyhedron(*blocks.to_dense(False)).IsEmpty():
+                node = child
+                break
+        else:
+            break
+    return node
+
+
+def main(graph_name: str, n_vertices: int, solvers) -> None:
+    cg = IncrementalContactGraph.load_from_file(
+        ContactGraphGeneratorParams.inc_graph_file_path_from_name(graph_name),
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+        should_use_l1_norm_vertex_cost=True,
+    )
+    domination_checker = ReachesNewContainment(graph=cg)
+    domination_checker.set_alg_metrics(AlgMetrics())
+    node = walk(cg, domination_checker, n_vertices)
+    for i in range(2, len(node.vertex_path) + 1):
+        prefix = SearchNode.from_vertex_path(node.vertex_path[:i])
+        AH = domination_checker._maybe_create_path_AH_polytope(prefix)
+        message = f"{i} vertices, H {AH.P.H.shape}:"
+
+        start_time = time.perf_counter()
+        prog = MathematicalProgram()
+        pp.subset(prog, AH, AH, -1)
+        build_time = time.perf_counter() - start_time
+        is_contained = ClpSolver().Solve(prog).is_success()
+        message += (
+            f" subset build {build_time:.3f} s, clp "
+            f"{time.perf_counter() - start_time - build_time:.3f} s ({is_contained})"
+        )
+
+        start_time = time.perf_counter()
+        lp = ContainmentLP.from_AH_polytopes(AH, AH)
+        message += f" | sparse build {time.perf_counter() - start_time:.3f} s"
+        for solver in solvers:
+            start_time = time.perf_counter()
+            is_contained = lp.solve(solver)
+            message += (
+                f", {solver} {time.perf_counter() - start_time:.3f} s "
+                f"({is_contained})"
+            )
+        logger.info(message)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the containment LPs of path AH-polytopes"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_stackpush_d2")
+    parser.add_argument("--n_vertices", type=int, default=6)
+    parser.add_argument("--solvers", type=str, nargs="+", default=["highs", "clp"])
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    logging.getLogger("large_gcs").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    main(args.graph_name, args.n_vertices, args.solvers)
@@ -0,0 +1,103 @@
+"""Benchmark for loading contact graphs from columnar graph files.
+
+Loads a full contact graph from its pickled .npy file, saves it as a
+columnar graph file and measures the time to load it again from the
+columnar file, to create all of its contact sets and to add all of its
+vertices and edges to the drake gcs, the work that loading the .npy file
+does up front. The same is done for an incremental contact graph.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def benchmark_contact_graph(graph_name: str, tmp_dir: str) -> None:
+    start_time = time.perf_counter()
+    cg = ContactGraph.load_from_file(
+        ContactGraphGeneratorParams.graph_file_path_from_name(graph_name),
+        should_use_l1_norm_vertex_cost=True,
+    )
+    logger.info(
+        f"{graph_name}: load .npy {time.perf_counter() - start_time:.3f} s "
+        f"({cg.n_vertices} vertices, {cg.n_edges} edges)"
+    )
+
+    path = os.path.join(tmp_dir, graph_name)
+    start_time = time.perf_counter()
+    cg.save_to_file(path)
+    logger.info(f"{graph_name}: save columnar {time.perf_counter() - start_time:.3f} s")
+
+    start_time = time.perf_counter()
+    cg = ContactGraph.load_from_file(path, should_use_l1_norm_vertex_cost=True)
+    logger.info(f"{graph_name}: load columnar {time.perf_counter() - start_time:.3f} s")
+
+    start_time = time.perf_counter()
+    for v in cg.vertices.values():
+        v.convex_set
+    logger.info(
+        f"{graph_name}: create all contact sets "
+        f"{time.perf_counter() - start_time:.3f} s"
+    )
+
+    start_time = time.perf_counter()
+    cg._add_lazy_elements_to_gcs()
+    logger.info(
+        f"{graph_name}: add all vertices and edges to gcs "
+        f"{time.perf_counter() - start_time:.3f} s"
+    )
+
+
+def benchmark_inc_contact_graph(inc_graph_name: str, tmp_dir: str) -> None:
+    kwargs = dict(
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+    )
+    start_time = time.perf_counter()
+    cg = IncrementalContactGraph.load_from_file(
+        ContactGraphGeneratorParams.inc_graph_file_path_from_name(inc_graph_name),
+        **kwargs,
+    )
+    logger.info(f"{inc_graph_name}: load .npy {time.perf_counter() - start_time:.3f} s")
+
+    path = os.path.join(tmp_dir, inc_graph_name + "_inc")
+    cg.save_only_inc_to_file(path)
+    # The first load computes the adjacency cache next to the file
+    IncrementalContactGraph.load_from_file(path, **kwargs)
+    start_time = time.perf_counter()
+    IncrementalContactGraph.load_from_file(path, **kwargs)
+    logger.info(
+        f"{inc_graph_name}: load columnar {time.perf_counter() - start_time:.3f} s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading graphs from columnar graph files"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_simple_4")
+    parser.add_argument("--inc_graph_name", type=str, default="cg_maze_b1")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    logging.getLogger("large_gcs").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        benchmark_contact_graph(args.graph_name, tmp_dir)
+        benchmark_inc_contact_graph(args.inc_graph_name, tmp_dir)
@@ -0,0 +1,97 @@
+"""Micro-benchmark for Graph.outgoing_edges on a loaded incremental contact
+graph.
+
+Compares the indexed per-vertex adjacency lookup against the previous
+implementation that scanned every edge in the graph.
+"""
+
+import argparse
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def expand_graph(cg: IncrementalContactGraph, n_expansions: int) -> None:
+    """Breadth first expansion of the incremental graph to grow the number of
+    edges."""
+    to_expand = deque([cg.source_name])
+    expanded = set()
+    while len(to_expand) > 0 and len(expanded) < n_expansions:
+        vertex_name = to_expand.popleft()
+        if vertex_name in expanded or vertex_name == cg.target_name:
+            continue
+        cg.generate_neighbors(vertex_name)
+        expanded.add(vertex_name)
+        for edge in cg.outgoing_edges(vertex_name):
+            to_expand.append(edge.v)
+
+
+def scan_outgoing_edges(cg: IncrementalContactGraph, vertex_name: str):
+    return [edge for edge in cg.edges.values() if edge.u == vertex_name]
+
+
+def time_lookups(lookup, vertex_names, n_repeats: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(n_repeats):
+        for vertex_name in vertex_names:
+            lookup(vertex_name)
+    return time.perf_counter() - start_time
+
+
+def main(graph_name: str, n_expansions: int, n_repeats: int) -> None:
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(graph_name)
+    cg = IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=False,
+        should_use_l1_norm_vertex_cost=True,
+    )
+    expand_graph(cg, n_expansions)
+    vertex_names = cg.vertex_names
+    logger.info(f"Graph has {cg.n_vertices} vertices and {cg.n_edges} edges")
+
+    # Sanity check that both lookups agree
+    for vertex_name in vertex_names:
+        assert [e.key for e in cg.outgoing_edges(vertex_name)] == [
+            e.key for e in scan_outgoing_edges(cg, vertex_name)
+        ]
+
+    indexed_time = time_lookups(cg.outgoing_edges, vertex_names, n_repeats)
+    scan_time = time_lookups(
+        lambda v: scan_outgoing_edges(cg, v), vertex_names, n_repeats
+    )
+    n_lookups = len(vertex_names) * n_repeats
+    logger.info(
+        f"indexed: {indexed_time / n_lookups * 1e6:.2f} us/lookup, "
+        f"scan: {scan_time / n_lookups * 1e6:.2f} us/lookup, "
+        f"speedup: {scan_time / indexed_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark Graph.outgoing_edges on an incremental contact graph"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_maze_b1")
+    parser.add_argument("--n_expansions", type=int, default=200)
+    parser.add_argument("--n_repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    np.set_printoptions(formatter={"float": lambda x: "{0:0.3f}".format(x)})
+
+    main(args.graph_name, args.n_expansions, args.n_repeats)
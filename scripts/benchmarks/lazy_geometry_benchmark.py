@@ -0,0 +1,101 @@
+"""Benchmark for graph loading and neighbor generation time with lazily
+computed polyhedron geometry (vertices, centers and nullspace sets).
+
+Measures the time to load a full contact graph and an incremental contact
+graph, the time of a breadth first neighbor generation on the incremental
+graph, and the time to then access the nullspace sets of all the generated
+vertices, which is the work that was previously done up front.
+"""
+
+import argparse
+import logging
+import time
+from collections import deque
+
+from large_gcs.contact.contact_set import ContactSet
+from large_gcs.graph.contact_graph import ContactGraph
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def expand_graph(cg: IncrementalContactGraph, n_expansions: int) -> None:
+    to_expand = deque([cg.source_name])
+    expanded = set()
+    while len(to_expand) > 0 and len(expanded) < n_expansions:
+        vertex_name = to_expand.popleft()
+        if vertex_name in expanded or vertex_name == cg.target_name:
+            continue
+        cg.generate_neighbors(vertex_name)
+        expanded.add(vertex_name)
+        for edge in cg.outgoing_edges(vertex_name):
+            to_expand.append(edge.v)
+
+
+def main(
+    graph_name: str, inc_graph_name: str, n_expansions: int, n_nullspace_workers: int
+) -> None:
+    start_time = time.perf_counter()
+    cg = ContactGraph.load_from_file(
+        ContactGraphGeneratorParams.graph_file_path_from_name(graph_name),
+        should_use_l1_norm_vertex_cost=True,
+    )
+    logger.info(
+        f"{graph_name}: load {time.perf_counter() - start_time:.2f} s "
+        f"({cg.n_vertices} vertices)"
+    )
+
+    start_time = time.perf_counter()
+    inc_cg = IncrementalContactGraph.load_from_file(
+        ContactGraphGeneratorParams.inc_graph_file_path_from_name(inc_graph_name),
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+        n_nullspace_workers=n_nullspace_workers,
+    )
+    logger.info(f"{inc_graph_name}: load {time.perf_counter() - start_time:.2f} s")
+
+    start_time = time.perf_counter()
+    expand_graph(inc_cg, n_expansions)
+    logger.info(
+        f"{inc_graph_name}: {n_expansions} expansions "
+        f"{time.perf_counter() - start_time:.2f} s ({inc_cg.n_vertices} vertices)"
+    )
+
+    start_time = time.perf_counter()
+    for vertex in inc_cg.vertices.values():
+        if isinstance(vertex.convex_set, ContactSet):
+            vertex.convex_set.nullspace_set
+    logger.info(
+        f"{inc_graph_name}: access all nullspace sets "
+        f"{time.perf_counter() - start_time:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark graph loading and neighbor generation"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_simple_4")
+    parser.add_argument("--inc_graph_name", type=str, default="cg_maze_b1")
+    parser.add_argument("--n_expansions", type=int, default=100)
+    parser.add_argument("--n_nullspace_workers", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    logging.getLogger("large_gcs").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    main(
+        args.graph_name,
+        args.inc_graph_name,
+        args.n_expansions,
+        args.n_nullspace_workers,
+    )
@@ -0,0 +1,133 @@
+"""Benchmark for the cost to go computation on a lower bound graph.
+
+Loads the largest lower bound graph in example_graphs (or the one given by
+name) and measures the time to build its CSR adjacency matrix, to run the
+csgraph Dijkstra from the lbg vertices of a parent vertex and to look up
+the cost to go of every parent vertex. For comparison it also times the
+previous dict based Dijkstra, which copied the path to every vertex pushed
+on the heap.
+"""
+
+import argparse
+import glob
+import heapq as heap
+import logging
+import os
+import time
+
+import numpy as np
+
+from large_gcs.graph.lower_bound_graph import LowerBoundGraph
+
+logger = logging.getLogger(__name__)
+
+
+def dict_dijkstra(lbg: LowerBoundGraph, parent_vertex_start: str):
+    g = {vertex: float("inf") for vertex in lbg._vertices.keys()}
+    expanded = set()
+    Q = []
+    for source in lbg._parent_vertex_to_vertices[parent_vertex_start]:
+        g[source] = 0
+        heap.heappush(Q, (0, source, []))
+    while len(Q) > 0:
+        cost, vertex_key, path = heap.heappop(Q)
+        if vertex_key in expanded:
+            continue
+        expanded.add(vertex_key)
+        for neighbor in lbg.successors(vertex_key):
+            if neighbor in expanded:
+                continue
+            edge_cost = lbg._edges[(vertex_key, neighbor)]
+            if g[neighbor] > g[vertex_key] + edge_cost:
+                g[neighbor] = g[vertex_key] + edge_cost
+                heap.heappush(Q, (g[neighbor], neighbor, path + [vertex_key]))
+    return g
+
+
+def largest_lbg_file_path() -> str:
+    paths = glob.glob(
+        os.path.join(os.environ["PROJECT_ROOT"], "example_graphs", "*_lbg.npy")
+    )
+    return max(paths, key=os.path.getsize)
+
+
+def main(lbg_file_path: str, n_repeats: int) -> None:
+    start_time = time.perf_counter()
+    lbg = LowerBoundGraph.load_from_file(lbg_file_path)
+    logger.info(
+        f"{os.path.basename(lbg_file_path)}: load "
+        f"{time.perf_counter() - start_time:.3f} s "
+        f"({len(lbg._vertices)} vertices, {len(lbg._edges)} edges)"
+    )
+    parents = list(lbg._parent_vertex_to_vertices)
+    start = lbg._target_name if lbg._target_name in parents else parents[0]
+
+    start_time = time.perf_counter()
+    lbg._build_csr()
+    logger.info(f"build CSR {time.perf_counter() - start_time:.4f} s")
+
+    start_time = time.perf_counter()
+    for _ in range(n_repeats):
+        lbg.run_dijkstra(start)
+    csr_duration = (time.perf_counter() - start_time) / n_repeats
+    logger.info(f"csgraph dijkstra {csr_duration:.4f} s")
+
+    start_time = time.perf_counter()
+    for _ in range(n_repeats):
+        g = dict_dijkstra(lbg, start)
+    dict_duration = (time.perf_counter() - start_time) / n_repeats
+    logger.info(
+        f"dict dijkstra {dict_duration:.4f} s "
+        f"({dict_duration / csr_duration:.1f}x csgraph)"
+    )
+    assert all(
+        np.isclose(lbg._g[key], cost) or lbg._g[key] == cost for key, cost in g.items()
+    )
+
+    start_time = time.perf_counter()
+    for _ in range(n_repeats):
+        for parent in parents:
+            lbg.get_cost_to_go(parent)
+    logger.info(
+        f"{len(parents)} get_cost_to_go "
+        f"{(time.perf_counter() - start_time) / n_repeats:.5f} s"
+    )
+
+    start_time = time.perf_counter()
+    for _ in range(n_repeats):
+        lbg.get_costs_to_go(parents)
+    logger.info(
+        f"get_costs_to_go of {len(parents)} vertices "
+        f"{(time.perf_counter() - start_time) / n_repeats:.5f} s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the lower bound graph cost to go computation"
+    )
+    parser.add_argument(
+        "--graph_name",
+        type=str,
+        default=None,
+        help="Defaults to the largest lower bound graph in example_graphs",
+    )
+    parser.add_argument("--n_repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    logging.getLogger("large_gcs").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    main(
+        (
+            largest_lbg_file_path()
+            if args.graph_name is None
+            else LowerBoundGraph.lbg_file_path_from_name(args.graph_name)
+        ),
+        args.n_repeats,
+    )
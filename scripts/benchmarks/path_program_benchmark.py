@@ -0,0 +1,134 @@
+"""Benchmark for incrementally built convex restrictions on long paths.
+
+Solves the convex restrictions along every prefix of a long path in an
+incremental contact graph, the way a search extends a parent's path by
+one edge to visit a child, using either GraphOfConvexSets'
+SolveConvexRestriction (which rebuilds the path program in every solve)
+or the PathProgramBuilder (which extends the cached program of the
+parent's path).
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph.path_program_builder import PathProgramBuilder
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def find_long_path(
+    cg: IncrementalContactGraph, builder: PathProgramBuilder, min_len: int, seed: int
+):
+    """Randomized depth first search for a feasible path of at least min_len
+    edges that does not visit the target."""
+    rng = np.random.default_rng(seed)
+    stack = [[]]
+    while len(stack) > 0:
+        edge_path = stack.pop()
+        if len(edge_path) >= min_len:
+            return edge_path
+        vertex_name = cg.edges[edge_path[-1]].v if edge_path else cg.source_name
+        visited = {cg.source_name} | {cg.edges[e].v for e in edge_path}
+        cg.generate_neighbors(vertex_name)
+        edges = [
+            e
+            for e in cg.outgoing_edges(vertex_name)
+            if e.v not in visited and e.v != cg.target_name
+        ]
+        for i in rng.permutation(len(edges)):
+            next_path = edge_path + [edges[i].key]
+            result = builder.solve(next_path, cg._gcs_options_wo_relaxation)
+            if result.is_success():
+                stack.append(next_path)
+    raise RuntimeError(f"No feasible path with {min_len} edges found")
+
+
+def time_gcs_solves(cg: IncrementalContactGraph, edge_path):
+    times, costs = [], []
+    for k in range(1, len(edge_path) + 1):
+        gcs_edges = [cg.edges[e].gcs_edge for e in edge_path[:k]]
+        start_time = time.perf_counter()
+        result = cg._gcs.SolveConvexRestriction(
+            gcs_edges, cg._gcs_options_wo_relaxation
+        )
+        times.append(time.perf_counter() - start_time)
+        costs.append(result.get_optimal_cost())
+    return np.array(times), np.array(costs)
+
+
+def time_builder_solves(cg: IncrementalContactGraph, edge_path):
+    builder = PathProgramBuilder(cg)
+    build_times, times, costs = [], [], []
+    for k in range(1, len(edge_path) + 1):
+        start_time = time.perf_counter()
+        builder.build(edge_path[:k])
+        build_times.append(time.perf_counter() - start_time)
+        # The program is now cached, so this only measures the solve
+        result = builder.solve(edge_path[:k], cg._gcs_options_wo_relaxation)
+        times.append(time.perf_counter() - start_time)
+        costs.append(result.get_optimal_cost())
+    return np.array(build_times), np.array(times), np.array(costs)
+
+
+def main(graph_name: str, min_path_len: int, n_repeats: int, seed: int) -> None:
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(graph_name)
+    cg = IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+        should_use_l1_norm_vertex_cost=True,
+    )
+    edge_path = find_long_path(cg, PathProgramBuilder(cg), min_path_len, seed)
+    logger.info(f"Benchmarking prefixes of a path with {len(edge_path)} edges")
+
+    gcs_times = np.zeros(len(edge_path))
+    builder_times = np.zeros(len(edge_path))
+    build_times = np.zeros(len(edge_path))
+    for _ in range(n_repeats):
+        times, gcs_costs = time_gcs_solves(cg, edge_path)
+        gcs_times += times / n_repeats
+        b_times, times, builder_costs = time_builder_solves(cg, edge_path)
+        build_times += b_times / n_repeats
+        builder_times += times / n_repeats
+    assert np.allclose(gcs_costs, builder_costs, rtol=1e-4), "Costs do not match"
+
+    for k in range(0, len(edge_path), 5):
+        logger.info(
+            f"path length {k + 1}: SolveConvexRestriction {gcs_times[k] * 1e3:.2f} ms, "
+            f"PathProgramBuilder {builder_times[k] * 1e3:.2f} ms "
+            f"(build {build_times[k] * 1e3:.2f} ms)"
+        )
+    logger.info(
+        f"total over all prefixes: SolveConvexRestriction {gcs_times.sum():.3f} s, "
+        f"PathProgramBuilder {builder_times.sum():.3f} s "
+        f"(build {build_times.sum():.3f} s), "
+        f"speedup: {gcs_times.sum() / builder_times.sum():.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark incrementally built convex restrictions on long paths"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_maze_b1")
+    parser.add_argument("--min_path_len", type=int, default=30)
+    parser.add_argument("--n_repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    np.set_printoptions(formatter={"float": lambda x: "{0:0.3f}".format(x)})
+
+    main(args.graph_name, args.min_path_len, args.n_repeats, args.seed)
@@ -0,0 +1,120 @@
+"""Benchmark for projecting the samples of a vertex onto the part of it that
+is reachable via a path.
+
+Projects num_samples_per_vertex samples of the last vertex of a path in
+an incremental contact graph with SetSamples.project_all_gcs (one convex
+restriction per sample) and SetSamples.project_all_qp (one QP per sample
+over path constraints that are compiled once, see PathSampleProjector),
+for a range of numbers of samples.
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from large_gcs.algorithms.search_algorithm import AlgMetrics, SearchNode
+from large_gcs.domination_checkers.sampling_domination_checker import SetSamples
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph.path_lp_solver import PathLinearProgramSolver
+from large_gcs.graph.path_sample_projector import PathSampleProjector
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def find_path(cg: IncrementalContactGraph, min_len: int, seed: int) -> SearchNode:
+    """Randomized depth first search for a feasible path of at least min_len
+    edges that does not visit the target."""
+    rng = np.random.default_rng(seed)
+    stack = [SearchNode.from_vertex_path([cg.source_name])]
+    while len(stack) > 0:
+        node = stack.pop()
+        if len(node.edge_path) >= min_len:
+            return node
+        cg.generate_neighbors(node.vertex_name)
+        edges = [
+            e
+            for e in cg.outgoing_edges(node.vertex_name)
+            if e.v not in node.vertex_path and e.v != cg.target_name
+        ]
+        for i in rng.permutation(len(edges)):
+            child = SearchNode.from_parent(edges[i].v, node)
+            cg.set_target(child.vertex_name)
+            sol = cg.solve_convex_restriction(child.edge_path, skip_post_solve=True)
+            if sol.is_success:
+                stack.append(child)
+    raise RuntimeError(f"No feasible path with {min_len} edges found")
+
+
+def main(graph_name: str, min_path_len: int, num_samples_list, seed: int) -> None:
+    cg = IncrementalContactGraph.load_from_file(
+        ContactGraphGeneratorParams.inc_graph_file_path_from_name(graph_name),
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+        should_use_l1_norm_vertex_cost=True,
+    )
+    target_name = cg.target_name
+    node = find_path(cg, min_path_len, seed)
+    cg.set_target(target_name)
+    path_lp_solver = PathLinearProgramSolver(cg)
+    if PathSampleProjector.from_path(path_lp_solver, node.edge_path) is None:
+        raise RuntimeError(f"Path {node.vertex_path} is not polyhedral")
+    logger.info(f"Projecting samples of {node.vertex_name} via {node.vertex_path}")
+
+    for num_samples in num_samples_list:
+        np.random.seed(seed)
+        set_samples = SetSamples.from_vertex(
+            node.vertex_name, cg.vertices[node.vertex_name], num_samples
+        )
+
+        start_time = time.perf_counter()
+        gcs_results = set_samples.project_all_gcs(cg, node, AlgMetrics())
+        gcs_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        qp_results = set_samples.project_all_qp(cg, node, AlgMetrics(), path_lp_solver)
+        qp_time = time.perf_counter() - start_time
+
+        message = (
+            f"{num_samples} samples: project_all_gcs {gcs_time:.3f} s "
+            f"({len(gcs_results)} unique), project_all_qp {qp_time:.3f} s "
+            f"({len(qp_results)} unique), speedup {gcs_time / qp_time:.2f}x"
+        )
+        # With a single sample, project_all_gcs returns any reachable point
+        if num_samples > 1 and len(gcs_results) == len(qp_results):
+            max_diff = np.max(
+                np.abs(np.sort(gcs_results, axis=0) - np.sort(qp_results, axis=0))
+            )
+            message += f", max difference {max_diff:.2e}"
+        logger.info(message)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark batched projection of samples onto path polytopes"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_maze_b1")
+    parser.add_argument("--min_path_len", type=int, default=10)
+    parser.add_argument(
+        "--num_samples",
+        type=int,
+        nargs="+",
+        default=[1, 2, 5, 10, 20, 50, 100],
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    logging.getLogger("large_gcs").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    main(args.graph_name, args.min_path_len, args.num_samples, args.seed)
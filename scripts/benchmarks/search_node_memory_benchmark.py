@@ -0,0 +1,95 @@
+"""Benchmark for the memory held by the nodes of a long GcsAstarReachability
+run, with full or compact solutions stored on the nodes in Q and S.
+
+Incremental path programs are enabled so that the convex restrictions
+keep the ambient path of every node (which is what makes full
+solutions large).
+"""
+
+import argparse
+import logging
+import time
+import tracemalloc
+
+from large_gcs.algorithms.gcs_astar_reachability import GcsAstarReachability
+from large_gcs.cost_estimators.shortcut_edge_ce import ShortcutEdgeCE
+from large_gcs.domination_checkers.sampling_last_pos import ReachesNewLastPosSampling
+from large_gcs.graph.contact_cost_constraint_factory import (
+    contact_shortcut_edge_l1_norm_plus_switches_cost_factory_over,
+)
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run(graph_name: str, n_iterations: int, should_store_compact_solutions: bool):
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(graph_name)
+    cg = IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+        should_use_l1_norm_vertex_cost=True,
+    )
+    cg.enable_incremental_path_programs()
+    alg = GcsAstarReachability(
+        cg,
+        cost_estimator=ShortcutEdgeCE(
+            cg, contact_shortcut_edge_l1_norm_plus_switches_cost_factory_over
+        ),
+        domination_checker=ReachesNewLastPosSampling(cg, num_samples_per_vertex=1),
+        should_store_compact_solutions=should_store_compact_solutions,
+    )
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    for _ in range(n_iterations):
+        if len(alg._Q) == 0 or alg._run_iteration() is not None:
+            break
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    alg.update_node_memory_metrics()
+    metrics = alg.alg_metrics
+    n_nodes = len(alg._Q) + sum(len(S) for S in alg._S.values())
+    logger.info(
+        f"compact={should_store_compact_solutions}: {alg._step} iterations in "
+        f"{elapsed:.1f} s, {n_nodes} nodes in Q and S, "
+        f"{metrics.node_nbytes_mean:.0f} bytes/node "
+        f"({metrics.node_sol_nbytes_mean:.0f} bytes/node in solutions), "
+        f"traced peak {peak / 1e6:.1f} MB"
+    )
+    return metrics
+
+
+def main(graph_name: str, n_iterations: int) -> None:
+    full = run(graph_name, n_iterations, should_store_compact_solutions=False)
+    compact = run(graph_name, n_iterations, should_store_compact_solutions=True)
+    logger.info(
+        f"solution bytes/node: full {full.node_sol_nbytes_mean:.0f}, "
+        f"compact {compact.node_sol_nbytes_mean:.0f} "
+        f"({full.node_sol_nbytes_mean / compact.node_sol_nbytes_mean:.1f}x smaller)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the memory held by search nodes"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_maze_b1")
+    parser.add_argument("--n_iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    logging.getLogger("large_gcs").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    main(args.graph_name, args.n_iterations)
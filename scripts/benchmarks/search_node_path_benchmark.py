@@ -0,0 +1,133 @@
+"""Benchmark for the memory and creation time of the edge and vertex paths
+of search nodes, stored as SharedPaths that share their prefixes with the
+parent's paths versus lists copied from the parent.
+
+The memory is measured on the nodes in Q and S after a GcsAstarReachability
+run, and the creation time on chains of nodes of increasing depth.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from timeit import timeit
+
+import numpy as np
+
+from large_gcs.algorithms.gcs_astar_reachability import GcsAstarReachability
+from large_gcs.algorithms.search_algorithm import SearchNode
+from large_gcs.cost_estimators.shortcut_edge_ce import ShortcutEdgeCE
+from large_gcs.domination_checkers.sampling_last_pos import ReachesNewLastPosSampling
+from large_gcs.graph.contact_cost_constraint_factory import (
+    contact_shortcut_edge_l1_norm_plus_switches_cost_factory_over,
+)
+from large_gcs.graph.graph import Edge
+from large_gcs.graph.incremental_contact_graph import IncrementalContactGraph
+from large_gcs.graph_generators.contact_graph_generator import (
+    ContactGraphGeneratorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def copying_from_parent(child_vertex_name: str, parent: SearchNode):
+    """Previous SearchNode.from_parent, which copied the parent's paths."""
+    new_edge = Edge(u=parent.vertex_name, v=child_vertex_name)
+    node = SearchNode(
+        priority=None, vertex_name=child_vertex_name, edge_path=[], vertex_path=[]
+    )
+    node.edge_path = parent.edge_path.copy() + [new_edge.key]
+    node.vertex_path = parent.vertex_path.copy() + [child_vertex_name]
+    node.parent = parent
+    return node
+
+
+def benchmark_search_memory(graph_name: str, n_iterations: int):
+    graph_file = ContactGraphGeneratorParams.inc_graph_file_path_from_name(graph_name)
+    cg = IncrementalContactGraph.load_from_file(
+        graph_file,
+        should_incl_simul_mode_switches=False,
+        should_add_const_edge_cost=True,
+        should_add_gcs=True,
+        should_use_l1_norm_vertex_cost=True,
+    )
+    alg = GcsAstarReachability(
+        cg,
+        cost_estimator=ShortcutEdgeCE(
+            cg, contact_shortcut_edge_l1_norm_plus_switches_cost_factory_over
+        ),
+        domination_checker=ReachesNewLastPosSampling(cg, num_samples_per_vertex=1),
+    )
+    for _ in range(n_iterations):
+        if len(alg._Q) == 0 or alg._run_iteration() is not None:
+            break
+
+    nodes = {id(entry[0]): entry[0] for entry in alg._Q}
+    for S_nodes in alg._S.values():
+        nodes.update((id(n), n) for n in S_nodes)
+    nodes = list(nodes.values())
+    depths = [len(n.edge_path) for n in nodes]
+
+    # Each node owns the last link of each of its paths
+    shared_bytes = sum(
+        sys.getsizeof(n.edge_path) + sys.getsizeof(n.vertex_path) for n in nodes
+    )
+    list_bytes = sum(
+        sys.getsizeof(n.edge_path.to_list()) + sys.getsizeof(n.vertex_path.to_list())
+        for n in nodes
+    )
+    logger.info(
+        f"{alg._step} iterations, {len(nodes)} nodes in Q and S, "
+        f"depth mean {np.mean(depths):.1f} max {np.max(depths)}"
+    )
+    logger.info(
+        f"path bytes/node: lists {list_bytes / len(nodes):.0f}, "
+        f"shared {shared_bytes / len(nodes):.0f}"
+    )
+
+
+def benchmark_creation_time(depths, n_children: int):
+    for depth in depths:
+        vertex_names = [f"v{i}" for i in range(depth + 1)]
+        shared_node = SearchNode.from_vertex_path(vertex_names)
+        list_node = SearchNode.from_vertex_path(vertex_names)
+        list_node.edge_path = list_node.edge_path.to_list()
+        list_node.vertex_path = list_node.vertex_path.to_list()
+
+        shared_time = timeit(
+            lambda: SearchNode.from_parent("child", shared_node), number=n_children
+        )
+        list_time = timeit(
+            lambda: copying_from_parent("child", list_node), number=n_children
+        )
+        logger.info(
+            f"depth {depth}: child creation lists {list_time / n_children * 1e6:.1f} us, "
+            f"shared {shared_time / n_children * 1e6:.1f} us"
+        )
+
+
+def main(graph_name: str, n_iterations: int, n_children: int) -> None:
+    start_time = time.perf_counter()
+    benchmark_search_memory(graph_name, n_iterations)
+    logger.info(f"search took {time.perf_counter() - start_time:.1f} s")
+    benchmark_creation_time([10, 100, 1000], n_children)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the paths stored on search nodes"
+    )
+    parser.add_argument("--graph_name", type=str, default="cg_maze_b1")
+    parser.add_argument("--n_iterations", type=int, default=200)
+    parser.add_argument("--n_children", type=int, default=10000)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("drake").setLevel(logging.WARNING)
+    logging.getLogger("large_gcs").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    main(args.graph_name, args.n_iterations, args.n_children)